@@ -0,0 +1,203 @@
+import argparse
+import random
+from datetime import datetime, timedelta
+from xml.sax.saxutils import escape
+
+# --- Defaults for the synthetic export ---
+DEFAULT_POSTS = 1000
+DEFAULT_META_PER_POST = 4
+DEFAULT_COMMENT_DENSITY = 1.0
+DEFAULT_CATEGORIES = 20
+DEFAULT_TAGS = 100
+DEFAULT_LINK_DENSITY = 3.0
+DEFAULT_SEED = 42
+
+# The legacy scripts hard-code this domain when telling internal links from external ones
+SITE_DOMAIN = 'theitapprentice.com'
+SITE_URL = f'https://{SITE_DOMAIN}'
+
+# One page and one attachment are generated for every PAGE_EVERY / ATTACHMENT_EVERY posts
+PAGE_EVERY = 10
+ATTACHMENT_EVERY = 5
+
+RSS_HEADER = '''<?xml version="1.0" encoding="UTF-8" ?>
+<rss version="2.0"
+	xmlns:excerpt="http://wordpress.org/export/1.2/excerpt/"
+	xmlns:content="http://purl.org/rss/1.0/modules/content/"
+	xmlns:wfw="http://wellformedweb.org/CommentAPI/"
+	xmlns:dc="http://purl.org/dc/elements/1.1/"
+	xmlns:wp="http://wordpress.org/export/1.2/"
+>
+<channel>
+	<title>Benchmark Site</title>
+	<link>{site_url}</link>
+	<description>Synthetic WordPress export for import benchmarks</description>
+	<wp:wxr_version>1.2</wp:wxr_version>
+'''
+RSS_FOOTER = '</channel>\n</rss>\n'
+
+WORDS = (
+    'wordpress export import python sqlite index query link page post category tag '
+    'comment author media cache server network tutorial guide review backup migration '
+    'performance security plugin theme editor block gutenberg archive feed sitemap'
+).split()
+
+def cdata(text):
+    """Wraps text in CDATA, splitting any ']]>' the way WordPress does."""
+    return '<![CDATA[' + text.replace(']]>', ']]]]><![CDATA[>') + ']]>'
+
+def sentence(rng, words=12):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+def post_slug(post_id):
+    return f"post-{post_id}"
+
+def item_xml(post_id, post_type, slug, title, content, date, modified, extra):
+    """Renders one <item>; extra holds the already rendered terms, meta and comments."""
+    return f'''	<item>
+		<title>{escape(title)}</title>
+		<link>{SITE_URL}/{slug}/</link>
+		<pubDate>{date.strftime('%a, %d %b %Y %H:%M:%S +0000')}</pubDate>
+		<dc:creator>{cdata('author-1')}</dc:creator>
+		<guid isPermaLink="false">{SITE_URL}/?p={post_id}</guid>
+		<description></description>
+		<content:encoded>{cdata(content)}</content:encoded>
+		<excerpt:encoded>{cdata('')}</excerpt:encoded>
+		<wp:post_id>{post_id}</wp:post_id>
+		<wp:post_date>{cdata(date.strftime('%Y-%m-%d %H:%M:%S'))}</wp:post_date>
+		<wp:post_date_gmt>{cdata(date.strftime('%Y-%m-%d %H:%M:%S'))}</wp:post_date_gmt>
+		<wp:post_modified>{cdata(modified.strftime('%Y-%m-%d %H:%M:%S'))}</wp:post_modified>
+		<wp:comment_status>{cdata('open')}</wp:comment_status>
+		<wp:ping_status>{cdata('open')}</wp:ping_status>
+		<wp:post_name>{cdata(slug)}</wp:post_name>
+		<wp:status>{cdata('publish')}</wp:status>
+		<wp:post_parent>0</wp:post_parent>
+		<wp:menu_order>0</wp:menu_order>
+		<wp:post_type>{cdata(post_type)}</wp:post_type>
+		<wp:post_password>{cdata('')}</wp:post_password>
+		<wp:is_sticky>0</wp:is_sticky>
+{extra}	</item>
+'''
+
+def generate_wxr(path, posts=DEFAULT_POSTS, meta_per_post=DEFAULT_META_PER_POST,
+                 comment_density=DEFAULT_COMMENT_DENSITY, categories=DEFAULT_CATEGORIES,
+                 tags=DEFAULT_TAGS, link_density=DEFAULT_LINK_DENSITY, seed=DEFAULT_SEED):
+    """
+    Writes a synthetic WXR file to path and returns a summary of what it contains.
+
+    posts is the number of blog posts (pages and attachments are added on top),
+    meta_per_post the postmeta rows per post (the first three are AIOSEO keys),
+    comment_density the average comments per post, categories/tags the taxonomy
+    size and link_density the average links per post, three quarters of them internal.
+    The same arguments and seed always produce the same file.
+    """
+    rng = random.Random(seed)
+    start_date = datetime(2015, 1, 1)
+    page_count = posts // PAGE_EVERY
+    attachment_count = posts // ATTACHMENT_EVERY
+    counts = {'posts': posts, 'pages': page_count, 'attachments': attachment_count,
+              'post_meta': 0, 'comments': 0, 'internal_links': 0, 'external_links': 0}
+    linkable_slugs = [post_slug(post_id) for post_id in range(1, posts + page_count + 1)]
+    next_comment_id = 1
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(RSS_HEADER.format(site_url=SITE_URL))
+
+        # --- Authors and Terms ---
+        f.write(f"\t<wp:author><wp:author_id>1</wp:author_id><wp:author_login>{cdata('author-1')}</wp:author_login>"
+                f"<wp:author_email>{cdata('author-1@' + SITE_DOMAIN)}</wp:author_email>"
+                f"<wp:author_display_name>{cdata('Author One')}</wp:author_display_name>"
+                f"<wp:author_first_name>{cdata('')}</wp:author_first_name><wp:author_last_name>{cdata('')}</wp:author_last_name></wp:author>\n")
+        for i in range(1, categories + 1):
+            f.write(f"\t<wp:category><wp:term_id>{i}</wp:term_id><wp:category_nicename>{cdata(f'category-{i}')}</wp:category_nicename>"
+                    f"<wp:category_parent>{cdata('')}</wp:category_parent><wp:cat_name>{cdata(f'Category {i}')}</wp:cat_name></wp:category>\n")
+        for i in range(1, tags + 1):
+            f.write(f"\t<wp:tag><wp:term_id>{categories + i}</wp:term_id><wp:tag_slug>{cdata(f'tag-{i}')}</wp:tag_slug>"
+                    f"<wp:tag_name>{cdata(f'Tag {i}')}</wp:tag_name></wp:tag>\n")
+
+        # --- Posts and Pages ---
+        for post_id in range(1, posts + page_count + 1):
+            post_type = 'post' if post_id <= posts else 'page'
+            date = start_date + timedelta(hours=post_id * 7)
+            modified = date + timedelta(days=rng.randint(0, 400))
+
+            paragraphs = []
+            link_total = int(link_density) + (1 if rng.random() < link_density % 1 else 0)
+            for _ in range(max(3, link_total)):
+                paragraphs.append(f"<!-- wp:paragraph --><p>{sentence(rng)}</p><!-- /wp:paragraph -->")
+            for i in range(link_total):
+                if rng.random() < 0.75:
+                    href = f"{SITE_URL}/{rng.choice(linkable_slugs)}/"
+                    counts['internal_links'] += 1
+                else:
+                    href = f"https://external-{rng.randint(1, 50)}.example.org/{rng.choice(WORDS)}"
+                    counts['external_links'] += 1
+                paragraphs[i] = paragraphs[i].replace('</p>', f' <a href="{href}">{rng.choice(WORDS)}</a></p>')
+            content = f"<h2>{sentence(rng, 5)}</h2>" + ''.join(paragraphs)
+
+            extra = []
+            if post_type == 'post' and categories:
+                for term in rng.sample(range(1, categories + 1), min(2, categories)):
+                    extra.append(f'\t\t<category domain="category" nicename="category-{term}">{cdata(f"Category {term}")}</category>\n')
+            if post_type == 'post' and tags:
+                for term in rng.sample(range(1, tags + 1), min(4, tags)):
+                    extra.append(f'\t\t<category domain="post_tag" nicename="tag-{term}">{cdata(f"Tag {term}")}</category>\n')
+
+            meta = [('_aioseo_title', sentence(rng, 6)), ('_aioseo_description', sentence(rng, 20)),
+                    ('_aioseo_keywords', ', '.join(rng.sample(WORDS, 3)))]
+            meta += [(f'custom_field_{i}', str(rng.randint(0, 10000))) for i in range(max(0, meta_per_post - len(meta)))]
+            for key, value in meta[:meta_per_post]:
+                extra.append(f'\t\t<wp:postmeta><wp:meta_key>{cdata(key)}</wp:meta_key><wp:meta_value>{cdata(value)}</wp:meta_value></wp:postmeta>\n')
+                counts['post_meta'] += 1
+
+            comment_total = int(comment_density) + (1 if rng.random() < comment_density % 1 else 0)
+            for _ in range(comment_total if post_type == 'post' else 0):
+                comment_date = (date + timedelta(hours=rng.randint(1, 2000))).strftime('%Y-%m-%d %H:%M:%S')
+                extra.append(
+                    f"\t\t<wp:comment><wp:comment_id>{next_comment_id}</wp:comment_id>"
+                    f"<wp:comment_author>{cdata(f'Reader {rng.randint(1, 500)}')}</wp:comment_author>"
+                    f"<wp:comment_author_email>{cdata('reader@example.org')}</wp:comment_author_email>"
+                    f"<wp:comment_author_url>{cdata('')}</wp:comment_author_url>"
+                    f"<wp:comment_author_IP>{cdata('127.0.0.1')}</wp:comment_author_IP>"
+                    f"<wp:comment_date>{cdata(comment_date)}</wp:comment_date><wp:comment_date_gmt>{cdata(comment_date)}</wp:comment_date_gmt>"
+                    f"<wp:comment_content>{cdata(sentence(rng))}</wp:comment_content><wp:comment_approved>{cdata('1')}</wp:comment_approved>"
+                    f"<wp:comment_type>{cdata('comment')}</wp:comment_type><wp:comment_parent>0</wp:comment_parent>"
+                    f"<wp:comment_user_id>0</wp:comment_user_id></wp:comment>\n")
+                next_comment_id += 1
+                counts['comments'] += 1
+
+            f.write(item_xml(post_id, post_type, post_slug(post_id), sentence(rng, 6).rstrip('.'),
+                             content, date, modified, ''.join(extra)))
+
+        # --- Attachments ---
+        first_attachment_id = posts + page_count + 1
+        for post_id in range(first_attachment_id, first_attachment_id + attachment_count):
+            date = start_date + timedelta(hours=post_id * 7)
+            file_name = f"image-{post_id}.jpg"
+            extra = (f"\t\t<wp:attachment_url>{cdata(f'{SITE_URL}/wp-content/uploads/{file_name}')}</wp:attachment_url>\n"
+                     f"\t\t<wp:postmeta><wp:meta_key>{cdata('_wp_attached_file')}</wp:meta_key><wp:meta_value>{cdata(file_name)}</wp:meta_value></wp:postmeta>\n")
+            f.write(item_xml(post_id, 'attachment', f"image-{post_id}", file_name, '', date, date, extra))
+
+        f.write(RSS_FOOTER)
+
+    counts['items'] = posts + page_count + attachment_count
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic WordPress export (WXR) file.")
+    parser.add_argument('output', help="Path of the XML file to write")
+    parser.add_argument('--posts', type=int, default=DEFAULT_POSTS, help="Number of blog posts")
+    parser.add_argument('--meta', type=int, default=DEFAULT_META_PER_POST, help="Postmeta rows per post")
+    parser.add_argument('--comment-density', type=float, default=DEFAULT_COMMENT_DENSITY, help="Average comments per post")
+    parser.add_argument('--categories', type=int, default=DEFAULT_CATEGORIES, help="Number of categories")
+    parser.add_argument('--tags', type=int, default=DEFAULT_TAGS, help="Number of tags")
+    parser.add_argument('--link-density', type=float, default=DEFAULT_LINK_DENSITY, help="Average links per post")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="Random seed")
+    args = parser.parse_args()
+
+    counts = generate_wxr(args.output, args.posts, args.meta, args.comment_density,
+                          args.categories, args.tags, args.link_density, args.seed)
+    print(f"Wrote {args.output}: " + ', '.join(f"{value:,} {key}" for key, value in counts.items()))
+
+if __name__ == "__main__":
+    main()
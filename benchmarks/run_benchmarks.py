@@ -0,0 +1,340 @@
+import argparse
+import csv
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.generate_wxr import (
+    DEFAULT_CATEGORIES, DEFAULT_COMMENT_DENSITY, DEFAULT_LINK_DENSITY, DEFAULT_META_PER_POST,
+    DEFAULT_SEED, DEFAULT_TAGS, SITE_DOMAIN, generate_wxr,
+)
+from src.batch_writer import DEFAULT_BATCH_SIZE
+from src.wxr_input import WXRInput, count_items as count_wxr_items
+
+# src.wordpress_xml_parser.PARSER_BACKENDS; not imported, as it loads lxml and numpy into the runner
+PARSER_BACKENDS = ('auto', 'lxml', 'etree')
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LEGACY_DIR = os.path.join(REPO_ROOT, 'legacy', 'python')
+RESULTS_DIR = os.path.join(REPO_ROOT, 'benchmarks', 'results')
+
+# The legacy scripts read this fixed file name from their working directory
+LEGACY_INPUT_FILENAME = 'theitapprentice.WordPress.2024-08-17.xml'
+
+# Run order matters: clean_wordpress_tags.py cleans the files extract_content.py writes
+LEGACY_SCRIPTS = [
+    'audit_status.py',
+    'check_for_views.py',
+    'extract_categories.py',
+    'extract_content.py',
+    'clean_wordpress_tags.py',
+    'extract_media_urls.py',
+    'extract_posts.py',
+    'extract_seo.py',
+    'extract_seo_data.py',
+    'rank_by_internal_links.py',
+    'rank_by_updates.py',
+    'scan_links.py',
+    'wp_extractor.py',
+    'run_all_reports.py',
+]
+
+output_filename_pattern = re.compile(r"^OUTPUT_FILENAME\s*=\s*['\"]([^'\"]+)['\"]", re.MULTILINE)
+
+# Runs the importer in a child process so its peak RSS is measured on its own
+IMPORT_CHILD = '''
+import json, sys
+from src.wordpress_xml_parser import parse_wordpress_xml
+stats = parse_wordpress_xml(sys.argv[1], sys.argv[2], sys.argv[3], batch_size=int(sys.argv[4]),
+                            bulk_load=sys.argv[5] == '1', workers=int(sys.argv[6]), backend=sys.argv[8],
+                            shard_workers=int(sys.argv[9]))
+with open(sys.argv[7], 'w') as f:
+    json.dump(stats, f)
+'''
+
+# Runs a script (or -c code) in this process and writes its peak RSS in KB to argv[1] on exit.
+# Measured from inside: Linux carries the runner's ru_maxrss over fork+exec, so wait4 and
+# RUSAGE_SELF report at least the runner's own peak. VmHWM belongs to the new process alone.
+MEASURE_CHILD = '''
+import atexit, os, runpy, sys
+
+def peak_rss_kb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+def write_peak_rss(path=sys.argv[1]):
+    peak = peak_rss_kb()
+    if peak is not None:
+        with open(path, 'w') as f:
+            f.write(str(peak))
+
+atexit.register(write_peak_rss)
+if sys.argv[2] == '-c':
+    code = sys.argv[3]
+    sys.argv = ['-c'] + sys.argv[4:]
+    exec(compile(code, '<string>', 'exec'), {'__name__': '__main__'})
+else:
+    sys.argv = sys.argv[2:]
+    sys.path[0] = os.path.dirname(os.path.abspath(sys.argv[0]))
+    runpy.run_path(sys.argv[0], run_name='__main__')
+'''
+
+def run_measured(python_args, cwd, log_path):
+    """
+    Runs Python with python_args (a script and its arguments, or '-c', code, arguments)
+    in cwd, with its output sent to log_path.
+    Returns (returncode, wall_seconds, peak_rss_kb); peak RSS is None where it cannot be read.
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [REPO_ROOT, env.get('PYTHONPATH')]))
+    rss_path = log_path + '.peak_rss'
+    command = [sys.executable, '-c', MEASURE_CHILD, rss_path] + list(python_args)
+    with open(log_path, 'w', encoding='utf-8') as log:
+        started = time.perf_counter()
+        returncode = subprocess.call(command, cwd=cwd, stdout=log, stderr=subprocess.STDOUT, env=env)
+        wall_seconds = time.perf_counter() - started
+
+    peak_rss_kb = None
+    if os.path.exists(rss_path):
+        with open(rss_path, encoding='utf-8') as f:
+            peak_rss_kb = int(f.read())
+        os.remove(rss_path)
+    return returncode, wall_seconds, peak_rss_kb
+
+def per_second(count, seconds):
+    return round(count / seconds, 1) if count is not None and seconds > 0 else None
+
+def count_csv_rows(path):
+    """Data rows in a CSV written by a legacy script (the header is not counted)."""
+    if not os.path.exists(path):
+        return None
+    with open(path, newline='', encoding='utf-8') as f:
+        return max(0, sum(1 for _ in csv.reader(f)) - 1)
+
+def count_items(xml_path):
+    """Number of <item> elements in an export, plain or compressed, without parsing it."""
+    with WXRInput(xml_path) as wxr:
+        return count_wxr_items(wxr.stream)
+
+def benchmark_importer(work_dir, xml_path, items, batch_size, bulk_load, workers, domain=SITE_DOMAIN, backend='auto', shard_workers=None):
+    db_path = os.path.join(work_dir, f'benchmark-{backend}.db')
+    stats_path = os.path.join(work_dir, f'import_stats-{backend}.json')
+    command = ['-c', IMPORT_CHILD, xml_path, db_path, domain,
+               str(batch_size), '1' if bulk_load else '0', str(workers or 0), stats_path, backend, str(shard_workers or 0)]
+    returncode, wall_seconds, peak_rss_kb = run_measured(command, work_dir, os.path.join(work_dir, f'importer-{backend}.log'))
+
+    write_stats = {}
+    if returncode == 0 and os.path.exists(stats_path):
+        with open(stats_path, encoding='utf-8') as f:
+            write_stats = json.load(f) or {}
+    rows = sum(table['rows'] for table in write_stats.values()) if write_stats else None
+    return {
+        # 'auto' keeps the plain name so results stay comparable with older reports
+        'name': 'importer' if backend == 'auto' else f"importer[{backend}]",
+        'returncode': returncode,
+        'wall_seconds': round(wall_seconds, 3),
+        'peak_rss_kb': peak_rss_kb,
+        'items_per_sec': per_second(items, wall_seconds),
+        'rows': rows,
+        'rows_per_sec': per_second(rows, wall_seconds),
+        'write_stats': write_stats,
+    }
+
+def benchmark_legacy_script(work_dir, script, items):
+    script_path = os.path.join(LEGACY_DIR, script)
+    with open(script_path, encoding='utf-8') as f:
+        match = output_filename_pattern.search(f.read())
+    output_path = os.path.join(work_dir, match.group(1)) if match else None
+
+    log_path = os.path.join(work_dir, script.replace('.py', '.log'))
+    returncode, wall_seconds, peak_rss_kb = run_measured([script_path], work_dir, log_path)
+
+    rows = count_csv_rows(output_path) if output_path and output_path.endswith('.csv') else None
+    return {
+        'name': f"legacy/{script}",
+        'returncode': returncode,
+        'wall_seconds': round(wall_seconds, 3),
+        'peak_rss_kb': peak_rss_kb,
+        'items_per_sec': per_second(items, wall_seconds),
+        'rows': rows,
+        'rows_per_sec': per_second(rows, wall_seconds),
+    }
+
+def run_benchmarks(work_dir, xml_path, items, args, scripts, domain=SITE_DOMAIN):
+    """Benchmarks the importer (once per parser backend) and the legacy scripts against one export."""
+    results = []
+    # The importer runs first, before extract_content.py writes cleaned HTML copies it would pick up
+    if not args.skip_importer:
+        for backend in args.backends:
+            results.append(benchmark_importer(work_dir, xml_path, items, args.batch_size, args.bulk_load,
+                                              args.workers, domain, backend, args.shard_workers))
+    for script in scripts:
+        results.append(benchmark_legacy_script(work_dir, script, items))
+
+    for result in results:
+        rss = f"{result['peak_rss_kb'] / 1024:.1f} MB" if result['peak_rss_kb'] is not None else "n/a"
+        status = "" if result['returncode'] == 0 else f"  (exit code {result['returncode']})"
+        print(f"  {result['name']}: {result['wall_seconds']:.2f}s, peak RSS {rss}, "
+              f"{result['items_per_sec']} items/sec{status}")
+    return results
+
+def run_size(posts, args, scripts):
+    """Generates one synthetic export and benchmarks the importer and the legacy scripts against it."""
+    work_dir = tempfile.mkdtemp(prefix=f"wxr-bench-{posts}-", dir=args.work_dir)
+    xml_path = os.path.join(work_dir, LEGACY_INPUT_FILENAME)
+    try:
+        started = time.perf_counter()
+        counts = generate_wxr(xml_path, posts, args.meta, args.comment_density,
+                              args.categories, args.tags, args.link_density, args.seed)
+        print(f"Generated {posts:,} posts ({os.path.getsize(xml_path) / 1048576:.1f} MB) "
+              f"in {time.perf_counter() - started:.1f}s")
+
+        return {
+            'posts': posts,
+            'file_size': os.path.getsize(xml_path),
+            'counts': counts,
+            'results': run_benchmarks(work_dir, xml_path, counts['items'], args, scripts),
+        }
+    finally:
+        if args.keep_files:
+            print(f"  Files kept in {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+def run_export(export_path, args, scripts):
+    """
+    Benchmarks a real export. The importer reads it where it is (compressed or not); the
+    legacy scripts get a copy under the file name they expect, so they need plain XML.
+    """
+    work_dir = tempfile.mkdtemp(prefix="wxr-bench-export-", dir=args.work_dir)
+    try:
+        items = count_items(export_path)
+        print(f"{export_path}: {items:,} items ({os.path.getsize(export_path) / 1048576:.1f} MB)")
+        if scripts:
+            shutil.copyfile(export_path, os.path.join(work_dir, LEGACY_INPUT_FILENAME))
+        return {
+            'export': os.path.basename(export_path),
+            'posts': None,
+            'file_size': os.path.getsize(export_path),
+            'counts': {'items': items},
+            'results': run_benchmarks(work_dir, os.path.abspath(export_path), items, args, scripts, args.domain),
+        }
+    finally:
+        if args.keep_files:
+            print(f"  Files kept in {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+def run_label(run):
+    return run['export'] if run.get('export') else f"{run['posts']:,} posts"
+
+def compare_to_baseline(report, baseline_path, max_regression):
+    """Prints wall time changes against a previous report; returns the list of regressions."""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    previous = {
+        (run_label(run), result['name']): result['wall_seconds']
+        for run in baseline.get('runs', []) for result in run['results']
+    }
+
+    regressions = []
+    print(f"Compared to {baseline_path}:")
+    for run in report['runs']:
+        for result in run['results']:
+            before = previous.get((run_label(run), result['name']))
+            if not before:
+                continue
+            change = result['wall_seconds'] / before - 1.0
+            flag = "  REGRESSION" if change > max_regression else ""
+            print(f"  {run_label(run)}, {result['name']}: {before:.2f}s -> {result['wall_seconds']:.2f}s ({change:+.0%}){flag}")
+            if flag:
+                regressions.append((run_label(run), result['name'], change))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the WordPress XML importer and legacy scripts on synthetic exports.")
+    parser.add_argument('--posts', type=int, nargs='+', default=[1000, 10000], help="Export sizes to benchmark (number of posts)")
+    parser.add_argument('--meta', type=int, default=DEFAULT_META_PER_POST, help="Postmeta rows per post")
+    parser.add_argument('--comment-density', type=float, default=DEFAULT_COMMENT_DENSITY, help="Average comments per post")
+    parser.add_argument('--categories', type=int, default=DEFAULT_CATEGORIES, help="Number of categories")
+    parser.add_argument('--tags', type=int, default=DEFAULT_TAGS, help="Number of tags")
+    parser.add_argument('--link-density', type=float, default=DEFAULT_LINK_DENSITY, help="Average links per post")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="Random seed for the generator")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Importer batch size")
+    parser.add_argument('--bulk-load', action='store_true', help="Run the importer in bulk-load mode")
+    parser.add_argument('--workers', type=int, default=None, help="Importer content analysis worker processes")
+    parser.add_argument('--shard-workers', type=int, default=None, help="Importer processes parsing item byte ranges")
+    parser.add_argument('--backends', nargs='+', choices=PARSER_BACKENDS, default=['auto'],
+                        help="XML parser backends to run the importer with, e.g. --backends etree lxml")
+    parser.add_argument('--exports', nargs='+', default=None,
+                        help="Benchmark these real exports (.xml, .xml.gz, ...) instead of synthetic ones")
+    parser.add_argument('--domain', default=SITE_DOMAIN, help="Site domain of the --exports, for internal link detection")
+    parser.add_argument('--scripts', nargs='*', default=None, help="Legacy scripts to run (default: all)")
+    parser.add_argument('--skip-legacy', action='store_true', help="Only benchmark the importer")
+    parser.add_argument('--skip-importer', action='store_true', help="Only benchmark the legacy scripts")
+    parser.add_argument('--work-dir', default=None, help="Where to create the temporary benchmark directories")
+    parser.add_argument('--keep-files', action='store_true', help="Keep the generated exports, databases and logs")
+    parser.add_argument('--output', default=None, help="Results JSON path (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument('--baseline', default=None, help="Previous results JSON to compare wall times against")
+    parser.add_argument('--max-regression', type=float, default=0.2, help="Allowed slowdown against the baseline (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    scripts = [] if args.skip_legacy else (args.scripts if args.scripts is not None else LEGACY_SCRIPTS)
+    unknown = [script for script in scripts if script not in LEGACY_SCRIPTS]
+    if unknown:
+        parser.error(f"Unknown legacy scripts: {', '.join(unknown)}")
+
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'config': {
+            'meta_per_post': args.meta,
+            'comment_density': args.comment_density,
+            'categories': args.categories,
+            'tags': args.tags,
+            'link_density': args.link_density,
+            'seed': args.seed,
+            'batch_size': args.batch_size,
+            'bulk_load': args.bulk_load,
+            'workers': args.workers,
+            'shard_workers': args.shard_workers,
+            'backends': args.backends,
+        },
+        'runs': ([run_export(path, args, scripts) for path in args.exports] if args.exports
+                 else [run_size(posts, args, scripts) for posts in args.posts]),
+    }
+
+    output_path = args.output or os.path.join(RESULTS_DIR, datetime.now().strftime('%Y%m%d-%H%M%S') + '.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output_path}")
+
+    if args.baseline and compare_to_baseline(report, args.baseline, args.max_regression):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    # Run from the repository root: python -m benchmarks.run_benchmarks --posts 1000 10000
+    # Parser backends on a real export: python -m benchmarks.run_benchmarks --exports site.xml.gz --backends etree lxml --skip-legacy
+    main()
@@ -1,18 +1,35 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, make_response
-from sqlalchemy.orm import sessionmaker
-from collections import defaultdict
-from sqlalchemy import or_, func
-from src.models import Base, create_database, Post, Author, Category, Tag, ExternalLink, PostCategory, PostTag, PostMeta, Comment, SiteInfo
-from src.wordpress_xml_parser import parse_wordpress_xml
+from flask import Flask, Request, Response, jsonify, render_template, request, redirect, url_for, flash, stream_with_context
+from markupsafe import Markup, escape
+from sqlalchemy.orm import sessionmaker, contains_eager
+from collections import OrderedDict, defaultdict
+from sqlalchemy import or_, func, inspect, text, bindparam
+from src.models import Base, create_database, Post, Author, Category, Tag, ExternalLink, PostCategory, PostTag, PostMeta, Comment, SiteInfo, SiteStat, LinkMetric, post_search
+from src.search_index import SEARCH_TABLE, BM25_WEIGHTS, SNIPPET_COLUMN, SNIPPET_TOKENS, SNIPPET_START, SNIPPET_END, match_expression
+from src.pagination import decode_cursor, encode_cursor, keyset_page
+from src.site_stats import compute_site_stats, load_site_stats
+from src.import_jobs import ImportQueue, get_job, recent_jobs
+from src.uploads import UploadSink, already_imported
+from werkzeug.utils import secure_filename
 import os
 import csv
 import json
 import math
+import textwrap
+import threading
 from io import StringIO
+from itertools import islice
+
+class UploadRequest(Request):
+    """Streams uploaded files straight into the upload folder (see UploadSink) instead of a spooled temporary file."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return UploadSink(app.config['UPLOAD_FOLDER'])
 
 app = Flask(__name__)
+app.request_class = UploadRequest
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['DATABASE_FILE'] = 'wordpress_extracted_data.db'
+app.config['JOBS_DATABASE_FILE'] = 'import_jobs.db' # Background import jobs and their progress
 app.config['YOUR_DOMAIN'] = 'theitapprentice.com' # Configure your domain for internal link detection
 app.config['SECRET_KEY'] = 'supersecretkey' # Replace with a strong secret key
 
@@ -24,6 +41,11 @@ if not os.path.exists(app.config['UPLOAD_FOLDER']):
 DATABASE_PATH = os.path.join(os.getcwd(), app.config['DATABASE_FILE'])
 engine = create_database(DATABASE_PATH)
 Session = sessionmaker(bind=engine)
+# False when SQLite lacks FTS5; search then falls back to ILIKE scans
+SEARCH_ENABLED = inspect(engine).has_table(SEARCH_TABLE)
+
+# Uploads are imported on a background thread, one at a time
+import_queue = ImportQueue(app.config['JOBS_DATABASE_FILE'])
 
 @app.before_request
 def create_session():
@@ -34,36 +56,171 @@ def shutdown_session(exception=None):
     if hasattr(request, 'session'):
         request.session.close()
 
+# --- Pagination ---
+PER_PAGE = 20
+# Query string arguments that move between pages rather than change the result set
+PAGE_ARGS = ('page', 'offset', 'after', 'before', 'last')
+
+# Result totals keyed by view and filters, dropped when an import bumps import_generation.
+# Least recently used totals are evicted past COUNT_CACHE_SIZE, so junk query arguments
+# cannot grow it; free-text search totals are never cached.
+COUNT_CACHE_SIZE = 256
+UNCACHED_COUNT_ARGS = ('search',)
+count_cache = {'generation': None, 'counts': OrderedDict()}
+count_cache_lock = threading.Lock()
+
+def cached_count(session, query):
+    """
+    query.count() for the current view and filters, computed once per import instead of
+    on every page request. The import generation check is a single primary-key lookup.
+    """
+    if any(request.args.get(name) for name in UNCACHED_COUNT_ARGS):
+        return query.count()
+
+    generation = session.query(SiteInfo.value).filter(SiteInfo.key == 'import_generation').scalar()
+    key = (request.endpoint, tuple(sorted((name, value) for name, value in request.args.items() if name not in PAGE_ARGS)))
+    with count_cache_lock:
+        if generation != count_cache['generation']:
+            count_cache['generation'] = generation
+            count_cache['counts'] = OrderedDict()
+        counts = count_cache['counts']
+        if key in counts:
+            counts.move_to_end(key)
+            return counts[key]
+
+    total = query.count()
+    with count_cache_lock:
+        if count_cache['generation'] == generation:
+            counts = count_cache['counts']
+            counts[key] = total
+            counts.move_to_end(key)
+            while len(counts) > COUNT_CACHE_SIZE:
+                counts.popitem(last=False)
+    return total
+
+def page_url(**page_args):
+    """URL of the current view with its filters kept and the paging arguments replaced."""
+    args = {name: value for name, value in request.args.items() if name not in PAGE_ARGS}
+    args.update(page_args)
+    return url_for(request.endpoint, **args)
+
+def paginate(session, query, order, key, per_page=PER_PAGE):
+    """
+    Keyset pagination for a list view: query must not be ordered yet, order is a
+    [(column, descending), ...] list ending with the primary key and key(row) returns
+    those column values for a result row. Links carry an after/before cursor, so every
+    page is an index seek; the offset in the URL only numbers the pages and rows.
+    """
+    after = decode_cursor(request.args.get('after'), len(order))
+    before = decode_cursor(request.args.get('before'), len(order)) if after is None else None
+    last = after is None and before is None and request.args.get('last') == '1'
+
+    total = cached_count(session, query)
+    items, has_previous, has_next = keyset_page(query, order, per_page, after, before, last)
+
+    if last:
+        offset = max(total - len(items), 0)
+    elif after is None and before is None or not has_previous:
+        offset = 0
+    else:
+        offset = max(request.args.get('offset', 0, type=int), 0)
+
+    total_pages = max(math.ceil(total / per_page), 1)
+    return {
+        'items': items,
+        'offset': offset,
+        'page': min(math.ceil(offset / per_page) + 1, total_pages),
+        'total': total,
+        'total_pages': total_pages,
+        'first_url': page_url() if has_previous else None,
+        'prev_url': page_url(before=encode_cursor(key(items[0])), offset=max(offset - per_page, 0)) if has_previous and items else None,
+        'next_url': page_url(after=encode_cursor(key(items[-1])), offset=offset + len(items)) if has_next and items else None,
+        'last_url': page_url(last=1) if has_next else None,
+    }
+
+def paginate_numbered(session, query, per_page=PER_PAGE):
+    """
+    OFFSET pagination, for search results ranked by relevance: there is no index to seek
+    in, and the match set is small next to the whole table. Returns the same dict as paginate.
+    """
+    total = cached_count(session, query)
+    total_pages = max(math.ceil(total / per_page), 1)
+    page = min(max(request.args.get('page', 1, type=int), 1), total_pages)
+    items = query.offset((page - 1) * per_page).limit(per_page).all()
+    return {
+        'items': items,
+        'offset': (page - 1) * per_page,
+        'page': page,
+        'total': total,
+        'total_pages': total_pages,
+        'first_url': page_url() if page > 1 else None,
+        'prev_url': page_url(page=page - 1) if page > 1 else None,
+        'next_url': page_url(page=page + 1) if page < total_pages else None,
+        'last_url': page_url(page=total_pages) if page < total_pages else None,
+    }
+
+# --- Search ---
+def apply_search(query, search_query, like_columns):
+    """
+    Narrows a Post query to search_query. With the posts_fts index the match is ranked by
+    BM25 (best first); otherwise it falls back to ILIKE over like_columns.
+    Returns (query, match), where match is the FTS expression or None for the fallback.
+    """
+    match = match_expression(search_query) if SEARCH_ENABLED else None
+    if match is None:
+        return query.filter(or_(*[column.ilike(f'%{search_query}%') for column in like_columns])), None
+
+    weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+    query = (query.join(post_search, post_search.c.rowid == Post.post_id)
+                  .filter(text(f'{SEARCH_TABLE} MATCH :match').bindparams(match=match))
+                  .order_by(text(f'bm25({SEARCH_TABLE}, {weights})')))
+    return query, match
+
+def search_snippets(session, match, post_ids):
+    """Highlighted snippets for the posts on the current page, keyed by post_id."""
+    if not match or not post_ids:
+        return {}
+    rows = session.execute(
+        text(f'SELECT rowid, snippet({SEARCH_TABLE}, {SNIPPET_COLUMN}, :start, :end, :ellipsis, {SNIPPET_TOKENS}) '
+             f'FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match AND rowid IN :post_ids')
+        .bindparams(bindparam('post_ids', expanding=True)),
+        {'start': SNIPPET_START, 'end': SNIPPET_END, 'ellipsis': '…', 'match': match, 'post_ids': list(post_ids)}
+    )
+    # Escape the indexed text first, then turn the match markers into <mark> tags
+    return {
+        post_id: Markup(str(escape(snippet)).replace(SNIPPET_START, '<mark>').replace(SNIPPET_END, '</mark>'))
+        for post_id, snippet in rows
+    }
+
+def get_site_stats(session):
+    """
+    The dashboard figures stored by the last import, read in one query. A database
+    imported before site_stats existed gets them computed live until it is re-imported.
+    """
+    stats = load_site_stats(session.query(SiteStat.key, SiteStat.value).all())
+    if stats is None:
+        stats = compute_site_stats(session.connection().connection)
+    return stats
+
 @app.route('/')
 def index():
     session = request.session
-    total_posts = session.query(Post).filter_by(post_type='post').count()
-    total_pages = session.query(Post).filter_by(post_type='page').count()
-    total_authors = session.query(Author).count()
-    total_categories = session.query(Category).count()
-    total_tags = session.query(Tag).count()
-    total_external_links = session.query(ExternalLink).count()
-    
-    # New metrics
-    total_comments = session.query(func.sum(Post.comment_count)).filter(Post.post_type.in_(['post', 'page'])).scalar() or 0
-    total_attachments = session.query(Post).filter_by(post_type='attachment').count()
+    stats = get_site_stats(session)
 
     return render_template('index_stats.html',
-                           total_posts=total_posts,
-                           total_pages=total_pages,
-                           total_authors=total_authors,
-                           total_categories=total_categories,
-                           total_tags=total_tags,
-                           total_external_links=total_external_links,
-                           total_comments=total_comments,
-                           total_attachments=total_attachments)
+                           total_posts=stats['total_posts'],
+                           total_pages=stats['total_pages'],
+                           total_authors=stats['total_authors'],
+                           total_categories=stats['total_categories'],
+                           total_tags=stats['total_tags'],
+                           total_external_links=stats['total_external_links'],
+                           total_comments=stats['total_comments'],
+                           total_attachments=stats['total_attachments'])
 
 @app.route('/posts')
 def posts_list():
     session = request.session
     
-    page = request.args.get('page', 1, type=int)
-    per_page = 20
     search_query = request.args.get('search', '')
     category_filter = request.args.get('category', '')
     tag_filter = request.args.get('tag', '') # New tag filter
@@ -71,11 +228,9 @@ def posts_list():
 
     query = session.query(Post).filter(Post.post_type == post_type_filter)
 
+    match = None
     if search_query:
-        query = query.filter(or_(
-            Post.title.ilike(f'%{search_query}%'),
-            Post.content_encoded.ilike(f'%{search_query}%')
-        ))
+        query, match = apply_search(query, search_query, [Post.title, Post.content_encoded])
 
     if category_filter:
         query = query.join(PostCategory).join(Category).filter(Category.name == category_filter)
@@ -87,15 +242,20 @@ def posts_list():
     all_categories = session.query(Category).order_by(Category.name).all()
     all_tags = session.query(Tag).order_by(Tag.name).all() # New: all tags for filter dropdown
     
-    total = query.count()
-    posts = query.order_by(Post.post_date.desc()).offset((page - 1) * per_page).limit(per_page).all()
-    total_pages = math.ceil(total / per_page) if total > 0 else 1
+    if match:
+        # Search results are already ranked by relevance; the date only breaks ties
+        pagination = paginate_numbered(session, query.order_by(Post.post_date.desc()))
+    else:
+        pagination = paginate(session, query, [(Post.post_date, True), (Post.post_id, True)],
+                              lambda post: (post.post_date, post.post_id))
+    posts = pagination['items']
+    snippets = search_snippets(session, match, [post.post_id for post in posts])
     
     return render_template('posts.html', 
                            posts=posts, 
-                           page=page, 
-                           total_pages=total_pages, 
+                           pagination=pagination, 
                            search_query=search_query,
+                           snippets=snippets,
                            post_type_filter=post_type_filter,
                            all_categories=all_categories, 
                            category_filter=category_filter,
@@ -106,25 +266,24 @@ def posts_list():
 def pages_list():
     session = request.session
     
-    page = request.args.get('page', 1, type=int)
-    per_page = 20
     search_query = request.args.get('search', '')
     post_type_filter = 'page' # Only show pages
 
     query = session.query(Post).filter(Post.post_type == post_type_filter)
 
+    match = None
     if search_query:
-        query = query.filter(or_(
-            Post.title.ilike(f'%{search_query}%'),
-            Post.content_encoded.ilike(f'%{search_query}%'),
-            Post.cleaned_html_source.ilike(f'%{search_query}%')
-        ))
-
-    total = query.count()
-    pages = query.order_by(Post.post_date.desc()).offset((page - 1) * per_page).limit(per_page).all()
-    total_pages = math.ceil(total / per_page) if total > 0 else 1
+        query, match = apply_search(query, search_query, [Post.title, Post.content_encoded, Post.cleaned_html_source])
+
+    if match:
+        pagination = paginate_numbered(session, query.order_by(Post.post_date.desc()))
+    else:
+        pagination = paginate(session, query, [(Post.post_date, True), (Post.post_id, True)],
+                              lambda post: (post.post_date, post.post_id))
+    pages = pagination['items']
+    snippets = search_snippets(session, match, [post.post_id for post in pages])
     
-    return render_template('pages.html', posts=pages, page=page, total_pages=total_pages, search_query=search_query, post_type_filter=post_type_filter)
+    return render_template('pages.html', posts=pages, pagination=pagination, search_query=search_query, post_type_filter=post_type_filter, snippets=snippets)
 
 
 @app.route('/post/<int:post_id>')
@@ -145,6 +304,16 @@ def post_detail(post_id):
     return render_template('post_detail.html', post=post, display_content=display_content,
                            categories=categories, tags=tags, external_links=external_links)
 
+def stored_file_name(file_name, file_hash):
+    """Safe name for an uploaded export; the hash prefix keeps different files of the same name apart."""
+    name = secure_filename(file_name) or 'export.xml'
+    for suffix in ('.gz', '.bz2', '.xz', '.zip'):
+        if name.lower().endswith(suffix):
+            name = name[:-len(suffix)]
+    if not name.lower().endswith('.xml'):
+        name += '.xml'
+    return f"{file_hash[:12]}-{name}"
+
 @app.route('/upload', methods=['GET', 'POST'])
 def upload_file():
     if request.method == 'POST':
@@ -156,20 +325,46 @@ def upload_file():
             flash('No selected file', 'error')
             return redirect(request.url)
         if file:
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], file.filename)
-            file.save(filepath)
-            
-            # The data deletion logic has been removed to support dynamic updates.
-            # The parsing script (`wordpress_xml_parser.py`) should handle duplicates.
-
-            try:
-                parse_wordpress_xml(filepath, app.config['DATABASE_FILE'], app.config['YOUR_DOMAIN'])
-                flash('XML file successfully uploaded and processed!', 'success')
-                return redirect(url_for('index'))
-            except Exception as e:
-                flash(f'Error processing XML file: {e}', 'error')
+            # The file was written, decompressed and hashed while the request was read
+            upload = file.stream
+            if upload.error:
+                flash(f'{file.filename}: {upload.error}', 'error')
+                return redirect(request.url)
+            if upload.wxr is None:
+                flash(f'{file.filename} is not a WordPress export (WXR) file.', 'error')
                 return redirect(request.url)
-    return render_template('upload.html')
+            file_hash = upload.hexdigest()
+            if already_imported(app.config['DATABASE_FILE'], file_hash):
+                flash(f'{file.filename} was already imported and has not changed. Nothing to do.', 'info')
+                return redirect(request.url)
+
+            filepath = os.path.join(app.config['UPLOAD_FOLDER'], stored_file_name(file.filename, file_hash))
+            upload.save(filepath)
+
+            # The data deletion logic has been removed to support dynamic updates.
+            # Incremental mode skips files and items that were already imported
+            # and replaces the child rows of items that changed.
+            # The import runs in the background; the job page reports its progress.
+            job_id = import_queue.submit(filepath, app.config['DATABASE_FILE'], app.config['YOUR_DOMAIN'], file.filename, file_hash)
+            flash(f'{file.filename} uploaded (WXR {upload.wxr["wxr_version"]}, {upload.size / 1024 / 1024:.1f} MB of XML). '
+                  'The import is running in the background.', 'success')
+            return redirect(url_for('import_job', job_id=job_id))
+    return render_template('upload.html', jobs=recent_jobs(app.config['JOBS_DATABASE_FILE']))
+
+@app.route('/jobs/<int:job_id>')
+def import_job(job_id):
+    job = get_job(app.config['JOBS_DATABASE_FILE'], job_id)
+    if job is None:
+        return render_template('404.html'), 404
+    return render_template('import_job.html', job=job)
+
+@app.route('/jobs/<int:job_id>/status')
+def import_job_status(job_id):
+    """Job progress as JSON, for polling from scripts."""
+    job = get_job(app.config['JOBS_DATABASE_FILE'], job_id)
+    if job is None:
+        return jsonify({'error': f'No import job {job_id}'}), 404
+    return jsonify(job)
 
 @app.route('/authors')
 def authors_list():
@@ -241,63 +436,58 @@ def tags_list():
 def internal_link_rankings():
     session = request.session
     
-    page = request.args.get('page', 1, type=int)
-    per_page = 20
     sort_by = request.args.get('sort_by', 'internal_backlink_count')
     sort_order = request.args.get('sort_order', 'desc')
-
-    query = session.query(Post).filter(Post.post_type.in_(['post', 'page']))
-
-    if sort_by == 'title':
-        if sort_order == 'asc':
-            query = query.order_by(Post.title.asc())
-        else:
-            query = query.order_by(Post.title.desc())
-    elif sort_by == 'type':
-        if sort_order == 'asc':
-            query = query.order_by(Post.post_type.asc())
-        else:
-            query = query.order_by(Post.post_type.desc())
-    elif sort_by == 'status':
-        if sort_order == 'asc':
-            query = query.order_by(Post.status.asc())
-        else:
-            query = query.order_by(Post.status.desc())
-    elif sort_by == 'internal_backlink_count':
-        if sort_order == 'asc':
-            query = query.order_by(Post.internal_backlink_count.asc())
-        else:
-            query = query.order_by(Post.internal_backlink_count.desc())
-            
-    total = query.count()
-    ranked_posts = query.offset((page - 1) * per_page).limit(per_page).all()
-    total_pages = math.ceil(total / per_page) if total > 0 else 1
+    link_filter = request.args.get('link_filter', '') # 'orphans' or 'dead_ends'
+
+    query = session.query(Post).outerjoin(LinkMetric, LinkMetric.post_id == Post.post_id).options(contains_eager(Post.link_metrics)).filter(Post.post_type.in_(['post', 'page']))
+
+    if link_filter == 'orphans':
+        query = query.filter(LinkMetric.is_orphan == True)
+    elif link_filter == 'dead_ends':
+        query = query.filter(LinkMetric.is_dead_end == True)
+
+    # (column, value of that column on a result row) for each sortable field
+    sort_columns = {
+        'title': (Post.title, lambda post: post.title),
+        'type': (Post.post_type, lambda post: post.post_type),
+        'status': (Post.status, lambda post: post.status),
+        'internal_backlink_count': (Post.internal_backlink_count, lambda post: post.internal_backlink_count),
+        'pagerank': (LinkMetric.pagerank, lambda post: post.link_metrics.pagerank if post.link_metrics else None),
+        'in_degree': (LinkMetric.in_degree, lambda post: post.link_metrics.in_degree if post.link_metrics else None),
+        'out_degree': (LinkMetric.out_degree, lambda post: post.link_metrics.out_degree if post.link_metrics else None),
+    }
+    if sort_by not in sort_columns:
+        sort_by = 'internal_backlink_count'
+    sort_column, sort_value = sort_columns[sort_by]
+    descending = sort_order != 'asc'
+
+    # post_id breaks ties, so rows with equal values keep a stable position between pages
+    pagination = paginate(session, query, [(sort_column, descending), (Post.post_id, descending)],
+                          lambda post: (sort_value(post), post.post_id))
 
     return render_template('internal_link_rankings.html', 
-                           ranked_posts=ranked_posts,
-                           page=page,
-                           total_pages=total_pages,
+                           ranked_posts=pagination['items'],
+                           pagination=pagination,
                            sort_by=sort_by,
-                           sort_order=sort_order)
+                           sort_order=sort_order,
+                           link_filter=link_filter)
 
 @app.route('/external_links_audit')
 def external_links_audit():
     session = request.session
     
-    page = request.args.get('page', 1, type=int)
-    per_page = 20
     sort_by = request.args.get('sort_by', 'post_title') # Default sort by post_title
     sort_order = request.args.get('sort_order', 'asc') # Default sort order ascending
 
     # Fetch all links and their source post data for the current page
     query = session.query(ExternalLink, Post.post_id, Post.title, Post.internal_backlink_count).join(Post, ExternalLink.source_post_id == Post.post_id)
     
-    # Order for pagination, initially by title for consistency
-    query = query.order_by(Post.title.asc(), ExternalLink.linked_url.asc())
-
-    total = query.count()
-    paginated_links_data = query.offset((page - 1) * per_page).limit(per_page).all()
-    total_pages = math.ceil(total / per_page) if total > 0 else 1
+    # Order for pagination, initially by title for consistency; link_id keeps duplicate URLs apart
+    pagination = paginate(session, query,
+                          [(Post.title, False), (ExternalLink.linked_url, False), (ExternalLink.link_id, False)],
+                          lambda row: (row[2], row[0].linked_url, row[0].link_id))
+    paginated_links_data = pagination['items']
 
     # Group links by source post
     grouped_links_raw = defaultdict(list)
@@ -314,305 +504,192 @@ def external_links_audit():
 
     return render_template('external_links_audit.html', 
                            grouped_links=grouped_links_sorted, # Pass sorted list of (key, value)
-                           page=page,
-                           total_pages=total_pages,
+                           pagination=pagination,
                            sort_by=sort_by,
                            sort_order=sort_order)
 
+# --- Streaming Exports ---
+# Exports read their rows through a cursor (yield_per) and stream the file in chunks,
+# so memory use stays flat however large the site is and the download starts at once.
+EXPORT_BATCH_SIZE = 500
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+POST_EXPORT_FIELDS = [
+    'post_id', 'title', 'link', 'pub_date', 'creator', 'guid', 'description',
+    'content_encoded', 'excerpt_encoded', 'post_date', 'post_date_gmt',
+    'comment_status', 'ping_status', 'post_name', 'status', 'post_parent',
+    'menu_order', 'post_type', 'post_mime_type', 'comment_count',
+    'seo_title', 'seo_description', 'seo_keywords', 'internal_backlink_count'
+]
+CATEGORY_EXPORT_FIELDS = ['term_id', 'nicename', 'name', 'description', 'parent', 'post_count']
+INTERNAL_LINK_EXPORT_FIELDS = ['post_id', 'title', 'post_type', 'status', 'internal_backlink_count']
+EXTERNAL_LINK_EXPORT_FIELDS = ['source_post_id', 'source_post_title', 'linked_url']
+
+def csv_chunks(header, rows):
+    """Yields a CSV file in chunks of about EXPORT_CHUNK_SIZE characters; the header goes out first."""
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def json_chunks(records):
+    """Yields a JSON array of records in chunks, laid out exactly like json.dumps(records, indent=4)."""
+    separator = '[\n'
+    parts = []
+    size = 0
+    for record in records:
+        parts.append(separator + textwrap.indent(json.dumps(record, indent=4), '    '))
+        size += len(parts[-1])
+        # The first record goes out on its own so the download starts straight away
+        if size >= EXPORT_CHUNK_SIZE or separator == '[\n':
+            yield ''.join(parts)
+            parts = []
+            size = 0
+        separator = ',\n'
+    parts.append('[]' if separator == '[\n' else '\n]')
+    yield ''.join(parts)
+
+def ndjson_chunks(records):
+    """Yields newline-delimited JSON, one compact object per line."""
+    parts = []
+    size = 0
+    for record in records:
+        parts.append(json.dumps(record) + '\n')
+        size += len(parts[-1])
+        if size >= EXPORT_CHUNK_SIZE:
+            yield ''.join(parts)
+            parts = []
+            size = 0
+    yield ''.join(parts)
+
+def stream_download(chunks, filename, content_type):
+    # stream_with_context keeps request.session open until the last chunk has been sent
+    response = Response(stream_with_context(chunks), content_type=content_type)
+    response.headers["Content-Disposition"] = f"attachment; filename={filename}"
+    return response
+
+def stream_csv(header, rows, filename):
+    return stream_download(csv_chunks(header, rows), filename, "text/csv")
+
+def stream_json(records, filename):
+    """JSON array download, or newline-delimited JSON with ?format=ndjson."""
+    if request.args.get('format') == 'ndjson':
+        return stream_download(ndjson_chunks(records), filename.replace('.json', '.ndjson'), "application/x-ndjson")
+    return stream_download(json_chunks(records), filename, "application/json")
+
+def names_by_post(query):
+    """Groups the (post_id, value) rows of query into {post_id: [value, ...]}."""
+    grouped = defaultdict(list)
+    for post_id, value in query:
+        grouped[post_id].append(value)
+    return grouped
+
+def post_rows(session, post_type):
+    """The POST_EXPORT_FIELDS of every post of post_type, in post_id order."""
+    return (session.query(*[getattr(Post, field) for field in POST_EXPORT_FIELDS])
+                   .filter(Post.post_type == post_type)
+                   .order_by(Post.post_id)
+                   .yield_per(EXPORT_BATCH_SIZE))
+
+def iter_post_records(session, post_type):
+    """
+    Yields the export dict of every post of post_type. Categories, tags and external links
+    are fetched with three queries per batch of posts instead of three lazy loads per post.
+    """
+    rows = iter(post_rows(session, post_type))
+    while True:
+        batch = list(islice(rows, EXPORT_BATCH_SIZE))
+        if not batch:
+            break
+        post_ids = [row.post_id for row in batch]
+        categories = names_by_post(session.query(PostCategory.post_id, Category.name).join(Category).filter(PostCategory.post_id.in_(post_ids)))
+        tags = names_by_post(session.query(PostTag.post_id, Tag.name).join(Tag).filter(PostTag.post_id.in_(post_ids)))
+        external_links = names_by_post(session.query(ExternalLink.source_post_id, ExternalLink.linked_url).filter(ExternalLink.source_post_id.in_(post_ids)))
+
+        for row in batch:
+            record = dict(zip(POST_EXPORT_FIELDS, row))
+            record['categories'] = categories.get(row.post_id, [])
+            record['tags'] = tags.get(row.post_id, [])
+            record['external_links'] = external_links.get(row.post_id, [])
+            yield record
+
+def category_rows(session):
+    """(term_id, nicename, name, description, parent, post_count) for every category."""
+    return session.query(
+        Category.term_id,
+        Category.nicename,
+        Category.name,
+        Category.description,
+        Category.parent,
+        func.count(PostCategory.post_id).label('post_count')
+    ).outerjoin(PostCategory).group_by(Category.term_id).yield_per(EXPORT_BATCH_SIZE)
+
+def internal_link_rows(session):
+    """(post_id, title, post_type, status, internal_backlink_count), most linked first."""
+    return (session.query(Post.post_id, Post.title, Post.post_type, Post.status, Post.internal_backlink_count)
+                   .filter(Post.post_type.in_(['post', 'page']))
+                   .order_by(Post.internal_backlink_count.desc())
+                   .yield_per(EXPORT_BATCH_SIZE))
+
+def external_link_rows(session):
+    """(source_post_id, source_post_title, linked_url), by source post title."""
+    return (session.query(ExternalLink.source_post_id, Post.title, ExternalLink.linked_url)
+                   .join(Post, ExternalLink.source_post_id == Post.post_id)
+                   .order_by(Post.title.asc(), ExternalLink.linked_url.asc())
+                   .yield_per(EXPORT_BATCH_SIZE))
+
+def as_records(rows, fields):
+    return (dict(zip(fields, row)) for row in rows)
+
 @app.route('/export/posts/csv')
 def export_posts_csv():
-    session = request.session
-    si = StringIO()
-    posts = session.query(Post).filter_by(post_type='post').all()
-
-    # Write header
-    cw.writerow([
-        'post_id', 'title', 'link', 'pub_date', 'creator', 'guid', 'description',
-        'content_encoded', 'excerpt_encoded', 'post_date', 'post_date_gmt',
-        'comment_status', 'ping_status', 'post_name', 'status', 'post_parent',
-        'menu_order', 'post_type', 'post_mime_type', 'comment_count',
-        'seo_title', 'seo_description', 'seo_keywords', 'internal_backlink_count'
-    ])
-
-    # Write data
-    for post in posts:
-        cw.writerow([
-            post.post_id, post.title, post.link, post.pub_date, post.creator, post.guid, post.description,
-            post.content_encoded, post.excerpt_encoded, post.post_date, post.post_date_gmt,
-            post.comment_status, post.ping_status, post.post_name, post.status, post.post_parent,
-            post.menu_order, post.post_type, post.post_mime_type, post.comment_count,
-            post.seo_title, post.seo_description, post.seo_keywords, post.internal_backlink_count
-        ])
-
-    output = make_response(si.getvalue())
-    output.headers["Content-Disposition"] = "attachment; filename=wordpress_posts.csv"
-    output.headers["Content-type"] = "text/csv"
-    return output
+    return stream_csv(POST_EXPORT_FIELDS, post_rows(request.session, 'post'), "wordpress_posts.csv")
 
 @app.route('/export/posts/json')
 def export_posts_json():
-    session = request.session
-    posts = session.query(Post).filter_by(post_type='post').all()
-    
-    posts_data = []
-    for post in posts:
-        posts_data.append({
-            'post_id': post.post_id,
-            'title': post.title,
-            'link': post.link,
-            'pub_date': post.pub_date,
-            'creator': post.creator,
-            'guid': post.guid,
-            'description': post.description,
-            'content_encoded': post.content_encoded,
-            'excerpt_encoded': post.excerpt_encoded,
-            'post_date': post.post_date,
-            'post_date_gmt': post.post_date_gmt,
-            'comment_status': post.comment_status,
-            'ping_status': post.ping_status,
-            'post_name': post.post_name,
-            'status': post.status,
-            'post_parent': post.post_parent,
-            'menu_order': post.menu_order,
-            'post_type': post.post_type,
-            'post_mime_type': post.post_mime_type,
-            'comment_count': post.comment_count,
-            'seo_title': post.seo_title,
-            'seo_description': post.seo_description,
-            'seo_keywords': post.seo_keywords,
-            'internal_backlink_count': post.internal_backlink_count,
-            'categories': [c.category.name for c in post.post_categories],
-            'tags': [t.tag.name for t in post.post_tags],
-            'external_links': [link.linked_url for link in post.external_links]
-        })
-    
-    response = make_response(json.dumps(posts_data, indent=4))
-    response.headers["Content-Disposition"] = "attachment; filename=wordpress_posts.json"
-    response.headers["Content-type"] = "application/json"
-    return response
+    return stream_json(iter_post_records(request.session, 'post'), "wordpress_posts.json")
 
 @app.route('/export/pages/csv')
 def export_pages_csv():
-    session = request.session
-    si = StringIO()
-    cw = csv.writer(si)
-
-    pages = session.query(Post).filter_by(post_type='page').all()
-
-    # Write header
-    cw.writerow([
-        'post_id', 'title', 'link', 'pub_date', 'creator', 'guid', 'description',
-        'content_encoded', 'excerpt_encoded', 'post_date', 'post_date_gmt',
-        'comment_status', 'ping_status', 'post_name', 'status', 'post_parent',
-        'menu_order', 'post_type', 'post_mime_type', 'comment_count',
-        'seo_title', 'seo_description', 'seo_keywords', 'internal_backlink_count'
-    ])
-
-    # Write data
-    for page in pages:
-        cw.writerow([
-            page.post_id, page.title, page.link, page.pub_date, page.creator, page.guid, page.description,
-            page.content_encoded, page.excerpt_encoded, page.post_date, page.post_date_gmt,
-            page.comment_status, page.ping_status, page.post_name, page.status, page.post_parent,
-            page.menu_order, page.post_type, page.post_mime_type, page.comment_count,
-            page.seo_title, page.seo_description, page.seo_keywords, page.internal_backlink_count
-        ])
-
-    output = make_response(si.getvalue())
-    output.headers["Content-Disposition"] = "attachment; filename=wordpress_pages.csv"
-    output.headers["Content-type"] = "text/csv"
-    return output
+    return stream_csv(POST_EXPORT_FIELDS, post_rows(request.session, 'page'), "wordpress_pages.csv")
 
 @app.route('/export/pages/json')
 def export_pages_json():
-    session = request.session
-    pages = session.query(Post).filter_by(post_type='page').all()
-    
-    pages_data = []
-    for page in pages:
-        pages_data.append({
-            'post_id': page.post_id,
-            'title': page.title,
-            'link': page.link,
-            'pub_date': page.pub_date,
-            'creator': page.creator,
-            'guid': page.guid,
-            'description': page.description,
-            'content_encoded': page.content_encoded,
-            'excerpt_encoded': page.excerpt_encoded,
-            'post_date': page.post_date,
-            'post_date_gmt': page.post_date_gmt,
-            'comment_status': page.comment_status,
-            'ping_status': page.ping_status,
-            'post_name': page.post_name,
-            'status': page.status,
-            'post_parent': page.post_parent,
-            'menu_order': page.menu_order,
-            'post_type': page.post_type,
-            'post_mime_type': page.post_mime_type,
-            'comment_count': page.comment_count,
-            'seo_title': page.seo_title,
-            'seo_description': page.seo_description,
-            'seo_keywords': page.seo_keywords,
-            'internal_backlink_count': page.internal_backlink_count,
-            'categories': [c.category.name for c in page.post_categories],
-            'tags': [t.tag.name for t in page.post_tags],
-            'external_links': [link.linked_url for link in page.external_links]
-        })
-    
-    response = make_response(json.dumps(pages_data, indent=4))
-    response.headers["Content-Disposition"] = "attachment; filename=wordpress_pages.json"
-    response.headers["Content-type"] = "application/json"
-    return response
+    return stream_json(iter_post_records(request.session, 'page'), "wordpress_pages.json")
 
 @app.route('/export/categories/csv')
 def export_categories_csv():
-    session = request.session
-    si = StringIO()
-    cw = csv.writer(si)
-
-    # Query categories with their post counts
-    categories_with_counts = session.query(
-        Category,
-        func.count(PostCategory.post_id).label('post_count')
-    ).outerjoin(PostCategory).group_by(Category.term_id).all()
-
-    # Write header
-    cw.writerow([
-        'term_id', 'nicename', 'name', 'description', 'parent', 'post_count'
-    ])
-
-    # Write data
-    for category, post_count in categories_with_counts:
-        cw.writerow([
-            category.term_id,
-            category.nicename,
-            category.name,
-            category.description,
-            category.parent,
-            post_count
-        ])
-
-    output = make_response(si.getvalue())
-    output.headers["Content-Disposition"] = "attachment; filename=wordpress_categories.csv"
-    output.headers["Content-type"] = "text/csv"
-    return output
+    return stream_csv(CATEGORY_EXPORT_FIELDS, category_rows(request.session), "wordpress_categories.csv")
 
 @app.route('/export/categories/json')
 def export_categories_json():
-    session = request.session
-    
-    # Query categories with their post counts
-    categories_with_counts = session.query(
-        Category,
-        func.count(PostCategory.post_id).label('post_count')
-    ).outerjoin(PostCategory).group_by(Category.term_id).all()
-    
-    categories_data = []
-    for category, post_count in categories_with_counts:
-        categories_data.append({
-            'term_id': category.term_id,
-            'nicename': category.nicename,
-            'name': category.name,
-            'description': category.description,
-            'parent': category.parent,
-            'post_count': post_count
-        })
-    
-    response = make_response(json.dumps(categories_data, indent=4))
-    response.headers["Content-Disposition"] = "attachment; filename=wordpress_categories.json"
-    response.headers["Content-type"] = "application/json"
-    return response
+    return stream_json(as_records(category_rows(request.session), CATEGORY_EXPORT_FIELDS), "wordpress_categories.json")
 
 @app.route('/export/internal_links/csv')
 def export_internal_links_csv():
-    session = request.session
-    si = StringIO()
-    cw = csv.writer(si)
-
-    internal_links = session.query(Post).filter(Post.post_type.in_(['post', 'page'])).order_by(Post.internal_backlink_count.desc()).all()
-
-    cw.writerow([
-        'post_id', 'title', 'post_type', 'status', 'internal_backlink_count'
-    ])
-
-    for post in internal_links:
-        cw.writerow([
-            post.post_id,
-            post.title,
-            post.post_type,
-            post.status,
-            post.internal_backlink_count
-        ])
-
-    output = make_response(si.getvalue())
-    output.headers["Content-Disposition"] = "attachment; filename=wordpress_internal_links.csv"
-    output.headers["Content-type"] = "text/csv"
-    return output
+    return stream_csv(INTERNAL_LINK_EXPORT_FIELDS, internal_link_rows(request.session), "wordpress_internal_links.csv")
 
 @app.route('/export/internal_links/json')
 def export_internal_links_json():
-    session = request.session
-    internal_links = session.query(Post).filter(Post.post_type.in_(['post', 'page'])).order_by(Post.internal_backlink_count.desc()).all()
-    
-    links_data = []
-    for post in internal_links:
-        links_data.append({
-            'post_id': post.post_id,
-            'title': post.title,
-            'post_type': post.post_type,
-            'status': post.status,
-            'internal_backlink_count': post.internal_backlink_count
-        })
-    
-    response = make_response(json.dumps(links_data, indent=4))
-    response.headers["Content-Disposition"] = "attachment; filename=wordpress_internal_links.json"
-    response.headers["Content-type"] = "application/json"
-    return response
+    return stream_json(as_records(internal_link_rows(request.session), INTERNAL_LINK_EXPORT_FIELDS), "wordpress_internal_links.json")
 
 @app.route('/export/external_links/csv')
 def export_external_links_csv():
-    session = request.session
-    si = StringIO()
-    cw = csv.writer(si)
-
-    # Query all external links with their source post titles and IDs
-    export_data = session.query(ExternalLink, Post.title).join(Post, ExternalLink.source_post_id == Post.post_id).order_by(Post.title.asc(), ExternalLink.linked_url.asc()).all()
-
-    cw.writerow([
-        'source_post_id', 'source_post_title', 'linked_url'
-    ])
-
-    for link, post_title in export_data:
-        cw.writerow([
-            link.source_post_id,
-            post_title,
-            link.linked_url
-        ])
-
-    output = make_response(si.getvalue())
-    output.headers["Content-Disposition"] = "attachment; filename=wordpress_external_links.csv"
-    output.headers["Content-type"] = "text/csv"
-    return output
+    return stream_csv(EXTERNAL_LINK_EXPORT_FIELDS, external_link_rows(request.session), "wordpress_external_links.csv")
 
 @app.route('/export/external_links/json')
 def export_external_links_json():
-    session = request.session
-    
-    export_data = session.query(ExternalLink, Post.title).join(Post, ExternalLink.source_post_id == Post.post_id).order_by(Post.title.asc(), ExternalLink.linked_url.asc()).all()
-    
-    links_data = []
-    for link, post_title in export_data:
-        links_data.append({
-            'source_post_id': link.source_post_id,
-            'source_post_title': post_title,
-            'linked_url': link.linked_url
-        })
-    
-    response = make_response(json.dumps(links_data, indent=4))
-    response.headers["Content-Disposition"] = "attachment; filename=wordpress_external_links.json"
-    response.headers["Content-type"] = "application/json"
-    return response
+    return stream_json(as_records(external_link_rows(request.session), EXTERNAL_LINK_EXPORT_FIELDS), "wordpress_external_links.json")
 
 def get_site_info():
     session = Session()
@@ -630,45 +707,12 @@ def analysis():
     
     site_info = get_site_info()
 
-    # Dashboard-like stats
-    total_posts = session.query(Post).filter_by(post_type='post').count()
-    total_pages = session.query(Post).filter_by(post_type='page').count()
-    total_authors = session.query(Author).count()
-    total_categories = session.query(Category).count()
-    total_tags = session.query(Tag).count()
-    total_external_links = session.query(ExternalLink).count()
-    total_comments = session.query(func.sum(Post.comment_count)).filter(Post.post_type.in_(['post', 'page'])).scalar() or 0
-    total_attachments = session.query(Post).filter_by(post_type='attachment').count()
-
-    # Posts by Status
-    posts_by_status = session.query(Post.status, func.count(Post.status)).filter_by(post_type='post').group_by(Post.status).all()
-    pages_by_status = session.query(Post.status, func.count(Post.status)).filter_by(post_type='page').group_by(Post.status).all()
-
-    # Top Authors by Post Count
-    top_authors = session.query(Author.display_name, func.count(Post.post_id)).join(Post, Author.login == Post.creator).filter(Post.post_type == 'post').group_by(Author.display_name).order_by(func.count(Post.post_id).desc()).limit(5).all()
-
-    # Top Categories by Post Count
-    top_categories = session.query(Category.name, func.count(PostCategory.post_id)).join(PostCategory).group_by(Category.name).order_by(func.count(PostCategory.post_id).desc()).limit(5).all()
-
-    # Top Tags by Post Count
-    top_tags = session.query(Tag.name, func.count(PostTag.post_id)).join(PostTag).group_by(Tag.name).order_by(func.count(PostTag.post_id).desc()).limit(5).all()
-
+    # Dashboard-like stats, post/page status breakdowns and top authors, categories and tags
+    stats = get_site_stats(session)
 
     return render_template('analysis.html', 
                            site_info=site_info,
-                           total_posts=total_posts,
-                           total_pages=total_pages,
-                           total_authors=total_authors,
-                           total_categories=total_categories,
-                           total_tags=total_tags,
-                           total_external_links=total_external_links,
-                           total_comments=total_comments,
-                           total_attachments=total_attachments,
-                           posts_by_status=posts_by_status,
-                           pages_by_status=pages_by_status,
-                           top_authors=top_authors,
-                           top_categories=top_categories,
-                           top_tags=top_tags)
+                           **stats)
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
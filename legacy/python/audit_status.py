@@ -1,29 +1,28 @@
-import xml.etree.ElementTree as ET
-import csv
+from report_engine import CsvReport, NAMESPACES, run_reports
 
 INPUT_FILENAME = 'theitapprentice.WordPress.2024-08-17.xml'
 OUTPUT_FILENAME = 'content_audit.csv'
 
-def audit_content(xml_file):
-    tree = ET.parse(xml_file)
-    root = tree.getroot()
-    namespaces = {'wp': 'http://wordpress.org/export/1.2/'}
-    
-    with open(OUTPUT_FILENAME, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(['Title', 'Type', 'Status', 'Date'])
+class ContentAuditReport(CsvReport):
+    """Title, type, status and date of every post and page."""
+    output_filename = OUTPUT_FILENAME
+    header = ['Title', 'Type', 'Status', 'Date']
+
+    def visit(self, item):
+        title = item.find('title').text
+        post_type = item.find('wp:post_type', NAMESPACES).text
+        status = item.find('wp:status', NAMESPACES).text
+        pub_date = item.find('pubDate').text
         
-        for item in root.find('channel').findall('item'):
-            title = item.find('title').text
-            post_type = item.find('wp:post_type', namespaces).text
-            status = item.find('wp:status', namespaces).text
-            pub_date = item.find('pubDate').text
-            
-            # We filter out attachments/nav_items to keep the list clean
-            if post_type in ['post', 'page']:
-                writer.writerow([title, post_type, status, pub_date])
+        # We filter out attachments/nav_items to keep the list clean
+        if post_type in ['post', 'page']:
+            self.writerow([title, post_type, status, pub_date])
 
-    print(f"Audit complete. Check '{OUTPUT_FILENAME}'")
+    def finish(self):
+        print(f"Audit complete. Check '{self.output_filename}'")
+
+def audit_content(xml_file):
+    run_reports(xml_file, [ContentAuditReport()])
 
 if __name__ == "__main__":
-    audit_content(INPUT_FILENAME)
\ No newline at end of file
+    audit_content(INPUT_FILENAME)
@@ -1,43 +1,38 @@
-import xml.etree.ElementTree as ET
-import csv
 from collections import Counter
 
+from report_engine import CsvReport, NAMESPACES, run_reports
+
 INPUT_FILENAME = 'theitapprentice.WordPress.2024-08-17.xml'
 OUTPUT_FILENAME = 'category_stats.csv'
 
-def analyze_categories(xml_file):
-    print(f"Analyzing categories in {xml_file}...")
-    
-    try:
-        tree = ET.parse(xml_file)
-        root = tree.getroot()
-    except Exception as e:
-        print(f"Error: {e}")
-        return
-
-    channel = root.find('channel')
-    category_counter = Counter()
-
-    for item in channel.findall('item'):
+class CategoryStatsReport(CsvReport):
+    """Number of posts in each category, highest first."""
+    output_filename = OUTPUT_FILENAME
+    header = ['Category Name', 'Post Count']
+
+    def __init__(self, output_filename=None):
+        super().__init__(output_filename)
+        self.category_counter = Counter()
+
+    def visit(self, item):
         # Only count actual posts, not pages or attachments
-        post_type = item.find('wp:post_type', {'wp': 'http://wordpress.org/export/1.2/'}).text
+        post_type = item.find('wp:post_type', NAMESPACES).text
         if post_type == 'post':
             for cat in item.findall('category'):
                 # Ensure it's a category, not a tag
                 if cat.get('domain') == 'category':
-                    category_counter[cat.text] += 1
+                    self.category_counter[cat.text] += 1
 
-    # Write to CSV
-    with open(OUTPUT_FILENAME, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(['Category Name', 'Post Count']) # Header
-        
+    def finish(self):
         # Sort by count (highest first)
-        for category, count in category_counter.most_common():
-            writer.writerow([category, count])
+        for category, count in self.category_counter.most_common():
+            self.writerow([category, count])
+
+        print(f"Success! Category stats saved to '{self.output_filename}'")
 
-    print(f"Success! Category stats saved to '{OUTPUT_FILENAME}'")
+def analyze_categories(xml_file):
+    print(f"Analyzing categories in {xml_file}...")
+    run_reports(xml_file, [CategoryStatsReport()])
 
 if __name__ == "__main__":
     analyze_categories(INPUT_FILENAME)
-    
\ No newline at end of file
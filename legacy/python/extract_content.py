@@ -1,7 +1,8 @@
-import xml.etree.ElementTree as ET
 import os
 import re
 
+from report_engine import Report, NAMESPACES, run_reports
+
 # --- CONFIGURATION ---
 INPUT_FILENAME = 'theitapprentice.WordPress.2024-08-17.xml'
 POSTS_FOLDER = 'all_blog_posts'
@@ -12,43 +13,31 @@ def sanitize_filename(title):
     clean_name = re.sub(r'[\\/*?:"<>|]', "", title)
     return clean_name.strip()[:100]  # Limit length to 100 chars to avoid errors
 
-def extract_content(xml_file):
-    print(f"Reading {xml_file}...")
-    
-    # Create output folders if they don't exist
-    if not os.path.exists(POSTS_FOLDER):
-        os.makedirs(POSTS_FOLDER)
-    if not os.path.exists(PAGES_FOLDER):
-        os.makedirs(PAGES_FOLDER)
-
-    try:
-        tree = ET.parse(xml_file)
-        root = tree.getroot()
-    except Exception as e:
-        print(f"Error reading XML: {e}")
-        return
+class ContentExportReport(Report):
+    """Writes the body of every post and page to its own HTML file."""
 
-    namespaces = {
-        'wp': 'http://wordpress.org/export/1.2/',
-        'content': 'http://purl.org/rss/1.0/modules/content/'
-    }
+    def __init__(self):
+        self.post_count = 0
+        self.page_count = 0
 
-    channel = root.find('channel')
-    
-    post_count = 0
-    page_count = 0
+    def begin(self):
+        # Create output folders if they don't exist
+        if not os.path.exists(POSTS_FOLDER):
+            os.makedirs(POSTS_FOLDER)
+        if not os.path.exists(PAGES_FOLDER):
+            os.makedirs(PAGES_FOLDER)
 
-    for item in channel.findall('item'):
+    def visit(self, item):
         title = item.find('title').text
         if not title:
             title = "Untitled"
             
         # Determine if it is a Post or a Page
-        post_type_obj = item.find('wp:post_type', namespaces)
+        post_type_obj = item.find('wp:post_type', NAMESPACES)
         post_type = post_type_obj.text if post_type_obj is not None else 'unknown'
 
         # Get the full body content
-        content_obj = item.find('content:encoded', namespaces)
+        content_obj = item.find('content:encoded', NAMESPACES)
         body_content = content_obj.text if content_obj is not None else ""
 
         if body_content is None: 
@@ -62,18 +51,23 @@ def extract_content(xml_file):
             with open(os.path.join(POSTS_FOLDER, safe_filename), 'w', encoding='utf-8') as f:
                 f.write(f"<h1>{title}</h1>\n\n")
                 f.write(body_content)
-            post_count += 1
+            self.post_count += 1
             
         elif post_type == 'page':
             # Save to Pages Folder
             with open(os.path.join(PAGES_FOLDER, safe_filename), 'w', encoding='utf-8') as f:
                 f.write(f"<h1>{title}</h1>\n\n")
                 f.write(body_content)
-            page_count += 1
+            self.page_count += 1
 
-    print("-" * 30)
-    print(f"Done! Extracted {post_count} posts into '/{POSTS_FOLDER}'")
-    print(f"Done! Extracted {page_count} pages into '/{PAGES_FOLDER}'")
+    def finish(self):
+        print("-" * 30)
+        print(f"Done! Extracted {self.post_count} posts into '/{POSTS_FOLDER}'")
+        print(f"Done! Extracted {self.page_count} pages into '/{PAGES_FOLDER}'")
+
+def extract_content(xml_file):
+    print(f"Reading {xml_file}...")
+    run_reports(xml_file, [ContentExportReport()])
 
 if __name__ == "__main__":
-    extract_content(INPUT_FILENAME)
\ No newline at end of file
+    extract_content(INPUT_FILENAME)
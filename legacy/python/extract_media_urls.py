@@ -1,39 +1,41 @@
-import xml.etree.ElementTree as ET
-import csv
+from report_engine import CsvReport, NAMESPACES, run_reports
 
 INPUT_FILENAME = 'theitapprentice.WordPress.2024-08-17.xml'
 OUTPUT_FILENAME = 'media_library_list.csv'
 
-def extract_media(xml_file):
-    print(f"Extracting media list...")
-    tree = ET.parse(xml_file)
-    root = tree.getroot()
-    namespaces = {'wp': 'http://wordpress.org/export/1.2/'}
-    
-    with open(OUTPUT_FILENAME, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(['Filename', 'File Type', 'Upload Date', 'Original URL'])
+class MediaLibraryReport(CsvReport):
+    """One row per attachment with its file type, upload date and URL."""
+    output_filename = OUTPUT_FILENAME
+    header = ['Filename', 'File Type', 'Upload Date', 'Original URL']
+
+    def __init__(self, output_filename=None):
+        super().__init__(output_filename)
+        self.count = 0
+
+    def visit(self, item):
+        post_type = item.find('wp:post_type', NAMESPACES).text
         
-        count = 0
-        for item in root.find('channel').findall('item'):
-            post_type = item.find('wp:post_type', namespaces).text
+        # We are looking for attachments specifically
+        if post_type == 'attachment':
+            title = item.find('title').text
+            pub_date = item.find('pubDate').text
+            
+            # The URL is usually in <wp:attachment_url>
+            att_url_obj = item.find('wp:attachment_url', NAMESPACES)
+            url = att_url_obj.text if att_url_obj is not None else "No URL Found"
             
-            # We are looking for attachments specifically
-            if post_type == 'attachment':
-                title = item.find('title').text
-                pub_date = item.find('pubDate').text
-                
-                # The URL is usually in <wp:attachment_url>
-                att_url_obj = item.find('wp:attachment_url', namespaces)
-                url = att_url_obj.text if att_url_obj is not None else "No URL Found"
-                
-                # Guess file type from URL extension
-                file_type = url.split('.')[-1] if '.' in url else "Unknown"
-
-                writer.writerow([title, file_type, pub_date, url])
-                count += 1
-
-    print(f"Found {count} media files. List saved to '{OUTPUT_FILENAME}'")
+            # Guess file type from URL extension
+            file_type = url.split('.')[-1] if '.' in url else "Unknown"
+
+            self.writerow([title, file_type, pub_date, url])
+            self.count += 1
+
+    def finish(self):
+        print(f"Found {self.count} media files. List saved to '{self.output_filename}'")
+
+def extract_media(xml_file):
+    print(f"Extracting media list...")
+    run_reports(xml_file, [MediaLibraryReport()])
 
 if __name__ == "__main__":
-    extract_media(INPUT_FILENAME)
\ No newline at end of file
+    extract_media(INPUT_FILENAME)
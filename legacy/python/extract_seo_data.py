@@ -1,32 +1,20 @@
-import xml.etree.ElementTree as ET
-import csv
+from report_engine import CsvReport, NAMESPACES, run_reports
 
 # --- CONFIGURATION ---
 INPUT_FILENAME = 'theitapprentice.WordPress.2024-08-17.xml'
 OUTPUT_FILENAME = 'seo_metadata_export.csv'
 
-def extract_seo(xml_file):
-    print(f"Extracting AIOSEO data from {xml_file}...")
-    
-    try:
-        tree = ET.parse(xml_file)
-        root = tree.getroot()
-    except Exception as e:
-        print(f"Error reading file: {e}")
-        return
+class SeoMetadataReport(CsvReport):
+    """Posts and pages that have at least one AIOSEO field set."""
+    output_filename = OUTPUT_FILENAME
+    header = ['Post Title', 'Type', 'AIOSEO Title', 'AIOSEO Description', 'AIOSEO Keywords', 'Link']
 
-    # WordPress XML Namespaces
-    namespaces = {
-        'wp': 'http://wordpress.org/export/1.2/',
-        'content': 'http://purl.org/rss/1.0/modules/content/'
-    }
-    
-    data_rows = []
+    def __init__(self, output_filename=None):
+        super().__init__(output_filename)
+        self.count = 0
 
-    channel = root.find('channel')
-    
-    for item in channel.findall('item'):
-        post_type = item.find('wp:post_type', namespaces).text
+    def visit(self, item):
+        post_type = item.find('wp:post_type', NAMESPACES).text
         
         # We only care about published Posts and Pages
         if post_type in ['post', 'page']:
@@ -39,9 +27,9 @@ def extract_seo(xml_file):
             seo_keywords = ""
             
             # Search through the meta tags for AIOSEO keys
-            for meta in item.findall('wp:postmeta', namespaces):
-                key = meta.find('wp:meta_key', namespaces).text
-                val = meta.find('wp:meta_value', namespaces).text
+            for meta in item.findall('wp:postmeta', NAMESPACES):
+                key = meta.find('wp:meta_key', NAMESPACES).text
+                val = meta.find('wp:meta_value', NAMESPACES).text
                 
                 if key == '_aioseo_title':
                     seo_title = val
@@ -52,16 +40,16 @@ def extract_seo(xml_file):
 
             # Only save if we found at least one SEO field
             if seo_title or seo_desc or seo_keywords:
-                data_rows.append([title, post_type, seo_title, seo_desc, seo_keywords, link])
+                self.writerow([title, post_type, seo_title, seo_desc, seo_keywords, link])
+                self.count += 1
 
-    # Save to CSV
-    with open(OUTPUT_FILENAME, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(['Post Title', 'Type', 'AIOSEO Title', 'AIOSEO Description', 'AIOSEO Keywords', 'Link'])
-        writer.writerows(data_rows)
+    def finish(self):
+        print(f"Success! Found SEO data for {self.count} posts.")
+        print(f"Saved to '{self.output_filename}'")
 
-    print(f"Success! Found SEO data for {len(data_rows)} posts.")
-    print(f"Saved to '{OUTPUT_FILENAME}'")
+def extract_seo(xml_file):
+    print(f"Extracting AIOSEO data from {xml_file}...")
+    run_reports(xml_file, [SeoMetadataReport()])
 
 if __name__ == "__main__":
-    extract_seo(INPUT_FILENAME)
\ No newline at end of file
+    extract_seo(INPUT_FILENAME)
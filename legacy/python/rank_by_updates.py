@@ -1,42 +1,36 @@
-import xml.etree.ElementTree as ET
-import csv
-from datetime import datetime
+from report_engine import CsvReport, NAMESPACES, run_reports
 
 INPUT_FILENAME = 'theitapprentice.WordPress.2024-08-17.xml'
 OUTPUT_FILENAME = 'posts_by_last_updated.csv'
 
-def rank_by_updates(xml_file):
-    print("Checking for updated content...")
-    tree = ET.parse(xml_file)
-    root = tree.getroot()
-    namespaces = {'wp': 'http://wordpress.org/export/1.2/'}
-    
-    data = []
-    
-    for item in root.find('channel').findall('item'):
-        post_type = item.find('wp:post_type', namespaces).text
+class LastUpdatedReport(CsvReport):
+    """Publish and last modified dates of every published post."""
+    output_filename = OUTPUT_FILENAME
+    header = ['Title', 'Original Publish Date', 'Last Modified Date']
+
+    def visit(self, item):
+        post_type = item.find('wp:post_type', NAMESPACES).text
         if post_type == 'post':
             title = item.find('title').text
             
             # Get Dates
             pub_date_str = item.find('pubDate').text
-            post_date_str = item.find('wp:post_date', namespaces).text
-            mod_date_str = item.find('wp:post_modified', namespaces).text
+            post_date_str = item.find('wp:post_date', NAMESPACES).text
+            mod_date_str = item.find('wp:post_modified', NAMESPACES).text
             
             # Calculate difference (Requires parsing dates, simplistic check here)
             # We will just export the raw dates so you can sort in Excel
             
-            status = item.find('wp:status', namespaces).text
+            status = item.find('wp:status', NAMESPACES).text
             if status == 'publish':
-                data.append([title, post_date_str, mod_date_str])
+                self.writerow([title, post_date_str, mod_date_str])
 
-    # Save to CSV
-    with open(OUTPUT_FILENAME, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(['Title', 'Original Publish Date', 'Last Modified Date'])
-        writer.writerows(data)
+    def finish(self):
+        print(f"Done! Open '{self.output_filename}' and sort by 'Last Modified Date' to see what you worked on most recently.")
 
-    print(f"Done! Open '{OUTPUT_FILENAME}' and sort by 'Last Modified Date' to see what you worked on most recently.")
+def rank_by_updates(xml_file):
+    print("Checking for updated content...")
+    run_reports(xml_file, [LastUpdatedReport()])
 
 if __name__ == "__main__":
-    rank_by_updates(INPUT_FILENAME)
\ No newline at end of file
+    rank_by_updates(INPUT_FILENAME)
@@ -0,0 +1,113 @@
+import xml.etree.ElementTree as ET
+import csv
+import time
+
+# --- Namespaces used in WordPress XML ---
+NAMESPACES = {
+    'wp': 'http://wordpress.org/export/1.2/',
+    'dc': 'http://purl.org/dc/elements/1.1/',
+    'content': 'http://purl.org/rss/1.0/modules/content/'
+}
+
+class Report:
+    """
+    A report visitor. run_reports calls begin() once, visit(item) for every <item>
+    element in file order and finish() after the last one; close() always runs, even
+    when the file could not be parsed. Items are cleared as soon as every report has
+    seen them, so keep the values you need, not the elements.
+    """
+
+    def begin(self):
+        pass
+
+    def visit(self, item):
+        pass
+
+    def finish(self):
+        pass
+
+    def close(self):
+        pass
+
+class CsvReport(Report):
+    """A report that writes one CSV file: set output_filename and header, then call writerow()."""
+    output_filename = None
+    header = None
+
+    def __init__(self, output_filename=None):
+        if output_filename:
+            self.output_filename = output_filename
+        self.file = None
+        self.writer = None
+
+    def begin(self):
+        self.file = open(self.output_filename, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(self.header)
+
+    def writerow(self, row):
+        self.writer.writerow(row)
+
+    def writerows(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+def iter_items(events):
+    """Yields the <item> elements of an iterparse stream, clearing each one after the caller is done with it."""
+    depth = 0
+    channel = None
+    for event, elem in events:
+        if event == 'start':
+            depth += 1
+            if depth == 2 and elem.tag == 'channel':
+                channel = elem
+            continue
+
+        depth -= 1
+        if depth == 2 and elem.tag == 'item':
+            yield elem
+            # Drop the finished item so memory stays flat on large exports
+            elem.clear()
+            if channel is not None:
+                del channel[:]
+
+def run_reports(xml_file, reports):
+    """
+    Streams xml_file once and hands every <item> to each report in turn.
+    Time spent inside each report is added to its `seconds` attribute.
+    Returns the number of items read, or None if the file could not be read.
+    """
+    try:
+        events = ET.iterparse(xml_file, events=('start', 'end'))
+    except OSError as e:
+        print(f"Error: {e}")
+        return None
+
+    for report in reports:
+        report.seconds = 0.0
+
+    item_count = 0
+    try:
+        for report in reports:
+            report.begin()
+        for item in iter_items(events):
+            item_count += 1
+            for report in reports:
+                started = time.perf_counter()
+                report.visit(item)
+                report.seconds += time.perf_counter() - started
+        for report in reports:
+            started = time.perf_counter()
+            report.finish()
+            report.seconds += time.perf_counter() - started
+    except ET.ParseError as e:
+        print(f"Error: Could not parse {xml_file}: {e}")
+        return None
+    finally:
+        for report in reports:
+            report.close()
+    return item_count
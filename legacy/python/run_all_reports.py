@@ -0,0 +1,53 @@
+import time
+
+from report_engine import run_reports
+from audit_status import ContentAuditReport
+from check_for_views import ViewKeysReport
+from extract_categories import CategoryStatsReport
+from extract_content import ContentExportReport
+from extract_media_urls import MediaLibraryReport
+from extract_posts import BlogPostsReport
+from extract_seo import SeoAuditReport
+from extract_seo_data import SeoMetadataReport
+from rank_by_internal_links import InternalLinkRankingReport
+from rank_by_updates import LastUpdatedReport
+from scan_links import ExternalLinksReport
+
+# --- CONFIGURATION ---
+INPUT_FILENAME = 'theitapprentice.WordPress.2024-08-17.xml'
+
+def build_reports():
+    """One instance of every report, writing to the same files as the individual scripts."""
+    return [
+        ContentAuditReport(),
+        ViewKeysReport(),
+        CategoryStatsReport(),
+        ContentExportReport(),
+        MediaLibraryReport(),
+        BlogPostsReport(),
+        SeoAuditReport(),
+        SeoMetadataReport(),
+        InternalLinkRankingReport(),
+        LastUpdatedReport(),
+        ExternalLinksReport(),
+    ]
+
+def run_all_reports(xml_file):
+    reports = build_reports()
+    print(f"Running {len(reports)} reports over {xml_file} in a single pass...")
+
+    started = time.perf_counter()
+    item_count = run_reports(xml_file, reports)
+    if item_count is None:
+        return
+    total_seconds = time.perf_counter() - started
+
+    report_seconds = sum(report.seconds for report in reports)
+    print("-" * 40)
+    print(f"Read {item_count} items in {total_seconds:.2f}s "
+          f"(parsing {total_seconds - report_seconds:.2f}s, reports {report_seconds:.2f}s)")
+    for report in sorted(reports, key=lambda report: report.seconds, reverse=True):
+        print(f" - {type(report).__name__}: {report.seconds:.2f}s")
+
+if __name__ == "__main__":
+    run_all_reports(INPUT_FILENAME)
@@ -0,0 +1,157 @@
+import time
+from collections import defaultdict
+
+from src.search_index import UPSERT_SEARCH_ROW_SQL
+
+DEFAULT_BATCH_SIZE = 5000
+
+# --- Insert statements used by the importer, keyed by table ---
+INSERT_SQL = {
+    'site_info': 'INSERT OR REPLACE INTO site_info (key, value) VALUES (?, ?)',
+    'authors': '''
+        INSERT OR IGNORE INTO authors (author_id, login, email, display_name, first_name, last_name)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''',
+    'categories': '''
+        INSERT OR IGNORE INTO categories (term_id, nicename, parent, name, description)
+        VALUES (?, ?, ?, ?, ?)
+    ''',
+    'tags': '''
+        INSERT OR IGNORE INTO tags (term_id, nicename, name, description)
+        VALUES (?, ?, ?, ?)
+    ''',
+    'posts': '''
+        INSERT INTO posts (
+            post_id, title, link, pub_date, creator, guid, description,
+            content_encoded, excerpt_encoded, post_date, post_date_gmt,
+            comment_status, ping_status, post_name, status, post_parent,
+            menu_order, post_type, post_mime_type, comment_count,
+            cleaned_html_source, seo_title, seo_description, seo_keywords,
+            post_modified, attachment_url
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(post_id) DO UPDATE SET
+            title = excluded.title,
+            link = excluded.link,
+            pub_date = excluded.pub_date,
+            creator = excluded.creator,
+            guid = excluded.guid,
+            description = excluded.description,
+            content_encoded = excluded.content_encoded,
+            excerpt_encoded = excluded.excerpt_encoded,
+            post_date = excluded.post_date,
+            post_date_gmt = excluded.post_date_gmt,
+            comment_status = excluded.comment_status,
+            ping_status = excluded.ping_status,
+            post_name = excluded.post_name,
+            status = excluded.status,
+            post_parent = excluded.post_parent,
+            menu_order = excluded.menu_order,
+            post_type = excluded.post_type,
+            post_mime_type = excluded.post_mime_type,
+            comment_count = excluded.comment_count,
+            cleaned_html_source = excluded.cleaned_html_source,
+            seo_title = excluded.seo_title,
+            seo_description = excluded.seo_description,
+            seo_keywords = excluded.seo_keywords,
+            post_modified = excluded.post_modified,
+            attachment_url = excluded.attachment_url;
+    ''',
+    'post_categories': 'INSERT OR IGNORE INTO post_categories (post_id, category_term_id) VALUES (?, ?)',
+    'post_tags': 'INSERT OR IGNORE INTO post_tags (post_id, tag_term_id) VALUES (?, ?)',
+    'post_meta': '''
+        INSERT OR IGNORE INTO post_meta (post_id, meta_key, meta_value)
+        VALUES (?, ?, ?)
+    ''',
+    'comments': '''
+        INSERT OR IGNORE INTO comments (
+            comment_id, post_id, comment_author, comment_author_email,
+            comment_author_url, comment_author_ip, comment_date,
+            comment_date_gmt, comment_content, comment_approved,
+            comment_type, comment_parent, comment_user_id
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''',
+    'external_links': '''
+        INSERT OR IGNORE INTO external_links (source_post_id, source_post_title, linked_url)
+        VALUES (?, ?, ?)
+    ''',
+    'internal_links': '''
+        INSERT INTO internal_links (source_post_id, target_post_id, link_count)
+        VALUES (?, ?, ?)
+        ON CONFLICT(source_post_id, target_post_id) DO UPDATE SET link_count = excluded.link_count
+    ''',
+    'unresolved_internal_links': '''
+        INSERT INTO unresolved_internal_links (source_post_id, path, link_count)
+        VALUES (?, ?, ?)
+        ON CONFLICT(source_post_id, path) DO UPDATE SET link_count = excluded.link_count
+    ''',
+    'post_hashes': 'INSERT OR REPLACE INTO post_hashes (post_id, content_hash) VALUES (?, ?)',
+    'posts_fts': UPSERT_SEARCH_ROW_SQL,
+}
+
+class BatchWriter:
+    """
+    Buffers rows per table and writes them with executemany once a table's buffer
+    reaches batch_size. Keeps per-table row counts and write times so the batch
+    size can be tuned from the report at the end of an import.
+    """
+
+    def __init__(self, conn, batch_size=DEFAULT_BATCH_SIZE, statements=None):
+        self.conn = conn
+        self.batch_size = max(1, int(batch_size))
+        self.statements = dict(statements or INSERT_SQL)
+        self.buffers = defaultdict(list)
+        self.row_counts = defaultdict(int)
+        self.write_seconds = defaultdict(float)
+        self.flush_counts = defaultdict(int)
+
+    def add(self, table, row):
+        """Queues one row for table, flushing the table when its buffer is full."""
+        buffer = self.buffers[table]
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self.flush(table)
+
+    def add_many(self, table, rows):
+        """Queues several rows for the same table."""
+        for row in rows:
+            self.add(table, row)
+
+    def flush(self, table=None):
+        """Writes the buffered rows of one table, or of every table when table is None."""
+        tables = [table] if table is not None else list(self.buffers)
+        for name in tables:
+            rows = self.buffers.get(name)
+            if not rows:
+                continue
+            started = time.perf_counter()
+            self.conn.executemany(self.statements[name], rows)
+            self.write_seconds[name] += time.perf_counter() - started
+            self.row_counts[name] += len(rows)
+            self.flush_counts[name] += 1
+            rows.clear()
+
+    def total_rows(self):
+        """Rows written so far across all tables."""
+        return sum(self.row_counts.values())
+
+    def stats(self):
+        """Returns {table: {'rows', 'flushes', 'seconds', 'rows_per_sec'}} for every table written so far."""
+        stats = {}
+        for name, rows in self.row_counts.items():
+            seconds = self.write_seconds[name]
+            stats[name] = {
+                'rows': rows,
+                'flushes': self.flush_counts[name],
+                'seconds': round(seconds, 4),
+                'rows_per_sec': round(rows / seconds) if seconds > 0 else None,
+            }
+        return stats
+
+    def report(self):
+        """Prints the per-table write throughput."""
+        print(f"Batched writes (batch size {self.batch_size}):")
+        for name, table_stats in sorted(self.stats().items()):
+            rate = table_stats['rows_per_sec']
+            rate_text = f"{rate:,} rows/sec" if rate is not None else "n/a"
+            print(f"  {name}: {table_stats['rows']:,} rows in {table_stats['flushes']} batches, "
+                  f"{table_stats['seconds']:.3f}s ({rate_text})")
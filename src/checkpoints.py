@@ -0,0 +1,54 @@
+from datetime import datetime
+
+# --- Import Checkpoints ---
+# An import records how far it got in import_checkpoints, in the same transaction as the
+# rows it commits, so an interrupted import can be resumed (parse_wordpress_xml resume=True)
+# instead of starting again from the first byte. The row is removed when the import completes.
+
+# The phases in order. A checkpoint names the phase to run next: 'parsing' with the
+# number of items whose rows are committed, or a later phase once every item is in.
+CHECKPOINT_PHASES = ('parsing', 'linking', 'link_metrics', 'site_stats')
+
+CHECKPOINT_COLUMNS = [
+    'file_name', 'file_size', 'incremental', 'phase', 'items',
+    'input_offset', 'xml_offset', 'xml_sha256', 'started_at', 'updated_at',
+]
+
+def now():
+    return datetime.now().isoformat(timespec='seconds')
+
+def phase_index(phase):
+    return CHECKPOINT_PHASES.index(phase)
+
+def load_checkpoint(conn):
+    """The checkpoint of an interrupted import as a dict, or None."""
+    row = conn.execute(f"SELECT {', '.join(CHECKPOINT_COLUMNS)} FROM import_checkpoints WHERE checkpoint_id = 1").fetchone()
+    return dict(zip(CHECKPOINT_COLUMNS, row)) if row else None
+
+def start_checkpoint(conn, file_name, file_size, incremental):
+    """Records the start of an import, replacing the checkpoint of any earlier one (the caller commits)."""
+    conn.execute('''
+        INSERT OR REPLACE INTO import_checkpoints (checkpoint_id, file_name, file_size, incremental, phase, items,
+                                                   input_offset, xml_offset, xml_sha256, started_at, updated_at)
+        VALUES (1, ?, ?, ?, 'parsing', 0, 0, 0, NULL, ?, ?)
+    ''', (file_name, file_size, int(bool(incremental)), now(), now()))
+
+def save_checkpoint(conn, phase, items, input_offset, xml_offset, xml_sha256=None):
+    """
+    Moves the checkpoint to phase with items committed (the caller commits, together with
+    the rows it covers). xml_sha256 is kept once set, so a resumed incremental import that
+    skips parsing can still record the file in import_files.
+    """
+    conn.execute('''
+        UPDATE import_checkpoints
+        SET phase = ?, items = ?, input_offset = ?, xml_offset = ?, xml_sha256 = COALESCE(?, xml_sha256), updated_at = ?
+        WHERE checkpoint_id = 1
+    ''', (phase, items, input_offset, xml_offset, xml_sha256, now()))
+
+def clear_checkpoint(conn):
+    conn.execute('DELETE FROM import_checkpoints')
+
+def matches_checkpoint(checkpoint, file_name, file_size, incremental):
+    """True when checkpoint was written by an import of the same file with the same mode."""
+    return (checkpoint['file_name'] == file_name and checkpoint['file_size'] == file_size
+            and bool(checkpoint['incremental']) == bool(incremental))
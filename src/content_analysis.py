@@ -0,0 +1,159 @@
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from urllib.parse import urlparse
+
+from src.search_index import search_row
+
+# Items are sent to worker processes in chunks to keep the pickling overhead low
+ANALYSIS_CHUNK_SIZE = 256
+
+CLEANED_HTML_DIRS = ('all_blog_posts', 'all_pages')
+
+title_heading_pattern = re.compile(r'<h[12]>(.*?)<\/h[12]>')
+wordpress_block_comment_pattern = re.compile(r'<!--\s*/?wp:.*?-->', re.DOTALL)
+internal_link_pattern = re.compile(r'href=["\"]([^"\"]+)["\"]')
+
+@lru_cache(maxsize=None)
+def external_link_pattern(your_domain):
+    """Regex to find href="http..." links that do not point at your_domain."""
+    return re.compile(r'href=["\"](http[s]?:\/\/(?:(?!' + re.escape(your_domain) + r')[^"\"]+))["\"]')
+
+def normalize_url_path(url):
+    """Strips http/https and trailing slashes to make matching easier for internal links"""
+    if not url: return ""
+    parsed = urlparse(url)
+    # We only care about the path (e.g., /tutorials/git-gitlab/)
+    path = parsed.path.strip("/")
+    return path
+
+def clean_wordpress_tags(html_content):
+    """
+    Removes WordPress-specific block comments from HTML content.
+    E.g., <!-- wp:paragraph -->, <!-- /wp:list -->, <!-- wp:heading {"level":3} -->
+    """
+    return wordpress_block_comment_pattern.sub('', html_content)
+
+def find_cleaned_html_source(post_name):
+    """Looks for a cleaned HTML copy of a post/page in all_blog_posts/ or all_pages/."""
+    potential_filename = f"{post_name}.html"
+
+    # Check blog posts directory, then the pages directory
+    for directory in CLEANED_HTML_DIRS:
+        cleaned_path = os.path.join(directory, potential_filename)
+        if os.path.exists(cleaned_path):
+            try:
+                with open(cleaned_path, 'r', encoding='utf-8') as f:
+                    cleaned_html_source = f.read()
+                if cleaned_html_source:
+                    # Copies written by extract_content.py may still carry block comments
+                    return clean_wordpress_tags(cleaned_html_source)
+            except Exception as e:
+                print(f"Error reading cleaned HTML for {post_name} from {cleaned_path}: {e}")
+    return None
+
+def find_internal_link_paths(content_encoded, your_domain):
+    """Normalized paths of the links in content_encoded that point at your_domain."""
+    internal_link_paths = []
+    for potential_link in internal_link_pattern.findall(content_encoded or ''):
+        # Check if it's an internal link (contains your_domain) and normalize it
+        if your_domain in potential_link:
+            internal_link_paths.append(normalize_url_path(potential_link))
+    return internal_link_paths
+
+def analyze_item(record, your_domain):
+    """
+    Runs the CPU-heavy content work for one item record and returns the derived fields:
+    the display title, the cleaned HTML copy, external links, internal link paths and
+    the tag-stripped text for the search index.
+    """
+    post_type = record.post_type
+    title = record.title
+    content_encoded = record.content_encoded
+
+    if not title:
+        if content_encoded:
+            match = title_heading_pattern.search(content_encoded)
+            if match:
+                title = match.group(1)
+        if not title:
+            title = "Untitled Post"
+
+    cleaned_html_source = None
+    external_links = []
+    internal_link_paths = []
+    search_fields = None
+    if post_type in ['post', 'page']:
+        cleaned_html_source = find_cleaned_html_source(record.post_name)
+        search_fields = search_row(
+            title, cleaned_html_source or content_encoded, record.excerpt_encoded,
+            record.seo_title, record.seo_description, record.seo_keywords
+        )
+        if content_encoded:
+            external_links = external_link_pattern(your_domain).findall(content_encoded)
+            internal_link_paths = find_internal_link_paths(content_encoded, your_domain)
+
+    return {
+        'title': title,
+        'cleaned_html_source': cleaned_html_source,
+        'external_links': external_links,
+        'internal_link_paths': internal_link_paths,
+        'search_row': search_fields,
+    }
+
+def analyze_chunk(records, your_domain):
+    """Worker entry point: analyzes a list of item records in order."""
+    return [analyze_item(record, your_domain) for record in records]
+
+def analyze_records(records, your_domain, workers=None, chunk_size=ANALYSIS_CHUNK_SIZE):
+    """
+    Takes the (kind, record) stream from iter_wxr_records and yields (kind, record, analysis)
+    in the original order; analysis is None for anything that is not an item. Records of
+    kind 'unchanged_item' (see hash_items in the parser) and 'committed_item' (see
+    skip_committed_items) pass through without analysis.
+
+    With workers > 1, items are analyzed in a ProcessPoolExecutor while the caller keeps
+    writing. At most workers * 2 chunks are in flight, so memory stays bounded, and results
+    are yielded in submission order, so the output is identical to the serial path.
+    """
+    if not workers or workers <= 1:
+        for kind, record in records:
+            yield kind, record, analyze_item(record, your_domain) if kind == 'item' else None
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        chunk = []
+
+        def submit(chunk):
+            items = [record for kind, record in chunk if kind == 'item']
+            in_flight.append((chunk, executor.submit(analyze_chunk, items, your_domain)))
+
+        def drain(limit):
+            while len(in_flight) > limit:
+                chunk_records, future = in_flight.popleft()
+                analyses = iter(future.result())
+                for kind, record in chunk_records:
+                    yield kind, record, next(analyses) if kind == 'item' else None
+
+        for kind, record in records:
+            if kind not in ('item', 'unchanged_item', 'committed_item'):
+                # Keep header records in their place relative to the items around them
+                if chunk:
+                    submit(chunk)
+                    chunk = []
+                yield from drain(0)
+                yield kind, record, None
+                continue
+
+            chunk.append((kind, record))
+            if len(chunk) >= chunk_size:
+                submit(chunk)
+                chunk = []
+                yield from drain(workers * 2)
+
+        if chunk:
+            submit(chunk)
+        yield from drain(0)
@@ -0,0 +1,186 @@
+import json
+import os
+import sqlite3
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from src.wordpress_xml_parser import parse_wordpress_xml
+
+# --- Import Jobs ---
+# Jobs live in their own SQLite file: an import holds the write lock on the target
+# database for most of its run, and progress updates must not wait for it.
+DEFAULT_JOBS_DB = 'import_jobs.db'
+
+# At most one progress write per job per interval
+PROGRESS_WRITE_SECONDS = 1.0
+
+# Jobs go queued -> running -> done, skipped (file already imported) or failed
+ACTIVE_STATUSES = ('queued', 'running')
+
+CREATE_JOBS_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS import_jobs (
+        job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        file_path TEXT,
+        file_name TEXT,
+        db_name TEXT,
+        your_domain TEXT,
+        status TEXT,
+        phase TEXT,
+        items INTEGER DEFAULT 0,
+        rows_written INTEGER DEFAULT 0,
+        bytes_read INTEGER DEFAULT 0,
+        total_bytes INTEGER,
+        created_at TEXT,
+        started_at TEXT,
+        updated_at TEXT,
+        finished_at TEXT,
+        error TEXT,
+        stats TEXT
+    )
+'''
+
+JOB_COLUMNS = [
+    'job_id', 'file_path', 'file_name', 'db_name', 'your_domain', 'status', 'phase',
+    'items', 'rows_written', 'bytes_read', 'total_bytes',
+    'created_at', 'started_at', 'updated_at', 'finished_at', 'error', 'stats',
+]
+
+def now():
+    return datetime.now().isoformat(timespec='seconds')
+
+def connect_jobs_db(jobs_db):
+    conn = sqlite3.connect(jobs_db, timeout=30)
+    conn.execute(CREATE_JOBS_TABLE_SQL)
+    return conn
+
+def update_job(jobs_db, job_id, **values):
+    conn = connect_jobs_db(jobs_db)
+    try:
+        assignments = ', '.join(f"{name} = ?" for name in values)
+        conn.execute(f"UPDATE import_jobs SET {assignments}, updated_at = ? WHERE job_id = ?",
+                     list(values.values()) + [now(), job_id])
+        conn.commit()
+    finally:
+        conn.close()
+
+def job_summary(row):
+    """
+    A job row as a dict, plus percent and eta_seconds while it is parsing. Both come from
+    the share of the file read so far; the phases after parsing have no estimate.
+    """
+    job = dict(zip(JOB_COLUMNS, row))
+    job['stats'] = json.loads(job['stats']) if job['stats'] else None
+    job['percent'] = None
+    job['eta_seconds'] = None
+    job['elapsed_seconds'] = None
+
+    if job['started_at']:
+        finished = datetime.fromisoformat(job['finished_at']) if job['finished_at'] else datetime.now()
+        job['elapsed_seconds'] = (finished - datetime.fromisoformat(job['started_at'])).total_seconds()
+    if job['status'] == 'done':
+        job['percent'] = 100.0
+    elif job['total_bytes'] and job['bytes_read']:
+        fraction = min(job['bytes_read'] / job['total_bytes'], 1.0)
+        job['percent'] = round(fraction * 100, 1)
+        if job['status'] == 'running' and job['phase'] == 'parsing' and job['elapsed_seconds']:
+            job['eta_seconds'] = round(job['elapsed_seconds'] * (1 - fraction) / fraction)
+    return job
+
+def get_job(jobs_db, job_id):
+    """The job_summary of one job, or None if there is no such job."""
+    conn = connect_jobs_db(jobs_db)
+    try:
+        row = conn.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM import_jobs WHERE job_id = ?", (job_id,)).fetchone()
+    finally:
+        conn.close()
+    return job_summary(row) if row else None
+
+def recent_jobs(jobs_db, limit=10):
+    """The latest jobs, newest first."""
+    conn = connect_jobs_db(jobs_db)
+    try:
+        rows = conn.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM import_jobs ORDER BY job_id DESC LIMIT ?", (limit,)).fetchall()
+    finally:
+        conn.close()
+    return [job_summary(row) for row in rows]
+
+class ImportQueue:
+    """
+    Runs parse_wordpress_xml jobs one at a time on a background thread, so a request that
+    uploads an export returns at once. SQLite allows a single writer, so running imports
+    side by side would only make them wait on each other.
+
+    Job state and progress are kept in the import_jobs table of jobs_db, where any
+    process can poll them. Jobs still queued or running when the process stopped are
+    marked failed on start-up; upload the file again to re-run them.
+    """
+
+    def __init__(self, jobs_db=DEFAULT_JOBS_DB, import_options=None):
+        self.jobs_db = jobs_db
+        # Passed to parse_wordpress_xml for every job (batch_size, workers, ...)
+        self.import_options = {'incremental': True, **(import_options or {})}
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='wxr-import')
+
+        conn = connect_jobs_db(jobs_db)
+        try:
+            conn.execute(f'''
+                UPDATE import_jobs SET status = 'failed', error = 'Interrupted: the server stopped before this import finished.',
+                                       finished_at = ?
+                WHERE status IN ({', '.join('?' for _ in ACTIVE_STATUSES)})
+            ''', (now(),) + ACTIVE_STATUSES)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def submit(self, file_path, db_name, your_domain, file_name=None, file_hash=None):
+        """
+        Queues an import of file_path into db_name and returns its job_id. file_hash is the
+        SHA-256 of the file when the caller already computed it (see parse_wordpress_xml).
+        """
+        conn = connect_jobs_db(self.jobs_db)
+        try:
+            cursor = conn.execute('''
+                INSERT INTO import_jobs (file_path, file_name, db_name, your_domain, status, phase, total_bytes, created_at, updated_at)
+                VALUES (?, ?, ?, ?, 'queued', NULL, ?, ?, ?)
+            ''', (file_path, file_name or os.path.basename(file_path), db_name, your_domain,
+                  os.path.getsize(file_path), now(), now()))
+            conn.commit()
+            job_id = cursor.lastrowid
+        finally:
+            conn.close()
+
+        self.executor.submit(self.run_job, job_id, file_path, db_name, your_domain, file_hash)
+        return job_id
+
+    def run_job(self, job_id, file_path, db_name, your_domain, file_hash=None):
+        update_job(self.jobs_db, job_id, status='running', phase='starting', started_at=now())
+        last_write = [0.0]
+
+        def progress(state):
+            # Phase changes are always written; parsing updates at most once per interval
+            if state['phase'] == 'parsing' and time.monotonic() - last_write[0] < PROGRESS_WRITE_SECONDS:
+                return
+            last_write[0] = time.monotonic()
+            update_job(self.jobs_db, job_id, phase=state['phase'], items=state['items'],
+                       rows_written=state['rows_written'], bytes_read=state['bytes_read'])
+
+        try:
+            stats = parse_wordpress_xml(file_path, db_name, your_domain, progress=progress,
+                                        file_hash=file_hash, **self.import_options)
+        except Exception as e:
+            traceback.print_exc()
+            update_job(self.jobs_db, job_id, status='failed', error=f"{type(e).__name__}: {e}", finished_at=now())
+            return
+
+        if stats is None:
+            # Incremental import of a file that was already imported
+            update_job(self.jobs_db, job_id, status='skipped', phase=None, finished_at=now())
+        else:
+            update_job(self.jobs_db, job_id, status='done', phase=None, finished_at=now(),
+                       rows_written=sum(table['rows'] for table in stats.values()),
+                       bytes_read=os.path.getsize(file_path), stats=json.dumps(stats))
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,97 @@
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the pure-Python path gives the same results, only slower
+    np = None
+
+DAMPING = 0.85
+MAX_ITERATIONS = 100
+TOLERANCE = 1.0e-9
+
+def compute_link_metrics(node_ids, edges, damping=DAMPING, max_iterations=MAX_ITERATIONS, tolerance=TOLERANCE):
+    """
+    Computes PageRank, in-degree and out-degree for an internal link graph.
+
+    node_ids is an iterable of post ids, edges an iterable of (source_post_id, target_post_id)
+    pairs. Self-links, duplicate edges and edges to unknown posts are ignored. Dangling
+    posts (no outgoing links) spread their rank evenly over the whole graph.
+    Returns {post_id: (pagerank, in_degree, out_degree)}.
+    """
+    node_ids = sorted(set(node_ids))
+    if not node_ids:
+        return {}
+    index = {post_id: i for i, post_id in enumerate(node_ids)}
+    edge_pairs = sorted({
+        (index[source], index[target])
+        for source, target in edges
+        if source != target and source in index and target in index
+    })
+
+    if np is not None:
+        ranks, in_degree, out_degree = _pagerank_numpy(len(node_ids), edge_pairs, damping, max_iterations, tolerance)
+    else:
+        ranks, in_degree, out_degree = _pagerank_python(len(node_ids), edge_pairs, damping, max_iterations, tolerance)
+
+    return {
+        post_id: (float(ranks[i]), int(in_degree[i]), int(out_degree[i]))
+        for post_id, i in index.items()
+    }
+
+def _pagerank_numpy(node_count, edge_pairs, damping, max_iterations, tolerance):
+    """Power iteration over the edge list; np.bincount does the sparse matrix-vector product."""
+    sources = np.fromiter((s for s, _ in edge_pairs), dtype=np.int64, count=len(edge_pairs))
+    targets = np.fromiter((t for _, t in edge_pairs), dtype=np.int64, count=len(edge_pairs))
+    out_degree = np.bincount(sources, minlength=node_count)
+    in_degree = np.bincount(targets, minlength=node_count)
+
+    dangling = out_degree == 0
+    edge_weights = 1.0 / out_degree[sources] if len(edge_pairs) else np.zeros(0)
+    ranks = np.full(node_count, 1.0 / node_count)
+    for _ in range(max_iterations):
+        spread = np.bincount(targets, weights=ranks[sources] * edge_weights, minlength=node_count)
+        new_ranks = (1.0 - damping) / node_count + damping * (spread + ranks[dangling].sum() / node_count)
+        converged = np.abs(new_ranks - ranks).sum() < tolerance
+        ranks = new_ranks
+        if converged:
+            break
+    return ranks, in_degree, out_degree
+
+def _pagerank_python(node_count, edge_pairs, damping, max_iterations, tolerance):
+    """Same iteration as _pagerank_numpy, with plain lists."""
+    out_degree = [0] * node_count
+    in_degree = [0] * node_count
+    for source, target in edge_pairs:
+        out_degree[source] += 1
+        in_degree[target] += 1
+
+    dangling = [i for i in range(node_count) if out_degree[i] == 0]
+    ranks = [1.0 / node_count] * node_count
+    for _ in range(max_iterations):
+        dangling_share = sum(ranks[i] for i in dangling) / node_count
+        spread = [0.0] * node_count
+        for source, target in edge_pairs:
+            spread[target] += ranks[source] / out_degree[source]
+        new_ranks = [(1.0 - damping) / node_count + damping * (spread[i] + dangling_share) for i in range(node_count)]
+        converged = sum(abs(new - old) for new, old in zip(new_ranks, ranks)) < tolerance
+        ranks = new_ranks
+        if converged:
+            break
+    return ranks, in_degree, out_degree
+
+def refresh_link_metrics(conn):
+    """
+    Recomputes the link_metrics table from every post/page and every stored internal_links
+    edge, so metrics stay correct when several exports are imported into one database.
+    """
+    node_ids = [row[0] for row in conn.execute("SELECT post_id FROM posts WHERE post_type IN ('post', 'page')")]
+    edges = conn.execute('SELECT source_post_id, target_post_id FROM internal_links').fetchall()
+    metrics = compute_link_metrics(node_ids, edges)
+
+    conn.execute('DELETE FROM link_metrics')
+    conn.executemany('''
+        INSERT INTO link_metrics (post_id, pagerank, in_degree, out_degree, is_orphan, is_dead_end)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', (
+        (post_id, pagerank, in_degree, out_degree, int(in_degree == 0), int(out_degree == 0))
+        for post_id, (pagerank, in_degree, out_degree) in metrics.items()
+    ))
+    return metrics
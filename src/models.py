@@ -1,11 +1,16 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, ForeignKey
+from sqlalchemy import create_engine, inspect, text, Column, Index, Integer, MetaData, String, Table, Text, Float, Boolean, ForeignKey
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 
+from src.search_index import SEARCH_COLUMNS, SEARCH_TABLE, create_search_index
+
 Base = declarative_base()
 
 class Author(Base):
     __tablename__ = 'authors'
+    __table_args__ = (
+        Index('ix_authors_login', 'login'),
+    )
     author_id = Column(Integer, primary_key=True)
     login = Column(String)
     email = Column(String)
@@ -20,6 +25,10 @@ class Author(Base):
 
 class Category(Base):
     __tablename__ = 'categories'
+    __table_args__ = (
+        Index('ix_categories_nicename', 'nicename'),
+        Index('ix_categories_name', 'name'),
+    )
     term_id = Column(Integer, primary_key=True)
     nicename = Column(String)
     parent = Column(String)
@@ -33,6 +42,10 @@ class Category(Base):
 
 class Tag(Base):
     __tablename__ = 'tags'
+    __table_args__ = (
+        Index('ix_tags_nicename', 'nicename'),
+        Index('ix_tags_name', 'name'),
+    )
     term_id = Column(Integer, primary_key=True)
     nicename = Column(String)
     name = Column(String)
@@ -45,6 +58,9 @@ class Tag(Base):
 
 class PostCategory(Base):
     __tablename__ = 'post_categories'
+    __table_args__ = (
+        Index('ix_post_categories_category_term_id', 'category_term_id'),
+    )
     post_id = Column(Integer, ForeignKey('posts.post_id'), primary_key=True)
     category_term_id = Column(Integer, ForeignKey('categories.term_id'), primary_key=True)
 
@@ -53,6 +69,9 @@ class PostCategory(Base):
 
 class PostTag(Base):
     __tablename__ = 'post_tags'
+    __table_args__ = (
+        Index('ix_post_tags_tag_term_id', 'tag_term_id'),
+    )
     post_id = Column(Integer, ForeignKey('posts.post_id'), primary_key=True)
     tag_term_id = Column(Integer, ForeignKey('tags.term_id'), primary_key=True)
 
@@ -61,6 +80,10 @@ class PostTag(Base):
 
 class PostMeta(Base):
     __tablename__ = 'post_meta'
+    __table_args__ = (
+        Index('ix_post_meta_post_id', 'post_id'),
+        Index('ix_post_meta_meta_key', 'meta_key'),
+    )
     meta_id = Column(Integer, primary_key=True, autoincrement=True)
     post_id = Column(Integer, ForeignKey('posts.post_id'))
     meta_key = Column(String)
@@ -70,6 +93,9 @@ class PostMeta(Base):
 
 class Comment(Base):
     __tablename__ = 'comments'
+    __table_args__ = (
+        Index('ix_comments_post_id', 'post_id'),
+    )
     comment_id = Column(Integer, primary_key=True)
     post_id = Column(Integer, ForeignKey('posts.post_id'))
     comment_author = Column(String)
@@ -88,6 +114,9 @@ class Comment(Base):
 
 class ExternalLink(Base):
     __tablename__ = 'external_links'
+    __table_args__ = (
+        Index('ix_external_links_source_post_id', 'source_post_id'),
+    )
     link_id = Column(Integer, primary_key=True, autoincrement=True)
     source_post_id = Column(Integer, ForeignKey('posts.post_id'))
     source_post_title = Column(String)
@@ -95,6 +124,29 @@ class ExternalLink(Base):
 
     post = relationship("Post", back_populates="external_links")
 
+class InternalLink(Base):
+    __tablename__ = 'internal_links'
+    __table_args__ = (
+        Index('ix_internal_links_target_post_id', 'target_post_id'),
+    )
+    source_post_id = Column(Integer, ForeignKey('posts.post_id'), primary_key=True)
+    target_post_id = Column(Integer, ForeignKey('posts.post_id'), primary_key=True)
+    link_count = Column(Integer, default=1)
+
+    source_post = relationship("Post", foreign_keys=[source_post_id], back_populates="outgoing_internal_links")
+    target_post = relationship("Post", foreign_keys=[target_post_id], back_populates="incoming_internal_links")
+
+class LinkMetric(Base):
+    __tablename__ = 'link_metrics'
+    post_id = Column(Integer, ForeignKey('posts.post_id'), primary_key=True)
+    pagerank = Column(Float)
+    in_degree = Column(Integer, default=0)
+    out_degree = Column(Integer, default=0)
+    is_orphan = Column(Boolean, default=False)  # No internal links point to this post
+    is_dead_end = Column(Boolean, default=False)  # This post links to no other post
+
+    post = relationship("Post", back_populates="link_metrics")
+
 class SiteInfo(Base):
     __tablename__ = 'site_info'
     key = Column(String, primary_key=True)
@@ -103,8 +155,25 @@ class SiteInfo(Base):
     def __repr__(self):
         return f"<SiteInfo(key='{self.key}', value='{self.value[:50]}...')>"
 
+class SiteStat(Base):
+    __tablename__ = 'site_stats'
+    # Dashboard figures written at the end of each import (see src/site_stats.py); value is JSON
+    key = Column(String, primary_key=True)
+    value = Column(Text)
+
 class Post(Base):
     __tablename__ = 'posts'
+    # Shaped after the Flask routes: /posts and /pages filter on post_type and sort by post_date,
+    # /internal_link_rankings sorts posts and pages together by internal_backlink_count,
+    # /analysis groups by status and joins authors on creator.
+    # The same indexes are built by the importer (SECONDARY_INDEXES in wordpress_xml_parser).
+    __table_args__ = (
+        Index('ix_posts_post_type_post_date', 'post_type', 'post_date'),
+        Index('ix_posts_post_type_internal_backlink_count', 'post_type', 'internal_backlink_count'),
+        Index('ix_posts_internal_backlink_count_post_type', 'internal_backlink_count', 'post_type'),
+        Index('ix_posts_post_type_status', 'post_type', 'status'),
+        Index('ix_posts_creator_post_type', 'creator', 'post_type'),
+    )
     post_id = Column(Integer, primary_key=True)
     title = Column(String)
     link = Column(String)
@@ -130,6 +199,8 @@ class Post(Base):
     seo_description = Column(Text)
     seo_keywords = Column(Text)
     internal_backlink_count = Column(Integer, default=0)
+    post_modified = Column(String)
+    attachment_url = Column(String)
 
     author = relationship("Author", back_populates="posts", foreign_keys=[creator], primaryjoin="Author.login == Post.creator")
     post_categories = relationship("PostCategory", back_populates="post", cascade="all, delete-orphan")
@@ -137,13 +208,67 @@ class Post(Base):
     post_meta = relationship("PostMeta", back_populates="post", cascade="all, delete-orphan")
     comments = relationship("Comment", back_populates="post", cascade="all, delete-orphan")
     external_links = relationship("ExternalLink", back_populates="post", cascade="all, delete-orphan")
+    outgoing_internal_links = relationship("InternalLink", back_populates="source_post", foreign_keys="InternalLink.source_post_id", cascade="all, delete-orphan")
+    incoming_internal_links = relationship("InternalLink", back_populates="target_post", foreign_keys="InternalLink.target_post_id")
+    link_metrics = relationship("LinkMetric", back_populates="post", uselist=False, cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<Post(title='{self.title}', type='{self.post_type}')>"
 
+# The FTS5 search index is created by src.search_index, not by create_all,
+# so it lives on its own MetaData and is only used for querying
+post_search = Table(
+    SEARCH_TABLE, MetaData(),
+    Column('rowid', Integer, primary_key=True),
+    *[Column(name, Text) for name in SEARCH_COLUMNS]
+)
+
+def add_missing_columns(engine):
+    """create_all only creates missing tables; this adds model columns missing from existing ones."""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+
+def add_missing_indexes(engine):
+    """Creates model indexes missing from existing tables, e.g. on databases built before they were defined."""
+    created = False
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=engine, checkfirst=True)
+                created = True
+    if created:
+        # Fresh statistics let SQLite choose between the composite indexes
+        with engine.begin() as conn:
+            conn.execute(text('ANALYZE'))
+
+def add_search_index(engine):
+    """Creates (and on first use fills) the posts_fts search index; returns False if FTS5 is unavailable."""
+    conn = engine.raw_connection()
+    try:
+        enabled = create_search_index(conn)
+        conn.commit()
+    finally:
+        conn.close()
+    return enabled
+
 def create_database(db_path):
     engine = create_engine(f'sqlite:///{db_path}')
     Base.metadata.create_all(engine)
+    add_missing_columns(engine)
+    add_missing_indexes(engine)
+    add_search_index(engine)
     return engine
 
 if __name__ == '__main__':
@@ -0,0 +1,189 @@
+import argparse
+import contextlib
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from src.batch_writer import DEFAULT_BATCH_SIZE
+from src.wordpress_xml_parser import PARSER_BACKENDS, parse_wordpress_xml
+
+# --- Multi-Site Imports ---
+# Imports a manifest of sites, each export into its own database, side by side in a process
+# pool. Sites share no database, so unlike the single-writer ImportQueue they do not wait on
+# each other, and the wall time approaches that of the largest site instead of the sum.
+#
+# The manifest is a JSON list of sites (or {"sites": [...]}):
+#   [{"xml_file": "exports/site-a.xml.gz", "domain": "site-a.com", "db": "dbs/site-a.db"}, ...]
+# A site may add "name" (defaults to the database file name) and "options", passed to
+# parse_wordpress_xml over the command-line defaults. Relative paths are taken from the
+# manifest's directory.
+DEFAULT_RESULTS_FILE = 'multi_site_results.json'
+DEFAULT_LOG_DIR = 'multi_site_logs'
+
+SITE_KEYS = ('xml_file', 'domain', 'db')
+
+def now():
+    return datetime.now().isoformat(timespec='seconds')
+
+def load_manifest(manifest_path):
+    """The sites of a manifest, with absolute paths, a name and options. Raises ValueError on bad entries."""
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    entries = manifest.get('sites', []) if isinstance(manifest, dict) else manifest
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+
+    sites = []
+    for number, entry in enumerate(entries, start=1):
+        missing = [key for key in SITE_KEYS if not entry.get(key)]
+        if missing:
+            raise ValueError(f"Manifest entry {number} is missing {', '.join(missing)}")
+        db = os.path.normpath(os.path.join(base_dir, entry['db']))
+        sites.append({
+            'name': entry.get('name') or os.path.splitext(os.path.basename(db))[0],
+            'xml_file': os.path.normpath(os.path.join(base_dir, entry['xml_file'])),
+            'domain': entry['domain'],
+            'db': db,
+            'options': entry.get('options') or {},
+        })
+
+    # Two imports into one database would only block each other on SQLite's write lock
+    for key in ('db', 'name'):
+        seen = set()
+        for site in sites:
+            if site[key] in seen:
+                raise ValueError(f"More than one manifest entry uses the {key} {site[key]}")
+            seen.add(site[key])
+    return sites
+
+def import_site(site, options, log_dir):
+    """
+    Worker entry point: imports one site and returns its result dict. The import's output
+    goes to a log file per site, and errors are reported in the result instead of raised.
+    """
+    log_path = os.path.join(log_dir, f"{site['name']}.log")
+    result = {
+        'name': site['name'],
+        'xml_file': site['xml_file'],
+        'domain': site['domain'],
+        'db': site['db'],
+        'input_bytes': os.path.getsize(site['xml_file']) if os.path.exists(site['xml_file']) else None,
+        'log': log_path,
+        'started_at': now(),
+        'error': None,
+        'rows': 0,
+        'tables': {},
+    }
+    started = time.perf_counter()
+    with open(log_path, 'w', encoding='utf-8') as log, contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            stats = parse_wordpress_xml(site['xml_file'], site['db'], site['domain'], **{**options, **site['options']})
+        except Exception as e:
+            traceback.print_exc()
+            result['status'] = 'failed'
+            result['error'] = f"{type(e).__name__}: {e}"
+        else:
+            # None: an incremental import of a file that was already imported
+            result['status'] = 'skipped' if stats is None else 'done'
+            if stats:
+                result['tables'] = {table: table_stats['rows'] for table, table_stats in stats.items()}
+                result['rows'] = sum(result['tables'].values())
+    result['seconds'] = round(time.perf_counter() - started, 3)
+    result['finished_at'] = now()
+    return result
+
+def write_results(results_path, report):
+    # Written after every site, through a temporary file, so a partial report is always readable
+    temp_path = results_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    os.replace(temp_path, results_path)
+
+def run_imports(sites, concurrency=None, options=None, results_path=DEFAULT_RESULTS_FILE, log_dir=DEFAULT_LOG_DIR):
+    """
+    Imports every site with at most `concurrency` imports at a time (default: one per CPU)
+    and writes the per-site timings and row counts to results_path. options are passed to
+    every parse_wordpress_xml call. Returns the report dict.
+
+    The largest exports are started first, so a big site is not left to run alone at the end.
+    Each import may use its own analysis and shard workers (options['workers'],
+    options['shard_workers']); concurrency times those processes then compete for the CPUs.
+    """
+    concurrency = max(1, min(concurrency or os.cpu_count() or 1, len(sites) or 1))
+    options = options or {}
+    os.makedirs(log_dir, exist_ok=True)
+    report = {
+        'started_at': now(),
+        'concurrency': concurrency,
+        'options': options,
+        'sites': [],
+    }
+    ordered = sorted(sites, key=lambda site: os.path.getsize(site['xml_file']) if os.path.exists(site['xml_file']) else 0, reverse=True)
+
+    print(f"Importing {len(sites)} sites, {concurrency} at a time...")
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=concurrency) as executor:
+        futures = {executor.submit(import_site, site, options, log_dir): site for site in ordered}
+        for future in as_completed(futures):
+            site = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker process itself died (killed, out of memory)
+                result = {'name': site['name'], 'xml_file': site['xml_file'], 'domain': site['domain'], 'db': site['db'],
+                          'status': 'failed', 'error': f"{type(e).__name__}: {e}", 'rows': 0, 'tables': {}, 'seconds': None}
+            report['sites'].append(result)
+            print(f"  {result['name']}: {result['status']}, {result['rows']:,} rows"
+                  + (f" in {result['seconds']:.1f}s" if result['seconds'] is not None else '')
+                  + (f" ({result['error']})" if result['error'] else ''))
+            write_results(results_path, report)
+
+    site_seconds = [result['seconds'] for result in report['sites'] if result['seconds'] is not None]
+    report['finished_at'] = now()
+    report['wall_seconds'] = round(time.perf_counter() - started, 3)
+    report['sum_site_seconds'] = round(sum(site_seconds), 3)
+    report['max_site_seconds'] = max(site_seconds, default=0)
+    report['statuses'] = {status: sum(1 for result in report['sites'] if result['status'] == status)
+                          for status in ('done', 'skipped', 'failed')}
+    write_results(results_path, report)
+
+    print(f"Done in {report['wall_seconds']:.1f}s (sites took {report['sum_site_seconds']:.1f}s in total, "
+          f"the longest {report['max_site_seconds']:.1f}s): {report['statuses']['done']} imported, "
+          f"{report['statuses']['skipped']} unchanged, {report['statuses']['failed']} failed.")
+    print(f"Results written to {results_path}, logs in {log_dir}")
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Import the WordPress exports of several sites in parallel, each into its own SQLite database.")
+    parser.add_argument('manifest', help="JSON list of {\"xml_file\", \"domain\", \"db\"} entries")
+    parser.add_argument('--concurrency', type=int, default=None, help="Imports running at once (default: CPU count)")
+    parser.add_argument('--results', default=DEFAULT_RESULTS_FILE, help="JSON file for the per-site timings and row counts")
+    parser.add_argument('--log-dir', default=DEFAULT_LOG_DIR, help="Directory for the per-site import logs")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Rows per executemany batch")
+    parser.add_argument('--bulk-load', action='store_true', help="Bulk-load mode for every site (fresh databases only)")
+    parser.add_argument('--workers', type=int, default=None, help="Content analysis worker processes per import")
+    parser.add_argument('--shard-workers', type=int, default=None, help="Processes parsing item byte ranges per import")
+    parser.add_argument('--incremental', action='store_true', help="Skip unchanged items and already imported files")
+    parser.add_argument('--backend', choices=PARSER_BACKENDS, default='auto', help="XML parser")
+    parser.add_argument('--resume', action='store_true', help="Continue interrupted imports from their checkpoints")
+    args = parser.parse_args()
+
+    sites = load_manifest(args.manifest)
+    options = {
+        'batch_size': args.batch_size,
+        'bulk_load': args.bulk_load,
+        'workers': args.workers,
+        'shard_workers': args.shard_workers,
+        'incremental': args.incremental,
+        'backend': args.backend,
+        'resume': args.resume,
+    }
+    report = run_imports(sites, args.concurrency, options, args.results, args.log_dir)
+    if report['statuses']['failed']:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    # Run from the repository root: python -m src.multi_site_import sites.json --concurrency 4
+    main()
@@ -0,0 +1,90 @@
+import base64
+import binascii
+import json
+
+from sqlalchemy import and_, false, or_
+
+# --- Keyset Pagination ---
+# A page is found by seeking past the sort values of the last row shown instead of
+# skipping rows with OFFSET, so page 5,000 costs the same as page 1. The order is given as
+# [(column, descending), ...] and must end with a unique, non-NULL column (the primary key)
+# so every row has a distinct position. NULLs sort lowest, as in SQLite, which makes the
+# reversed order (used for "previous" and "last") exactly the forward order read backwards.
+
+def encode_cursor(values):
+    """Opaque URL-safe token for the sort values of a row."""
+    data = json.dumps(list(values), separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+def decode_cursor(token, length):
+    """The sort values in a token from encode_cursor, or None if it is missing or malformed."""
+    if not token:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+    except (ValueError, binascii.Error):
+        return None
+    if not isinstance(values, list) or len(values) != length:
+        return None
+    return values
+
+def reverse_order(order):
+    return [(column, not descending) for column, descending in order]
+
+def _after(order, values):
+    """Single condition for rows strictly after values; only used below the leading column."""
+    if not order:
+        return false()
+    (column, descending), value = order[0], values[0]
+    if value is None:
+        beyond = false() if descending else column.isnot(None)
+        equal = column.is_(None)
+    else:
+        beyond = or_(column < value, column.is_(None)) if descending else column > value
+        equal = column == value
+    return or_(beyond, and_(equal, _after(order[1:], values[1:])))
+
+def seek_conditions(order, values):
+    """
+    Conditions that together select the rows after values, in order. Each one bounds the
+    leading column with a plain range, so SQLite can seek in an index on it; the NULL block
+    is a separate segment because "x < ? OR x IS NULL" would turn the seek into a scan.
+    """
+    (column, descending), value = order[0], values[0]
+    rest = _after(order[1:], values[1:])
+    if value is None:
+        ties = and_(column.is_(None), rest)
+        return [ties] if descending else [ties, column.isnot(None)]
+    if descending:
+        return [and_(column <= value, or_(column < value, rest)), column.is_(None)]
+    return [and_(column >= value, or_(column > value, rest))]
+
+def fetch_keyset(query, order, per_page, after=None):
+    """
+    Up to per_page rows of query following the row whose sort values are `after`
+    (the first page when None). Returns (rows, has_more).
+    """
+    order_by = [column.desc() if descending else column.asc() for column, descending in order]
+    segments = seek_conditions(order, after) if after is not None else [None]
+
+    rows = []
+    for condition in segments:
+        segment = query if condition is None else query.filter(condition)
+        # One extra row tells whether there is a next page
+        rows.extend(segment.order_by(*order_by).limit(per_page + 1 - len(rows)).all())
+        if len(rows) > per_page:
+            break
+    return rows[:per_page], len(rows) > per_page
+
+def keyset_page(query, order, per_page, after=None, before=None, last=False):
+    """
+    One page of query in keyset order. `after` and `before` are decoded cursors; `last`
+    asks for the final page. Returns (rows, has_previous, has_next), where the has_ flags
+    are True when they are known to exist (a page reached by "previous" always has a next page).
+    """
+    if before is not None or last:
+        rows, has_more = fetch_keyset(query, reverse_order(order), per_page, before)
+        rows.reverse()
+        return rows, has_more, before is not None
+    rows, has_more = fetch_keyset(query, order, per_page, after)
+    return rows, after is not None, has_more
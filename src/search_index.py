@@ -0,0 +1,102 @@
+import html
+import re
+import sqlite3
+
+# --- Full-Text Search Index ---
+# posts_fts holds a tag-stripped copy of every post and page, keyed by rowid = post_id.
+# Column order matters: BM25_WEIGHTS follows it.
+SEARCH_TABLE = 'posts_fts'
+SEARCH_COLUMNS = ('title', 'content', 'excerpt', 'seo')
+SEARCH_POST_TYPES = ('post', 'page')
+
+# Title and SEO matches rank above matches deep in the content
+BM25_WEIGHTS = (10.0, 1.0, 2.0, 5.0)
+# -1 lets FTS5 take the snippet from whichever column matched best
+SNIPPET_COLUMN = -1
+SNIPPET_TOKENS = 16
+# Control characters mark the match in snippets; the Flask app escapes the text and turns them into <mark>
+SNIPPET_START = '\x02'
+SNIPPET_END = '\x03'
+
+CREATE_SEARCH_TABLE_SQL = f'''
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        {', '.join(SEARCH_COLUMNS)},
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+'''
+UPSERT_SEARCH_ROW_SQL = f'INSERT OR REPLACE INTO {SEARCH_TABLE} (rowid, {", ".join(SEARCH_COLUMNS)}) VALUES (?, ?, ?, ?, ?)'
+DELETE_SEARCH_ROW_SQL = f'DELETE FROM {SEARCH_TABLE} WHERE rowid = ?'
+
+wordpress_block_comment_pattern = re.compile(r'<!--.*?-->', re.DOTALL)
+script_style_pattern = re.compile(r'<(script|style)\b.*?</\1\s*>', re.DOTALL | re.IGNORECASE)
+html_tag_pattern = re.compile(r'<[^>]+>')
+whitespace_pattern = re.compile(r'\s+')
+query_token_pattern = re.compile(r'\w+', re.UNICODE)
+
+def strip_tags(html_content):
+    """Plain text of an HTML fragment: comments, scripts and tags removed, entities decoded, whitespace collapsed."""
+    if not html_content:
+        return ''
+    text = wordpress_block_comment_pattern.sub(' ', html_content)
+    text = script_style_pattern.sub(' ', text)
+    text = html_tag_pattern.sub(' ', text)
+    return whitespace_pattern.sub(' ', html.unescape(text)).strip()
+
+def search_row(title, content_html, excerpt_html, seo_title, seo_description, seo_keywords):
+    """The (title, content, excerpt, seo) values stored in posts_fts for one post."""
+    seo = ' '.join(value for value in (seo_title, seo_description, seo_keywords) if value)
+    return (strip_tags(title), strip_tags(content_html), strip_tags(excerpt_html), seo)
+
+def fts5_available(conn):
+    """True if this SQLite build has the FTS5 extension."""
+    try:
+        conn.execute('CREATE VIRTUAL TABLE IF NOT EXISTS temp.fts5_probe USING fts5(probe)')
+        conn.execute('DROP TABLE temp.fts5_probe')
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+def search_table_exists(conn):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (SEARCH_TABLE,)).fetchone() is not None
+
+def create_search_index(conn):
+    """
+    Creates posts_fts if FTS5 is available and returns whether search indexing is enabled.
+    A database imported before the index existed gets it filled from the posts table.
+    """
+    if search_table_exists(conn):
+        return True
+    if not fts5_available(conn):
+        print("SQLite was built without FTS5; full-text search is disabled and search falls back to LIKE.")
+        return False
+    conn.execute(CREATE_SEARCH_TABLE_SQL)
+    rebuild_search_index(conn)
+    return True
+
+def rebuild_search_index(conn, batch_size=1000):
+    """Refills posts_fts from the posts table."""
+    conn.execute(f'DELETE FROM {SEARCH_TABLE}')
+    placeholders = ', '.join('?' for _ in SEARCH_POST_TYPES)
+    cursor = conn.execute(f'''
+        SELECT post_id, title, COALESCE(cleaned_html_source, content_encoded), excerpt_encoded,
+               seo_title, seo_description, seo_keywords
+        FROM posts
+        WHERE post_type IN ({placeholders})
+    ''', SEARCH_POST_TYPES)
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        conn.executemany(UPSERT_SEARCH_ROW_SQL, [(row[0],) + search_row(*row[1:]) for row in rows])
+
+def match_expression(search_query):
+    """
+    Turns free text from the search box into an FTS5 MATCH expression: every word must
+    appear, the last one as a prefix. Returns None when there is nothing to search for.
+    """
+    tokens = query_token_pattern.findall(search_query or '')
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
@@ -0,0 +1,73 @@
+import json
+
+# --- Site Statistics ---
+# The dashboard (/) and /analysis figures, computed once at the end of an import and
+# stored as JSON values in site_stats, so the pages load them with a single read.
+SITE_STATS_QUERIES = {
+    'total_posts': "SELECT COUNT(*) FROM posts WHERE post_type = 'post'",
+    'total_pages': "SELECT COUNT(*) FROM posts WHERE post_type = 'page'",
+    'total_authors': "SELECT COUNT(*) FROM authors",
+    'total_categories': "SELECT COUNT(*) FROM categories",
+    'total_tags': "SELECT COUNT(*) FROM tags",
+    'total_external_links': "SELECT COUNT(*) FROM external_links",
+    'total_comments': "SELECT COALESCE(SUM(comment_count), 0) FROM posts WHERE post_type IN ('post', 'page')",
+    'total_attachments': "SELECT COUNT(*) FROM posts WHERE post_type = 'attachment'",
+}
+
+SITE_STATS_LISTS = {
+    'posts_by_status': "SELECT status, COUNT(status) FROM posts WHERE post_type = 'post' GROUP BY status",
+    'pages_by_status': "SELECT status, COUNT(status) FROM posts WHERE post_type = 'page' GROUP BY status",
+    'top_authors': '''
+        SELECT a.display_name, COUNT(p.post_id)
+        FROM authors a
+        JOIN posts p ON a.login = p.creator
+        WHERE p.post_type = 'post'
+        GROUP BY a.display_name
+        ORDER BY COUNT(p.post_id) DESC
+        LIMIT 5
+    ''',
+    'top_categories': '''
+        SELECT c.name, COUNT(pc.post_id)
+        FROM categories c
+        JOIN post_categories pc ON c.term_id = pc.category_term_id
+        GROUP BY c.name
+        ORDER BY COUNT(pc.post_id) DESC
+        LIMIT 5
+    ''',
+    'top_tags': '''
+        SELECT t.name, COUNT(pt.post_id)
+        FROM tags t
+        JOIN post_tags pt ON t.term_id = pt.tag_term_id
+        GROUP BY t.name
+        ORDER BY COUNT(pt.post_id) DESC
+        LIMIT 5
+    ''',
+}
+
+def compute_site_stats(conn):
+    """Runs every site statistic query on a DB-API connection; returns {key: value}."""
+    cursor = conn.cursor()
+    stats = {}
+    for key, sql in SITE_STATS_QUERIES.items():
+        cursor.execute(sql)
+        stats[key] = cursor.fetchone()[0]
+    for key, sql in SITE_STATS_LISTS.items():
+        cursor.execute(sql)
+        stats[key] = [list(row) for row in cursor.fetchall()]
+    return stats
+
+def refresh_site_stats(conn):
+    """Recomputes the statistics and replaces the site_stats rows (the caller commits)."""
+    stats = compute_site_stats(conn)
+    cursor = conn.cursor()
+    cursor.execute('DELETE FROM site_stats')
+    cursor.executemany('INSERT INTO site_stats (key, value) VALUES (?, ?)',
+                       [(key, json.dumps(value)) for key, value in stats.items()])
+    return stats
+
+def load_site_stats(rows):
+    """Decodes (key, value) rows read from site_stats; None when the table has not been filled yet."""
+    stats = {key: json.loads(value) for key, value in rows}
+    if not all(key in stats for key in list(SITE_STATS_QUERIES) + list(SITE_STATS_LISTS)):
+        return None
+    return stats
@@ -0,0 +1,127 @@
+import argparse
+import csv
+import os
+import sqlite3
+import time
+
+# --- Reports built from the imported database ---
+# Each report mirrors the CSV of the legacy/python script with the same file name,
+# but reads the SQLite store instead of the XML export. Rows come out in post_id order.
+REPORTS = {
+    'content_audit': {
+        'filename': 'content_audit.csv',
+        'header': ['Title', 'Type', 'Status', 'Date'],
+        'sql': '''
+            SELECT title, post_type, status, pub_date
+            FROM posts
+            WHERE post_type IN ('post', 'page')
+            ORDER BY post_id
+        ''',
+    },
+    'seo_audit': {
+        'filename': 'seo_audit.csv',
+        'header': ['Post Title', 'SEO Title', 'SEO Description', 'SEO Keywords'],
+        'sql': '''
+            SELECT title, seo_title, seo_description, seo_keywords
+            FROM posts
+            WHERE post_type = 'post'
+            ORDER BY post_id
+        ''',
+    },
+    'media_library': {
+        'filename': 'media_library_list.csv',
+        'header': ['Filename', 'File Type', 'Upload Date', 'Original URL'],
+        # Databases imported before attachment_url existed fall back to the guid,
+        # which WordPress sets to the file URL for attachments
+        'sql': '''
+            SELECT title, COALESCE(attachment_url, guid), pub_date
+            FROM posts
+            WHERE post_type = 'attachment'
+            ORDER BY post_id
+        ''',
+        'row': lambda title, url, pub_date: [
+            title,
+            url.split('.')[-1] if url and '.' in url else "Unknown",
+            pub_date,
+            url or "No URL Found",
+        ],
+    },
+    'category_stats': {
+        'filename': 'category_stats.csv',
+        'header': ['Category Name', 'Post Count'],
+        'sql': '''
+            SELECT c.name, COUNT(*) AS post_count
+            FROM post_categories pc
+            JOIN categories c ON c.term_id = pc.category_term_id
+            JOIN posts p ON p.post_id = pc.post_id
+            WHERE p.post_type = 'post'
+            GROUP BY c.term_id
+            ORDER BY post_count DESC, MIN(p.post_id)
+        ''',
+    },
+    'posts_by_last_updated': {
+        'filename': 'posts_by_last_updated.csv',
+        'header': ['Title', 'Original Publish Date', 'Last Modified Date'],
+        'sql': '''
+            SELECT title, post_date, post_modified
+            FROM posts
+            WHERE post_type = 'post' AND status = 'publish'
+            ORDER BY post_id
+        ''',
+    },
+}
+
+def write_report(conn, name, output_dir='.'):
+    """
+    Runs one report query and streams its rows straight from the cursor into the CSV,
+    so memory use does not grow with the size of the site. Returns the number of rows written.
+    """
+    report = REPORTS[name]
+    output_path = os.path.join(output_dir, report['filename'])
+    make_row = report.get('row')
+
+    cursor = conn.execute(report['sql'])
+    row_count = 0
+    with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(report['header'])
+        for row in cursor:
+            writer.writerow(make_row(*row) if make_row else row)
+            row_count += 1
+    return row_count
+
+def generate_reports(db_path, names=None, output_dir='.'):
+    """Writes the selected reports (all of them by default) from the database at db_path."""
+    if not os.path.exists(db_path):
+        print(f"Error: The database '{db_path}' was not found. Import an export with wordpress_xml_parser first.")
+        return
+
+    os.makedirs(output_dir, exist_ok=True)
+    # Read-only, so a report can run next to the Flask app without locking the database
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    try:
+        for name in names or REPORTS:
+            started = time.perf_counter()
+            try:
+                row_count = write_report(conn, name, output_dir)
+            except sqlite3.OperationalError as e:
+                # Typically a database imported by an older version; re-importing adds the missing columns
+                print(f"Skipped {name}: {e}. Re-import the export to update the database.")
+                continue
+            filename = REPORTS[name]['filename']
+            print(f"{filename}: {row_count} rows in {time.perf_counter() - started:.3f}s")
+    finally:
+        conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the audit CSV reports from an imported WordPress SQLite database.")
+    parser.add_argument('db_path', nargs='?', default='wordpress_extracted_data.db', help="SQLite database written by wordpress_xml_parser")
+    parser.add_argument('--reports', nargs='+', choices=sorted(REPORTS), help="Reports to build (default: all)")
+    parser.add_argument('--output-dir', default='.', help="Directory the CSV files are written to")
+    args = parser.parse_args()
+
+    generate_reports(args.db_path, args.reports, args.output_dir)
+
+if __name__ == "__main__":
+    # Run from the repository root: python -m src.sqlite_reports wordpress_extracted_data.db
+    main()
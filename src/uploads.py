@@ -0,0 +1,217 @@
+import bz2
+import hashlib
+import lzma
+import os
+import re
+import sqlite3
+import tempfile
+import zipfile
+import zlib
+
+from src.wxr_input import MAGIC_LENGTH, detect_compression, zip_export_member
+
+# --- Streaming Uploads ---
+# An uploaded export is written to disk once, as it arrives, instead of being spooled to a
+# temporary file and copied. The XML is hashed on the way through, so the importer does not
+# read the file again to find out whether it was already imported.
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# The root <rss> element and the channel header (wxr_version) sit in the first few KB
+SNIFF_BYTES = 64 * 1024
+
+# zlib wbits for a gzip header and trailer
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+# Streaming decompressors for each compressed format; each object reads a single member or stream
+DECOMPRESSORS = {
+    'gzip': lambda: zlib.decompressobj(GZIP_WBITS),
+    'bz2': bz2.BZ2Decompressor,
+    'xz': lzma.LZMADecompressor,
+}
+# Errors of broken compressed data (bz2 raises OSError)
+DECOMPRESS_ERRORS = (zlib.error, lzma.LZMAError, OSError)
+
+WXR_NAMESPACE_PREFIX = 'http://wordpress.org/export/'
+NAMESPACE_PATTERN = re.compile(rb'xmlns:([\w.-]+)\s*=\s*["\']([^"\']*)["\']')
+WXR_VERSION_PATTERN = re.compile(rb'<wp:wxr_version>\s*([^<\s]+)\s*</wp:wxr_version>')
+
+class UploadError(Exception):
+    """The upload cannot be read as an export (broken archive, no XML member)."""
+
+def sniff_wxr(head):
+    """
+    The namespaces and WXR version declared in the first bytes of an export, as
+    {'wxr_version': ..., 'namespaces': {prefix: uri}}, or None if it is not a WordPress export.
+    """
+    root_start = head.find(b'<rss')
+    if root_start == -1:
+        return None
+    root_end = head.find(b'>', root_start)
+    root_tag = head[root_start:root_end] if root_end != -1 else head[root_start:]
+    namespaces = {prefix.decode('utf-8', 'replace'): uri.decode('utf-8', 'replace')
+                  for prefix, uri in NAMESPACE_PATTERN.findall(root_tag)}
+    if not namespaces.get('wp', '').startswith(WXR_NAMESPACE_PREFIX):
+        return None
+
+    # <wp:wxr_version> is authoritative; older exports only have the version in the namespace URI
+    match = WXR_VERSION_PATTERN.search(head)
+    if match:
+        wxr_version = match.group(1).decode('utf-8', 'replace')
+    else:
+        wxr_version = namespaces['wp'][len(WXR_NAMESPACE_PREFIX):].strip('/')
+    return {'wxr_version': wxr_version, 'namespaces': namespaces}
+
+def already_imported(db_name, file_hash):
+    """True when an incremental import already recorded this SHA-256 in import_files."""
+    if not os.path.exists(db_name):
+        return False
+    conn = sqlite3.connect(db_name)
+    try:
+        return conn.execute('SELECT 1 FROM import_files WHERE file_hash = ?', (file_hash,)).fetchone() is not None
+    except sqlite3.OperationalError:
+        # No import has run against this database yet
+        return False
+    finally:
+        conn.close()
+
+class UploadSink:
+    """
+    Write-only file that an uploaded file is streamed into chunk by chunk. The first bytes
+    decide the format: gzip, bz2 and xz are decompressed on the fly, a zip archive is stored and its XML
+    member extracted once the upload is complete (zip needs random access), anything else
+    is written as is. The XML is hashed with SHA-256 as it is written and its first
+    SNIFF_BYTES kept for sniff_wxr.
+
+    finish() runs on seek(0), which is how werkzeug marks the end of a file part. Problems
+    with the data are kept in `error` rather than raised, so the view can report them.
+    Files that were not kept with save() are deleted on close().
+    """
+
+    def __init__(self, folder):
+        fd, self.path = tempfile.mkstemp(suffix='.part', dir=folder)
+        self.file = os.fdopen(fd, 'wb')
+        self.folder = folder
+        self.archive_path = None
+        self.compression = None # 'gzip', 'bz2', 'xz', 'zip' or '' for plain XML, set by the first bytes
+        self.decompressor = None
+        self.member_open = False
+        self.pending = b''
+        self.sha256 = hashlib.sha256()
+        self.received = 0 # bytes uploaded
+        self.size = 0 # bytes of XML
+        self.head = b''
+        self.member_name = None
+        self.wxr = None
+        self.error = None
+        self.finished = False
+
+    def write(self, data):
+        self.received += len(data)
+        if self.error is None:
+            try:
+                self._receive(data)
+            except DECOMPRESS_ERRORS as e:
+                self.error = f"The upload could not be decompressed ({e})."
+        return len(data)
+
+    def _receive(self, data):
+        if self.compression is None:
+            # Wait for enough bytes to tell the formats apart
+            self.pending += data
+            if len(self.pending) < MAGIC_LENGTH:
+                return
+            data, self.pending = self.pending, b''
+            self.compression = detect_compression(data) or ''
+            if self.compression in DECOMPRESSORS:
+                self.decompressor = DECOMPRESSORS[self.compression]()
+
+        if self.compression in DECOMPRESSORS:
+            self._decompress(data)
+        elif self.compression == 'zip':
+            self.file.write(data)
+        else:
+            self._write_xml(data)
+
+    def _decompress(self, data):
+        # A .gz, .bz2 or .xz file may hold several members (streams) back to back
+        while data:
+            self.member_open = True
+            self._write_xml(self.decompressor.decompress(data))
+            if not self.decompressor.eof:
+                return
+            self.member_open = False
+            data = self.decompressor.unused_data
+            self.decompressor = DECOMPRESSORS[self.compression]()
+
+    def _write_xml(self, data):
+        if not data:
+            return
+        self.sha256.update(data)
+        self.size += len(data)
+        if len(self.head) < SNIFF_BYTES:
+            self.head += data[:SNIFF_BYTES - len(self.head)]
+        self.file.write(data)
+
+    def _extract_zip(self):
+        self.archive_path = self.path
+        with zipfile.ZipFile(self.archive_path) as archive:
+            member = zip_export_member(archive)
+            if member is None:
+                raise UploadError("The zip archive does not contain an XML file.")
+
+            fd, self.path = tempfile.mkstemp(suffix='.part', dir=self.folder)
+            self.file = os.fdopen(fd, 'wb')
+            with archive.open(member) as xml:
+                for chunk in iter(lambda: xml.read(UPLOAD_CHUNK_SIZE), b''):
+                    self._write_xml(chunk)
+            self.file.close()
+            self.member_name = member.filename
+        os.remove(self.archive_path)
+        self.archive_path = None
+
+    def finish(self):
+        if self.finished:
+            return
+        self.finished = True
+        if self.error is None and self.compression is None:
+            # Shorter than the magic numbers, so certainly not compressed
+            self.compression = ''
+            self._write_xml(self.pending)
+        try:
+            if self.error is None and self.compression in DECOMPRESSORS:
+                if self.compression == 'gzip':
+                    self._write_xml(self.decompressor.flush())
+                if self.member_open:
+                    raise UploadError(f"The {self.compression} upload is truncated.")
+            self.file.close()
+            if self.error is None and self.compression == 'zip':
+                self._extract_zip()
+        except (UploadError, zipfile.BadZipFile) + DECOMPRESS_ERRORS as e:
+            self.error = str(e) if isinstance(e, UploadError) else f"The upload could not be decompressed ({e})."
+        finally:
+            self.file.close()
+        if self.error is None:
+            self.wxr = sniff_wxr(self.head)
+
+    def hexdigest(self):
+        return self.sha256.hexdigest()
+
+    def seek(self, offset, whence=0):
+        self.finish()
+        return 0
+
+    def tell(self):
+        return self.received
+
+    def save(self, destination):
+        """Moves the finished XML file to destination; it is then kept on close()."""
+        self.finish()
+        os.replace(self.path, destination)
+        self.path = None
+
+    def close(self):
+        self.file.close()
+        for path in (self.path, self.archive_path):
+            if path and os.path.exists(path):
+                os.remove(path)
+        self.path = None
+        self.archive_path = None
@@ -1,8 +1,28 @@
 import xml.etree.ElementTree as ET
+import argparse
+import hashlib
+import io
+import json
 import os
-import re
 import sqlite3
-from urllib.parse import urlparse
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from src.batch_writer import BatchWriter, DEFAULT_BATCH_SIZE
+from src.checkpoints import (clear_checkpoint, load_checkpoint, matches_checkpoint, phase_index,
+                             save_checkpoint, start_checkpoint)
+from src.content_analysis import analyze_records, find_internal_link_paths, normalize_url_path
+from src.link_graph import refresh_link_metrics
+from src.search_index import DELETE_SEARCH_ROW_SQL, create_search_index
+from src.site_stats import refresh_site_stats
+from src.wxr_input import WXRInput, is_plain_file, plan_item_shards
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:  # lxml is optional; the ElementTree path gives the same records, only slower
+    lxml_etree = None
 
 # --- XML Namespaces ---
 NAMESPACES = {
@@ -12,11 +32,75 @@ NAMESPACES = {
     'dc': 'http://purl.org/dc/elements/1.1/',
 }
 
-def register_all_namespaces(filename):
-    """Register namespaces found in the XML to handle them gracefully."""
-    for event, elem in ET.iterparse(filename, events=('start-ns',)):
-        prefix, uri = elem
-        NAMESPACES[prefix] = uri
+# --- Secondary Indexes ---
+# Built after the tables are loaded when importing in bulk-load mode.
+# Names match the Index definitions on the models in src/models.py.
+SECONDARY_INDEXES = {
+    'ix_authors_login': 'CREATE INDEX IF NOT EXISTS ix_authors_login ON authors (login)',
+    'ix_categories_nicename': 'CREATE INDEX IF NOT EXISTS ix_categories_nicename ON categories (nicename)',
+    'ix_categories_name': 'CREATE INDEX IF NOT EXISTS ix_categories_name ON categories (name)',
+    'ix_tags_nicename': 'CREATE INDEX IF NOT EXISTS ix_tags_nicename ON tags (nicename)',
+    'ix_tags_name': 'CREATE INDEX IF NOT EXISTS ix_tags_name ON tags (name)',
+    'ix_posts_post_type_post_date': 'CREATE INDEX IF NOT EXISTS ix_posts_post_type_post_date ON posts (post_type, post_date)',
+    'ix_posts_post_type_internal_backlink_count': 'CREATE INDEX IF NOT EXISTS ix_posts_post_type_internal_backlink_count ON posts (post_type, internal_backlink_count)',
+    'ix_posts_internal_backlink_count_post_type': 'CREATE INDEX IF NOT EXISTS ix_posts_internal_backlink_count_post_type ON posts (internal_backlink_count, post_type)',
+    'ix_posts_post_type_status': 'CREATE INDEX IF NOT EXISTS ix_posts_post_type_status ON posts (post_type, status)',
+    'ix_posts_creator_post_type': 'CREATE INDEX IF NOT EXISTS ix_posts_creator_post_type ON posts (creator, post_type)',
+    'ix_post_categories_category_term_id': 'CREATE INDEX IF NOT EXISTS ix_post_categories_category_term_id ON post_categories (category_term_id)',
+    'ix_post_tags_tag_term_id': 'CREATE INDEX IF NOT EXISTS ix_post_tags_tag_term_id ON post_tags (tag_term_id)',
+    'ix_post_meta_post_id': 'CREATE INDEX IF NOT EXISTS ix_post_meta_post_id ON post_meta (post_id)',
+    'ix_post_meta_meta_key': 'CREATE INDEX IF NOT EXISTS ix_post_meta_meta_key ON post_meta (meta_key)',
+    'ix_comments_post_id': 'CREATE INDEX IF NOT EXISTS ix_comments_post_id ON comments (post_id)',
+    'ix_external_links_source_post_id': 'CREATE INDEX IF NOT EXISTS ix_external_links_source_post_id ON external_links (source_post_id)',
+    'ix_internal_links_target_post_id': 'CREATE INDEX IF NOT EXISTS ix_internal_links_target_post_id ON internal_links (target_post_id)',
+    'ix_unresolved_internal_links_path': 'CREATE INDEX IF NOT EXISTS ix_unresolved_internal_links_path ON unresolved_internal_links (path)',
+}
+
+# --- Connection Settings ---
+# Bulk-load mode trades crash safety for speed: no rollback journal, no fsync and a
+# large page cache, with the whole import running in a single transaction.
+BULK_LOAD_PRAGMAS = [
+    ('journal_mode', 'OFF'),
+    ('synchronous', 'OFF'),
+    ('cache_size', '-262144'),  # 256 MB
+    ('temp_store', 'MEMORY'),
+]
+SAFE_PRAGMAS = [
+    ('journal_mode', 'DELETE'),
+    ('synchronous', 'FULL'),
+    ('cache_size', '-2000'),
+    ('temp_store', 'DEFAULT'),
+]
+
+# Items between two calls of the progress callback passed to parse_wordpress_xml
+PROGRESS_INTERVAL = 500
+
+# Columns added after a table was first released; older databases get them with ALTER TABLE
+ADDED_COLUMNS = {
+    'posts': [
+        ('post_modified', 'TEXT'),
+        ('attachment_url', 'TEXT'),
+    ],
+}
+
+def apply_pragmas(conn, pragmas):
+    """Applies a list of (name, value) PRAGMA settings to the connection."""
+    for name, value in pragmas:
+        conn.execute(f"PRAGMA {name} = {value}")
+
+def create_secondary_indexes(cursor):
+    """Creates the secondary indexes that are missing."""
+    for create_sql in SECONDARY_INDEXES.values():
+        cursor.execute(create_sql)
+
+def drop_secondary_indexes(cursor):
+    """Drops the secondary indexes so a bulk load does not maintain them row by row."""
+    for index_name in SECONDARY_INDEXES:
+        cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+def register_namespace(prefix, uri):
+    """Records a namespace declaration, keeping the standard WXR prefixes available."""
+    NAMESPACES[prefix] = uri
     # Add any missing standard ones
     if 'wp' not in NAMESPACES:
         NAMESPACES['wp'] = 'http://wordpress.org/export/1.2/'
@@ -27,40 +111,619 @@ def register_all_namespaces(filename):
     if 'dc' not in NAMESPACES:
         NAMESPACES['dc'] = 'http://purl.org/dc/elements/1.1/'
 
-def get_tag_text(element, tag_name, namespace_prefix=''):
-    """Helper to get text from a tag, handling namespaces and CDATA."""
-    full_tag = f"{{{NAMESPACES.get(namespace_prefix, '')}}}{tag_name}"
-    node = element.find(full_tag)
-    if node is not None and node.text:
-        return node.text.strip()
+def register_all_namespaces(source):
+    """
+    Register namespaces found in the XML to handle them gracefully.
+    WXR declares all of them on the root <rss> element, so reading stops at the root start tag.
+    source is a path or binary file object, plain or compressed (see WXRInput).
+    """
+    with WXRInput(source) as wxr:
+        for event, elem in ET.iterparse(wxr.stream, events=('start-ns', 'start')):
+            if event == 'start':
+                break
+            prefix, uri = elem
+            register_namespace(prefix, uri)
+
+# --- Field Schemas ---
+# (record field, namespace prefix, tag, conversion) for the child elements each record is
+# read from. CompiledFields turns a schema into a {Clark name: position} lookup once the
+# export's namespaces are known, so an element's children are walked once, dispatching on
+# tag, instead of one find() per field. As with find(), the first child of a name wins.
+
+def int_or_zero(text):
+    return int(text or 0)
+
+AUTHOR_FIELDS = [
+    ('author_id', 'wp', 'author_id', int),
+    ('login', 'wp', 'author_login', None),
+    ('email', 'wp', 'author_email', None),
+    ('display_name', 'wp', 'author_display_name', None),
+    ('first_name', 'wp', 'author_first_name', None),
+    ('last_name', 'wp', 'author_last_name', None),
+]
+
+CATEGORY_FIELDS = [
+    ('term_id', 'wp', 'term_id', int),
+    ('nicename', 'wp', 'category_nicename', None),
+    ('parent', 'wp', 'category_parent', None),
+    ('name', 'wp', 'cat_name', None),
+    ('description', 'wp', 'category_description', None),
+]
+
+# tag_slug is only a fallback for a missing tag_nicename (see _tag_record)
+TAG_FIELDS = [
+    ('term_id', 'wp', 'term_id', int),
+    ('nicename', 'wp', 'tag_nicename', None),
+    ('name', 'wp', 'tag_name', None),
+    ('description', 'wp', 'tag_description', None),
+    ('tag_slug', 'wp', 'tag_slug', None),
+]
+
+COMMENT_FIELDS = [
+    ('comment_id', 'wp', 'comment_id', int),
+    ('comment_author', 'wp', 'comment_author', None),
+    ('comment_author_email', 'wp', 'comment_author_email', None),
+    ('comment_author_url', 'wp', 'comment_author_url', None),
+    ('comment_author_ip', 'wp', 'comment_author_ip', None),
+    ('comment_date', 'wp', 'comment_date', None),
+    ('comment_date_gmt', 'wp', 'comment_date_gmt', None),
+    ('comment_content', 'wp', 'comment_content', None),
+    ('comment_approved', 'wp', 'comment_approved', None),
+    ('comment_type', 'wp', 'comment_type', None),
+    ('comment_parent', 'wp', 'comment_parent', int_or_zero),
+    ('comment_user_id', 'wp', 'comment_user_id', int_or_zero),
+]
+
+META_FIELDS = [
+    ('meta_key', 'wp', 'meta_key', None),
+    ('meta_value', 'wp', 'meta_value', None),
+]
+
+ITEM_FIELDS = [
+    ('post_id', 'wp', 'post_id', int),
+    ('post_type', 'wp', 'post_type', None),
+    ('title', '', 'title', None),
+    ('link', '', 'link', None),
+    ('pub_date', '', 'pubDate', None),
+    ('creator', 'dc', 'creator', None),
+    ('guid', '', 'guid', None),
+    ('description', '', 'description', None),
+    ('content_encoded', 'content', 'encoded', None),
+    ('excerpt_encoded', 'excerpt', 'encoded', None),
+    ('post_date', 'wp', 'post_date', None),
+    ('post_date_gmt', 'wp', 'post_date_gmt', None),
+    ('post_modified', 'wp', 'post_modified', None),
+    ('comment_status', 'wp', 'comment_status', None),
+    ('ping_status', 'wp', 'ping_status', None),
+    ('post_name', 'wp', 'post_name', None),
+    ('status', 'wp', 'status', None),
+    ('post_parent', 'wp', 'post_parent', int_or_zero),
+    ('menu_order', 'wp', 'menu_order', int_or_zero),
+    ('post_mime_type', 'wp', 'post_mime_type', None),
+    ('comment_count', 'wp', 'comment_count', int_or_zero),
+    ('attachment_url', 'wp', 'attachment_url', None),
+]
+
+# AIOSEO meta is stored on the post row rather than in post_meta
+SEO_META_FIELDS = {
+    '_aioseo_title': 'seo_title',
+    '_aioseo_description': 'seo_description',
+    '_aioseo_keywords': 'seo_keywords',
+}
+
+# Marks a field whose element has not been seen yet
+MISSING = object()
+
+def clark_name(prefix, tag):
+    """The name ElementTree gives tag in the namespace currently registered for prefix."""
+    uri = NAMESPACES.get(prefix, '') if prefix else ''
+    return f"{{{uri}}}{tag}" if uri else tag
+
+class CompiledFields:
+    """A field schema resolved against the registered namespaces."""
+
+    def __init__(self, fields):
+        self.names = [name for name, _, _, _ in fields]
+        self.conversions = [(position, conversion) for position, (_, _, _, conversion) in enumerate(fields) if conversion is not None]
+        self.lookup = {clark_name(prefix, tag): position for position, (_, prefix, tag, _) in enumerate(fields)}
+
+    def convert(self, texts):
+        """Field values from the raw texts: stripped, None when missing or empty, then converted."""
+        values = [text.strip() if text is not MISSING and text else None for text in texts]
+        for position, conversion in self.conversions:
+            values[position] = conversion(values[position])
+        return values
+
+    def read(self, node):
+        """The field values of node, in schema order."""
+        texts = [MISSING] * len(self.names)
+        lookup = self.lookup
+        for child in node:
+            position = lookup.get(child.tag)
+            if position is not None and texts[position] is MISSING:
+                texts[position] = child.text
+        return self.convert(texts)
+
+    def read_dict(self, node):
+        return dict(zip(self.names, self.read(node)))
+
+class WXRSchema:
+    """The field lookups and element names for one export, compiled once its namespaces are known."""
+
+    def __init__(self):
+        self.author_tag = clark_name('wp', 'author')
+        self.category_tag = clark_name('wp', 'category')
+        self.tag_tag = clark_name('wp', 'tag')
+        self.postmeta_tag = clark_name('wp', 'postmeta')
+        self.comment_tag = clark_name('wp', 'comment')
+        self.authors = CompiledFields(AUTHOR_FIELDS)
+        self.categories = CompiledFields(CATEGORY_FIELDS)
+        self.tags = CompiledFields(TAG_FIELDS)
+        self.comments = CompiledFields(COMMENT_FIELDS)
+        self.meta = CompiledFields(META_FIELDS)
+        self.items = CompiledFields(ITEM_FIELDS)
+
+class ItemRecord:
+    """
+    Everything the importer keeps from one <item>, so the element can be discarded before
+    the record is written to SQLite. Slots keep the per-item footprint small; content_hash
+    is stamped on later by hash_items.
+    """
+
+    FIELDS = [field[0] for field in ITEM_FIELDS]
+    # Everything that goes into content_hash
+    HASHED_FIELDS = FIELDS + ['seo_title', 'seo_description', 'seo_keywords', 'terms', 'post_meta', 'comments']
+    __slots__ = HASHED_FIELDS + ['content_hash']
+
+    def __init__(self, values):
+        for name, value in zip(self.FIELDS, values):
+            setattr(self, name, value)
+        self.seo_title = ""
+        self.seo_description = ""
+        self.seo_keywords = ""
+        self.terms = []
+        self.post_meta = []
+        self.comments = []
+        self.content_hash = None
+
+    def as_dict(self):
+        """The hashed fields as a dict (the record format used before ItemRecord)."""
+        return {name: getattr(self, name) for name in self.HASHED_FIELDS}
+
+def _author_record(author_node, schema):
+    """Builds an author row from a <wp:author> element."""
+    return schema.authors.read_dict(author_node)
+
+def _category_record(cat_node, schema):
+    """Builds a category row from a <wp:category> element."""
+    return schema.categories.read_dict(cat_node)
+
+def _tag_record(tag_node, schema):
+    """Builds a tag row from a <wp:tag> element."""
+    record = schema.tags.read_dict(tag_node)
+    # Be more robust in finding the nicename/slug
+    tag_slug = record.pop('tag_slug')
+    if not record['nicename']:
+        record['nicename'] = tag_slug
+    return record
+
+def _item_record(item_node, schema):
+    """
+    Builds an ItemRecord from an <item> element in a single pass over its children:
+    plain fields by tag, postmeta (AIOSEO or generic), terms and comments as they come.
+    """
+    texts = [MISSING] * len(ITEM_FIELDS)
+    item_fields = schema.items.lookup
+    postmeta_tag = schema.postmeta_tag
+    comment_tag = schema.comment_tag
+    seo = {}
+    terms = []
+    post_meta = []
+    comments = []
+
+    for child in item_node:
+        tag = child.tag
+        position = item_fields.get(tag)
+        if position is not None:
+            if texts[position] is MISSING:
+                texts[position] = child.text
+        elif tag == postmeta_tag:
+            key, val = schema.meta.read(child)
+            seo_field = SEO_META_FIELDS.get(key)
+            if seo_field is not None:
+                seo[seo_field] = val
+            else:
+                post_meta.append((key, val))
+        elif tag == 'category':
+            terms.append((child.get('domain'), child.get('nicename'), (child.text or '').strip()))
+        elif tag == comment_tag:
+            comments.append(schema.comments.read_dict(child))
+
+    record = ItemRecord(schema.items.convert(texts))
+    for name, value in seo.items():
+        setattr(record, name, value)
+    record.terms = terms
+    record.post_meta = post_meta
+    record.comments = comments
+    return record
+
+# --- Parser Backends ---
+# 'auto' uses lxml when it is installed and ElementTree otherwise
+PARSER_BACKENDS = ('auto', 'lxml', 'etree')
+
+# The channel children lxml reports; the events of every other element are skipped in C.
+# {*} matches any namespace, as the wp namespace URI differs between WXR versions.
+LXML_RECORD_TAGS = ('item', '{*}author', '{*}category', '{*}tag', 'title', 'description')
+
+def resolve_backend(backend):
+    """'lxml' or 'etree' for a PARSER_BACKENDS name."""
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend {backend!r}; use one of {', '.join(PARSER_BACKENDS)}")
+    if backend == 'auto':
+        return 'lxml' if lxml_etree is not None else 'etree'
+    if backend == 'lxml' and lxml_etree is None:
+        raise ImportError("The lxml parser backend needs lxml: pip install lxml")
+    return backend
+
+def iter_wxr_records(xml_file, backend='auto'):
+    """
+    Streams a WXR file and yields (kind, record) tuples, where kind is 'site_info',
+    'author', 'category', 'tag' or 'item'. Items are ItemRecords; the other records are
+    plain dicts or tuples. Both backends yield the same records.
+
+    Each direct child of <channel> is turned into a plain record and then cleared and
+    detached from the tree, so peak memory stays flat no matter how big the export is.
+    """
+    if resolve_backend(backend) == 'lxml':
+        return _iter_lxml_records(xml_file)
+    return _iter_etree_records(xml_file)
+
+def _channel_record(elem, schema):
+    """The (kind, record) for a direct child of <channel>, or None for elements the importer ignores."""
+    if elem.tag == 'item':
+        return 'item', _item_record(elem, schema)
+    if elem.tag == schema.author_tag:
+        return 'author', _author_record(elem, schema)
+    if elem.tag == schema.category_tag:
+        return 'category', _category_record(elem, schema)
+    if elem.tag == schema.tag_tag:
+        return 'tag', _tag_record(elem, schema)
+    if elem.tag in ('title', 'description'):
+        return 'site_info', (elem.tag, elem.text.strip() if elem.text else None)
     return None
 
-def get_wp_tag_text(element, tag_name):
-    """Helper for WordPress specific tags."""
-    return get_tag_text(element, tag_name, 'wp')
+def _iter_lxml_records(xml_file):
+    """
+    iter_wxr_records on lxml.etree.iterparse. huge_tree lifts libxml2's limits on very
+    large text nodes, and recover=True skips past malformed markup (such as broken CDATA)
+    instead of aborting the import; the errors it recovered from are printed at the end.
+    """
+    schema = None
+    context = lxml_etree.iterparse(xml_file, events=('start-ns', 'end'), tag=LXML_RECORD_TAGS,
+                                   huge_tree=True, recover=True)
+    for event, elem in context:
+        if event == 'start-ns':
+            prefix, uri = elem
+            register_namespace(prefix, uri)
+            continue
+
+        channel = elem.getparent()
+        if channel is None or channel.tag != 'channel':
+            # A title, category, ... inside an item; read with the item
+            continue
+        if schema is None:
+            schema = WXRSchema()
+
+        record = _channel_record(elem, schema)
+        if record is not None:
+            yield record
+
+        elem.clear()
+        # Also drops the channel children lxml did not report (wxr_version, wp:term, ...)
+        while elem.getprevious() is not None:
+            del channel[0]
 
-def normalize_url_path(url):
-    """Strips http/https and trailing slashes to make matching easier for internal links"""
-    if not url: return ""
-    parsed = urlparse(url)
-    # We only care about the path (e.g., /tutorials/git-gitlab/)
-    path = parsed.path.strip("/")
-    return path
+    if len(context.error_log):
+        print(f"Warning: lxml recovered from {len(context.error_log)} XML errors; records near them may be incomplete. "
+              f"First: line {context.error_log[0].line}: {' '.join(context.error_log[0].message.split())}")
 
-def parse_wordpress_xml(xml_file, db_name, your_domain):
+def _iter_etree_records(xml_file):
+    """iter_wxr_records on xml.etree.ElementTree.iterparse."""
+    channel = None
+    depth = 0
+    for event, elem in ET.iterparse(xml_file, events=('start-ns', 'start', 'end')):
+        if event == 'start-ns':
+            # Namespace discovery is folded into this pass instead of a separate pre-scan
+            prefix, uri = elem
+            register_namespace(prefix, uri)
+            continue
+        if event == 'start':
+            depth += 1
+            if depth == 2 and elem.tag == 'channel':
+                channel = elem
+                # Namespaces are known by now, so resolve the Clark names once
+                schema = WXRSchema()
+            continue
+
+        depth -= 1
+        if depth != 2 or channel is None:
+            continue
+
+        # elem is a direct child of <channel> and has been fully parsed
+        record = _channel_record(elem, schema)
+        if record is not None:
+            yield record
+
+        elem.clear()
+        del channel[:]
+
+# --- Sharded Parsing ---
+# With shard_workers > 1 a plain export is split into byte ranges of whole items (see
+# plan_item_shards), and each range is parsed in its own process, wrapped in the export's
+# root element and a <channel>. The channel header is parsed once, here, before any item.
+SHARD_BYTES = 8 * 1024 * 1024
+
+CHANNEL_START = b'<channel>'
+DOCUMENT_END = b'</channel></rss>'
+
+def _parse_shard(xml_file, start, end, root_context, backend):
+    """Worker entry point: the ItemRecords in xml_file[start:end]."""
+    with open(xml_file, 'rb') as f:
+        f.seek(start)
+        items = f.read(end - start)
+    document = io.BytesIO(root_context + CHANNEL_START + items + DOCUMENT_END)
+    try:
+        return [record for kind, record in iter_wxr_records(document, backend) if kind == 'item']
+    except ET.ParseError as e:
+        # Its line numbers count from the start of the range
+        raise ET.ParseError(f"{e} (in the items at bytes {start:,}-{end:,} of {os.path.basename(xml_file)})") from None
+
+def iter_sharded_records(wxr, xml_file, shard_plan, shard_workers, backend='auto'):
     """
-    Parses the WordPress WXR XML file and stores extracted data into an SQLite database.
-    Includes SEO data, external links, and internal link counts.
+    iter_wxr_records for an export split by plan_item_shards: the header records come from
+    wxr.stream, the items from a pool of shard_workers processes, in file order. At most
+    shard_workers * 2 ranges are in flight, so memory stays bounded. wxr is advanced past
+    each range as its items are taken, so progress and checkpoints see the offsets.
     """
-    print(f"Parsing XML file: {xml_file} and storing data into {db_name}")
+    header_end, root_context, ranges = shard_plan
+    header = io.BytesIO(wxr.stream.read(header_end) + DOCUMENT_END)
+    for kind, record in iter_wxr_records(header, backend):
+        if kind != 'item':
+            yield kind, record
 
-    # Register namespaces dynamically from the file
-    register_all_namespaces(xml_file)
+    with ProcessPoolExecutor(max_workers=shard_workers) as executor:
+        in_flight = deque()
 
-    conn = sqlite3.connect(db_name)
-    cursor = conn.cursor()
+        def drain(limit):
+            while len(in_flight) > limit:
+                range_end, future = in_flight.popleft()
+                items = future.result()
+                wxr.advance(range_end)
+                for record in items:
+                    yield 'item', record
+
+        for start, end in ranges:
+            in_flight.append((end, executor.submit(_parse_shard, xml_file, start, end, root_context, backend)))
+            yield from drain(shard_workers * 2 - 1)
+        yield from drain(0)
+    # Only the closing </channel></rss> is left
+    wxr.advance(wxr.total_bytes)
+
+# --- Incremental Imports ---
+# Rows derived from a single item, cleared before a changed item is rewritten
+POST_CHILD_DELETES = [
+    'DELETE FROM post_categories WHERE post_id = ?',
+    'DELETE FROM post_tags WHERE post_id = ?',
+    'DELETE FROM post_meta WHERE post_id = ?',
+    'DELETE FROM comments WHERE post_id = ?',
+    'DELETE FROM external_links WHERE source_post_id = ?',
+    'DELETE FROM internal_links WHERE source_post_id = ?',
+    'DELETE FROM unresolved_internal_links WHERE source_post_id = ?',
+]
+# Link rows of an item written before a resumed import was interrupted; they are linked again
+POST_LINK_DELETES = [
+    'DELETE FROM internal_links WHERE source_post_id = ?',
+    'DELETE FROM unresolved_internal_links WHERE source_post_id = ?',
+]
+
+def record_hash(record):
+    """
+    Stable hash of an item record, covering content, fields, meta, terms and comments.
+    Hashed in the dict form, so hashes stored by earlier imports still match.
+    """
+    return hashlib.sha1(json.dumps(record.as_dict(), sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def hash_items(records, known_hashes):
+    """
+    Stamps every item record with its content_hash. Items whose hash matches
+    known_hashes (post_id -> hash from the last import) are re-labelled
+    'unchanged_item' so they skip content analysis and writing entirely.
+    """
+    for kind, record in records:
+        if kind == 'item':
+            content_hash = record_hash(record)
+            record.content_hash = content_hash
+            if known_hashes.get(record.post_id) == content_hash:
+                kind = 'unchanged_item'
+        yield kind, record
+
+def skip_committed_items(records, committed):
+    """
+    Re-labels the first `committed` items 'committed_item': a resumed import wrote them
+    before it was interrupted, so they are only read again to rebuild the link graph.
+    """
+    ordinal = 0
+    for kind, record in records:
+        if kind == 'item' and ordinal < committed:
+            ordinal += 1
+            kind = 'committed_item'
+        yield kind, record
+
+def clear_post_rows(conn, post_id, child_deletes=POST_CHILD_DELETES):
+    """Deletes the child rows of a changed item and returns the posts it used to link to."""
+    old_targets = [row[0] for row in conn.execute('SELECT target_post_id FROM internal_links WHERE source_post_id = ?', (post_id,))]
+    for delete_sql in child_deletes:
+        conn.execute(delete_sql, (post_id,))
+    return old_targets
+
+def unlink_moved_post(conn, post_id, new_path):
+    """
+    When a changed post's permalink moved away from its stored one, turns the links that
+    point at it back into unresolved links to the old path: the linking posts still link
+    there, and a post that now has that path takes them over. Returns True if it moved.
+    """
+    row = conn.execute('SELECT link, post_type FROM posts WHERE post_id = ?', (post_id,)).fetchone()
+    if not row or not row[0] or row[1] not in ('post', 'page'):
+        return False
+    old_path = normalize_url_path(row[0])
+    if old_path == new_path:
+        return False
+    conn.execute('''
+        INSERT INTO unresolved_internal_links (source_post_id, path, link_count)
+        SELECT source_post_id, ?, link_count FROM internal_links WHERE target_post_id = ?
+        ON CONFLICT(source_post_id, path) DO UPDATE SET link_count = link_count + excluded.link_count
+    ''', (old_path, post_id))
+    conn.execute('DELETE FROM internal_links WHERE target_post_id = ?', (post_id,))
+    return True
+
+def recount_backlinks(conn):
+    """
+    Sets every post's internal_backlink_count to the SUM(link_count) of its internal_links
+    rows. One grouped scan, so it stays fast while bulk_load has the indexes dropped.
+    """
+    totals = conn.execute('SELECT target_post_id, SUM(link_count) FROM internal_links GROUP BY target_post_id').fetchall()
+    conn.execute('UPDATE posts SET internal_backlink_count = 0 WHERE internal_backlink_count != 0')
+    conn.executemany('UPDATE posts SET internal_backlink_count = ? WHERE post_id = ?',
+                     [(link_count, target_post_id) for target_post_id, link_count in totals])
+
+class TermLookup:
+    """
+    In-memory nicename -> term_id maps for categories and tags, so item term
+    assignments are resolved without a SELECT per <category> element.
+
+    Terms an item uses without the channel header declaring them (filtered exports
+    leave the term lists out) get negative term_ids, which no WordPress term has.
+    When a later header declares such a term, its rows move to the real term_id.
+    """
+
+    # domain -> (term table, assignment table, assignment column)
+    TABLES = {
+        'category': ('categories', 'post_categories', 'category_term_id'),
+        'post_tag': ('tags', 'post_tags', 'tag_term_id'),
+    }
 
-    # --- Create Tables ---
+    def __init__(self, conn):
+        self.conn = conn
+        self.term_ids = {'category': {}, 'post_tag': {}}
+        self.next_invented_id = -1
+        # Terms left by a previous import still resolve, as they did with the SELECTs
+        for domain, (table, _, _) in self.TABLES.items():
+            for nicename, term_id in conn.execute(f'SELECT nicename, term_id FROM {table} ORDER BY rowid'):
+                self.add(domain, term_id, nicename)
+
+    def add(self, domain, term_id, nicename):
+        """
+        Remembers a term declared in the channel header (first declaration wins). A term
+        that was only known by an invented id is re-keyed to the declared one.
+        """
+        known_id = self.term_ids[domain].get(nicename)
+        if known_id is not None and known_id < 0 <= term_id:
+            self.rekey(domain, known_id, term_id)
+            known_id = None
+        if known_id is None:
+            self.term_ids[domain][nicename] = term_id
+        if term_id < 0:
+            self.next_invented_id = min(self.next_invented_id, term_id - 1)
+
+    def rekey(self, domain, old_term_id, term_id):
+        """Moves the assignments of an invented term to its real term_id and drops the invented row."""
+        table, assignments, column = self.TABLES[domain]
+        self.conn.execute(f'UPDATE OR IGNORE {assignments} SET {column} = ? WHERE {column} = ?', (term_id, old_term_id))
+        # Posts that already had the real term keep one assignment
+        self.conn.execute(f'DELETE FROM {assignments} WHERE {column} = ?', (old_term_id,))
+        self.conn.execute(f'DELETE FROM {table} WHERE term_id = ?', (old_term_id,))
+
+    def resolve(self, writer, domain, nicename, name):
+        """
+        Returns the term_id for an item's category/tag. Terms that were never declared
+        in the channel header are registered on the fly with the next invented (negative) term_id.
+        """
+        term_id = self.term_ids[domain].get(nicename)
+        if term_id is None and nicename:
+            term_id = self.next_invented_id
+            self.add(domain, term_id, nicename)
+            if domain == 'category':
+                writer.add('categories', (term_id, nicename, None, name or nicename, None))
+            else:
+                writer.add('tags', (term_id, nicename, name or nicename, None))
+        return term_id
+
+def store_item(writer, record, analysis, terms, search_enabled=False):
+    """
+    Queues one post, page or attachment record and its child rows on the batch writer.
+    analysis holds the derived fields from content_analysis.analyze_item.
+    With search_enabled, posts and pages are also queued for the posts_fts search index.
+    """
+    post_id = record.post_id
+    post_type = record.post_type
+    title = analysis['title']
+    content_encoded = record.content_encoded
+    cleaned_html_source = analysis['cleaned_html_source']
+
+    # --- Insert or Update Post Data ---
+    writer.add('posts', (
+        post_id, title, record.link, record.pub_date, record.creator, record.guid, record.description,
+        content_encoded, record.excerpt_encoded, record.post_date, record.post_date_gmt,
+        record.comment_status, record.ping_status, record.post_name, record.status, record.post_parent,
+        record.menu_order, post_type, record.post_mime_type, record.comment_count,
+        cleaned_html_source, record.seo_title, record.seo_description, record.seo_keywords,
+        record.post_modified, record.attachment_url
+    ))
+
+    # Post Categories and Tags
+    for domain, nicename, name in record.terms:
+        if domain == 'category':
+            cat_id = terms.resolve(writer, domain, nicename, name)
+            if cat_id is not None:
+                writer.add('post_categories', (post_id, cat_id))
+        elif domain == 'post_tag':
+            tag_id = terms.resolve(writer, domain, nicename, name)
+            if tag_id is not None:
+                writer.add('post_tags', (post_id, tag_id))
+
+    # Post Meta (excluding AIOSEO which is now in posts table)
+    for meta_key, meta_value in record.post_meta:
+        writer.add('post_meta', (post_id, meta_key, meta_value))
+
+    # Comments
+    for comment in record.comments:
+        writer.add('comments', (
+            comment['comment_id'], post_id, comment['comment_author'],
+            comment['comment_author_email'], comment['comment_author_url'],
+            comment['comment_author_ip'], comment['comment_date'],
+            comment['comment_date_gmt'], comment['comment_content'],
+            comment['comment_approved'], comment['comment_type'],
+            comment['comment_parent'], comment['comment_user_id']
+        ))
+
+    # --- External Links ---
+    for ext_link in analysis['external_links']:
+        writer.add('external_links', (post_id, title, ext_link))
+
+    # --- Full-Text Search ---
+    if search_enabled and analysis['search_row'] is not None:
+        writer.add('posts_fts', (post_id,) + analysis['search_row'])
+
+def create_tables(cursor):
+    """Creates the importer's tables if they do not exist yet."""
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS authors (
             author_id INTEGER PRIMARY KEY,
@@ -114,7 +777,9 @@ def parse_wordpress_xml(xml_file, db_name, your_domain):
             seo_title TEXT,
             seo_description TEXT,
             seo_keywords TEXT,
-            internal_backlink_count INTEGER DEFAULT 0
+            internal_backlink_count INTEGER DEFAULT 0,
+            post_modified TEXT,
+            attachment_url TEXT
         )
     ''')
     cursor.execute('''
@@ -171,25 +836,185 @@ def parse_wordpress_xml(xml_file, db_name, your_domain):
             FOREIGN KEY (source_post_id) REFERENCES posts(post_id)
         )
     ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS internal_links (
+            source_post_id INTEGER,
+            target_post_id INTEGER,
+            link_count INTEGER DEFAULT 1,
+            FOREIGN KEY (source_post_id) REFERENCES posts(post_id),
+            FOREIGN KEY (target_post_id) REFERENCES posts(post_id),
+            PRIMARY KEY (source_post_id, target_post_id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS link_metrics (
+            post_id INTEGER PRIMARY KEY,
+            pagerank REAL,
+            in_degree INTEGER DEFAULT 0,
+            out_degree INTEGER DEFAULT 0,
+            is_orphan INTEGER DEFAULT 0,
+            is_dead_end INTEGER DEFAULT 0,
+            FOREIGN KEY (post_id) REFERENCES posts(post_id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS unresolved_internal_links (
+            source_post_id INTEGER,
+            path TEXT,
+            link_count INTEGER DEFAULT 1,
+            FOREIGN KEY (source_post_id) REFERENCES posts(post_id),
+            PRIMARY KEY (source_post_id, path)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS post_hashes (
+            post_id INTEGER PRIMARY KEY,
+            content_hash TEXT,
+            FOREIGN KEY (post_id) REFERENCES posts(post_id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS import_files (
+            file_hash TEXT PRIMARY KEY,
+            file_name TEXT,
+            file_size INTEGER,
+            imported_at TEXT
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS import_checkpoints (
+            checkpoint_id INTEGER PRIMARY KEY CHECK (checkpoint_id = 1),
+            file_name TEXT,
+            file_size INTEGER,
+            incremental INTEGER,
+            phase TEXT,
+            items INTEGER,
+            input_offset INTEGER,
+            xml_offset INTEGER,
+            xml_sha256 TEXT,
+            started_at TEXT,
+            updated_at TEXT
+        )
+    ''')
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS site_info (
             key TEXT PRIMARY KEY,
             value TEXT
         )
     ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS site_stats (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    ''')
+    add_missing_columns(cursor)
+
+def add_missing_columns(cursor):
+    """Adds the ADDED_COLUMNS that a database created by an older importer is missing."""
+    for table, columns in ADDED_COLUMNS.items():
+        existing = {row[1] for row in cursor.execute(f'PRAGMA table_info({table})')}
+        for name, column_type in columns:
+            if name not in existing:
+                cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {column_type}')
+
+def report_throughput(wxr, items, seconds):
+    """Prints input, decompressed XML and item rates for the parsing pass."""
+    seconds = max(seconds, 1e-9)
+    input_mb = wxr.input_bytes / 1024 / 1024
+    xml_mb = wxr.xml_bytes / 1024 / 1024
+    print(f"Parsed {items:,} items in {seconds:.2f}s ({items / seconds:,.0f} items/sec).")
+    if wxr.compression:
+        print(f"  input ({wxr.compression}): {input_mb:.1f} MB ({input_mb / seconds:.1f} MB/s), "
+              f"XML: {xml_mb:.1f} MB ({xml_mb / seconds:.1f} MB/s, {xml_mb / max(input_mb, 1e-9):.1f}x)")
+    else:
+        print(f"  input: {input_mb:.1f} MB ({input_mb / seconds:.1f} MB/s)")
+
+def parse_wordpress_xml(xml_file, db_name, your_domain, batch_size=DEFAULT_BATCH_SIZE, bulk_load=False, workers=None, incremental=False, progress=None, file_hash=None, backend='auto', resume=False, shard_workers=None):
+    """
+    Parses the WordPress WXR XML file and stores extracted data into an SQLite database.
+    Includes SEO data, external links, and internal link counts.
+    The file is streamed item by item (see iter_wxr_records), so it is never held in memory as a whole.
+    xml_file is a path or a binary file object, plain or compressed with gzip, bz2, xz or
+    zip; compressed input is decompressed as it is parsed (see src/wxr_input.py).
+    Rows are buffered per table and written with executemany every batch_size rows.
+
+    With bulk_load=True the import runs in a single transaction with journaling and
+    fsync turned off, and the secondary indexes are rebuilt only once the data is in.
+    Safe connection settings are restored afterwards. Use it for fresh re-ingests
+    where a crash simply means running the import again.
+
+    Otherwise the import commits a checkpoint (items written, input and XML byte offsets,
+    next phase) every batch_size items and after each later phase, in the same transaction
+    as the rows it covers (see src/checkpoints.py). With resume=True an import interrupted
+    by a crash or a kill picks up from its checkpoint: committed items are read again only
+    to rebuild the link graph, and finished phases are skipped. The file and the incremental
+    setting must be the same as in the interrupted run. Bulk loads keep no checkpoints.
+
+    backend picks the XML parser: 'lxml', 'etree' (the standard library) or 'auto', which
+    uses lxml when it is installed. lxml is faster and recovers from malformed markup.
+
+    workers > 1 moves the content analysis (regex link extraction, title fallback,
+    cleaned HTML lookup) to a process pool; results are identical to the serial run.
+
+    shard_workers > 1 parses an uncompressed export file in that many processes, each
+    taking byte ranges of whole items (see iter_sharded_records); compressed files and
+    streams are parsed in a single pass. Records still arrive in file order, so results
+    are identical, and this process stays the only writer.
+
+    With incremental=True a file whose SHA-256 (of the XML, after decompression) was
+    already imported is skipped, and
+    items whose content hash matches the last import are neither analyzed nor written.
+    Changed items have their meta, terms, comments and links replaced, and backlink
+    counts are recomputed only for the posts those links touch. The up-front check needs
+    the hash before parsing: it is read from plain files, or passed as file_hash when the
+    caller already has it (uploads are hashed as they arrive). Compressed files and streams
+    without file_hash are parsed in full, with every unchanged item skipped.
+
+    progress, when given, is called with a dict of phase ('parsing', 'linking',
+    'link_metrics', 'site_stats', 'finishing'), items, bytes_read and total_bytes (of the
+    input, compressed or not), xml_bytes and rows_written every PROGRESS_INTERVAL items and at the start of each later phase.
+
+    Returns the BatchWriter stats ({table: rows, flushes, seconds, rows_per_sec}),
+    or None when an incremental import skipped an already imported file.
+    """
+    print(f"Parsing XML file: {getattr(xml_file, 'name', xml_file)} and storing data into {db_name}")
+    backend = resolve_backend(backend)
+    print(f"XML parser: {'lxml' if backend == 'lxml' else 'ElementTree'}")
+
+    if resume and bulk_load:
+        raise ValueError("A bulk load cannot be resumed: it runs without a journal. Run it again from the start.")
+
+    # The input is opened first, so a missing, unreadable or broken file fails before the
+    # database is created or touched
+    xml_digest = hashlib.sha256() if incremental else None
+    wxr = WXRInput(xml_file, digest=xml_digest)
+    source_hash = None
+    if incremental:
+        source_hash = file_hash or (file_sha256(xml_file) if is_plain_file(xml_file) else None)
+
+    conn = sqlite3.connect(db_name)
+    cursor = conn.cursor()
+
+    create_tables(cursor)
+    search_enabled = create_search_index(conn)
+    child_deletes = POST_CHILD_DELETES + ([DELETE_SEARCH_ROW_SQL] if search_enabled else [])
+
+    if source_hash and cursor.execute('SELECT 1 FROM import_files WHERE file_hash = ?', (source_hash,)).fetchone():
+        print("This export was already imported and has not changed. Nothing to do.")
+        wxr.close()
+        conn.close()
+        return
+    if bulk_load:
+        drop_secondary_indexes(cursor)
+    else:
+        create_secondary_indexes(cursor)
     conn.commit()
 
-    tree = ET.parse(xml_file)
-    root = tree.getroot()
-    channel = root.find('channel')
+    if bulk_load:
+        print("Bulk-load mode: single transaction, journaling off, indexes deferred.")
+        apply_pragmas(conn, BULK_LOAD_PRAGMAS)
 
-    # --- Site Info Extraction ---
-    site_title = get_tag_text(channel, 'title')
-    site_description = get_tag_text(channel, 'description')
-    
-    cursor.execute('INSERT OR REPLACE INTO site_info (key, value) VALUES (?, ?)', ('title', site_title))
-    cursor.execute('INSERT OR REPLACE INTO site_info (key, value) VALUES (?, ?)', ('description', site_description))
-    
     # --- Plugin Info ---
     # Attempt to find the active_plugins meta value, which is often stored in a specific way
     cursor.execute("DELETE FROM site_info WHERE key LIKE 'plugin_%'") # Clear old plugin data
@@ -200,305 +1025,310 @@ def parse_wordpress_xml(xml_file, db_name, your_domain):
     active_plugins_list = "Placeholder: Could not determine active plugins from this XML."
     cursor.execute('INSERT OR REPLACE INTO site_info (key, value) VALUES (?, ?)', ('active_plugins', active_plugins_list))
 
+    writer = BatchWriter(conn, batch_size)
+    terms = TermLookup(conn)
 
-    # --- Parse Authors ---
-    print("Extracting Authors...")
-    for author_node in channel.findall('wp:author', NAMESPACES):
-        author = {
-            'author_id': int(get_wp_tag_text(author_node, 'author_id')),
-            'login': get_wp_tag_text(author_node, 'author_login'),
-            'email': get_wp_tag_text(author_node, 'author_email'),
-            'display_name': get_wp_tag_text(author_node, 'author_display_name'),
-            'first_name': get_wp_tag_text(author_node, 'author_first_name'),
-            'last_name': get_wp_tag_text(author_node, 'author_last_name'),
-        }
-        cursor.execute('''
-            INSERT OR IGNORE INTO authors (author_id, login, email, display_name, first_name, last_name)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (author['author_id'], author['login'], author['email'], author['display_name'], author['first_name'], author['last_name']))
-    conn.commit()
+    if wxr.compression:
+        print(f"Decompressing {wxr.compression} input while parsing.")
+    items_seen = 0
 
-    # --- Parse Categories ---
-    print("Extracting Categories...")
-    for cat_node in channel.findall('wp:category', NAMESPACES):
-        category = {
-            'term_id': int(get_wp_tag_text(cat_node, 'term_id')),
-            'nicename': get_wp_tag_text(cat_node, 'category_nicename'),
-            'parent': get_wp_tag_text(cat_node, 'category_parent'),
-            'name': get_wp_tag_text(cat_node, 'cat_name'),
-            'description': get_wp_tag_text(cat_node, 'category_description'),
-        }
-        cursor.execute('''
-            INSERT OR IGNORE INTO categories (term_id, nicename, parent, name, description)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (category['term_id'], category['nicename'], category['parent'], category['name'], category['description']))
-    conn.commit()
+    # --- Checkpoints ---
+    # The first `committed` items are already in the database, and phases before resume_phase are done
+    checkpoint = load_checkpoint(conn)
+    if checkpoint is not None and resume and not matches_checkpoint(checkpoint, wxr.name, wxr.total_bytes, incremental):
+        wxr.close()
+        conn.close()
+        raise ValueError(f"The interrupted import in {db_name} was of {checkpoint['file_name']} "
+                         f"({checkpoint['file_size']} bytes, incremental={bool(checkpoint['incremental'])}). "
+                         "Resume it with the same file and settings, or import without resume.")
+    if checkpoint is not None and resume:
+        resume_phase = checkpoint['phase']
+        committed = checkpoint['items']
+        print(f"Resuming the interrupted import at '{resume_phase}': {committed:,} items "
+              f"({checkpoint['input_offset']:,} bytes of input) were committed at {checkpoint['updated_at']}.")
+    else:
+        if resume:
+            print("No interrupted import to resume; importing from the start.")
+        elif checkpoint is not None:
+            print(f"Discarding the checkpoint of an interrupted import of {checkpoint['file_name']}.")
+        checkpoint = None
+        resume_phase = 'parsing'
+        committed = 0
+        if bulk_load:
+            clear_checkpoint(conn)
+        else:
+            start_checkpoint(conn, wxr.name, wxr.total_bytes, incremental)
+    # Once the link graph is committed, the file is not needed again
+    items_linked = phase_index(resume_phase) >= phase_index('link_metrics')
+    if items_linked:
+        items_seen = committed
 
-    # --- Parse Tags ---
-    print("Extracting Tags...")
-    for tag_node in channel.findall('wp:tag', NAMESPACES):
-        # Be more robust in finding the nicename/slug
-        nicename = get_wp_tag_text(tag_node, 'tag_nicename')
-        if not nicename:
-            nicename = get_wp_tag_text(tag_node, 'tag_slug')
-
-        tag = {
-            'term_id': int(get_wp_tag_text(tag_node, 'term_id')),
-            'nicename': nicename,
-            'name': get_wp_tag_text(tag_node, 'tag_name'),
-            'description': get_wp_tag_text(tag_node, 'tag_description'),
-        }
-        cursor.execute('''
-            INSERT OR IGNORE INTO tags (term_id, nicename, name, description)
-            VALUES (?, ?, ?, ?)
-        ''', (tag['term_id'], tag['nicename'], tag['name'], tag['description']))
-    conn.commit()
+    shard_plan = None
+    if shard_workers and shard_workers > 1 and not items_linked:
+        if wxr.compression is None and isinstance(xml_file, (str, os.PathLike)):
+            shard_plan = plan_item_shards(xml_file, SHARD_BYTES)
+        if shard_plan is None:
+            print("Sharded parsing needs an uncompressed WXR export file; parsing in a single pass.")
+        else:
+            print(f"Parsing {len(shard_plan[2])} item ranges with {shard_workers} processes...")
+
+    def commit_checkpoint(phase, xml_sha256=None):
+        # The checkpoint goes in the same transaction as the rows it covers
+        writer.flush()
+        if not bulk_load:
+            save_checkpoint(conn, phase, items_seen, wxr.input_bytes, wxr.xml_bytes, xml_sha256)
+            conn.commit()
+
+    def report_progress(phase):
+        if progress is not None:
+            progress({
+                'phase': phase,
+                'items': items_seen,
+                'bytes_read': wxr.input_bytes,
+                'total_bytes': wxr.total_bytes,
+                'xml_bytes': wxr.xml_bytes,
+                'rows_written': writer.total_rows(),
+            })
 
     # --- Prepare for Internal Link Ranking ---
-    # Step 1: Build a map of { URL_Path : Post_ID } to quickly lookup target posts
+    # Map of { URL_Path : Post_ID }, filled as items stream past. Links can point forward
+    # in the file, so matched paths are only resolved once every item has been seen.
     url_to_post_id = {}
-    
-    # Pre-parse items to populate url_to_post_id map
-    all_items = channel.findall('item')
-    for item_node in all_items:
-        post_type = get_wp_tag_text(item_node, 'post_type')
-        if post_type in ['post', 'page']:
-            post_id = int(get_wp_tag_text(item_node, 'post_id'))
-            link = get_tag_text(item_node, 'link')
-            if link:
-                path = normalize_url_path(link)
-                url_to_post_id[path] = post_id
-
-    # --- Parse Items (Posts, Pages, Attachments) ---
-    print("Extracting Posts, Pages, and Attachments...")
-    # Regex to find href="http..."
-    external_link_pattern = re.compile(r'href=["\"](http[s]?:\/\/(?:(?!' + re.escape(your_domain) + r')[^"\"]+))["\"]')
-    internal_link_pattern = re.compile(r'href=["\"]([^"\"]+)["\"]')
-
-
-    for item_node in all_items:
-        post_type = get_wp_tag_text(item_node, 'post_type')
-        post_id = int(get_wp_tag_text(item_node, 'post_id'))
-        
-        # Determine if it's a post, page, or attachment and process accordingly
-        if post_type in ['post', 'page', 'attachment']:
-            title = get_tag_text(item_node, 'title')
-            content_encoded = get_tag_text(item_node, 'encoded', 'content')
-
-            if not title:
-                if content_encoded:
-                    match = re.search(r'<h[12]>(.*?)<\/h[12]>', content_encoded)
-                    if match:
-                        title = match.group(1)
-                if not title:
-                    title = "Untitled Post"
-
-            link = get_tag_text(item_node, 'link')
-            pub_date = get_tag_text(item_node, 'pubDate')
-            creator = get_tag_text(item_node, 'creator', 'dc')
-            guid = get_tag_text(item_node, 'guid')
-            description = get_tag_text(item_node, 'description')
-            excerpt_encoded = get_tag_text(item_node, 'encoded', 'excerpt')
-            post_date = get_wp_tag_text(item_node, 'post_date')
-            post_date_gmt = get_wp_tag_text(item_node, 'post_date_gmt')
-            comment_status = get_wp_tag_text(item_node, 'comment_status')
-            ping_status = get_wp_tag_text(item_node, 'ping_status')
-            post_name = get_wp_tag_text(item_node, 'post_name')
-            status = get_wp_tag_text(item_node, 'status')
-            post_parent = int(get_wp_tag_text(item_node, 'post_parent') or 0)
-            menu_order = int(get_wp_tag_text(item_node, 'menu_order') or 0)
-            post_mime_type = get_wp_tag_text(item_node, 'post_mime_type')
-            comment_count = int(get_wp_tag_text(item_node, 'comment_count') or 0)
-
-            # --- SEO Data Extraction ---
-            seo_title = ""
-            seo_description = ""
-            seo_keywords = ""
-            for meta in item_node.findall('wp:postmeta', NAMESPACES):
-                key = get_wp_tag_text(meta, 'meta_key')
-                val = get_wp_tag_text(meta, 'meta_value')
-                if key == '_aioseo_title':
-                    seo_title = val
-                elif key == '_aioseo_description':
-                    seo_description = val
-                elif key == '_aioseo_keywords':
-                    seo_keywords = val
-
-            # --- Cleaned HTML Source (from existing files) ---
-            cleaned_html_source = None
-            if post_type in ['post', 'page']:
-                potential_filename = f"{post_name}.html"
-                
-                # Check blog posts directory
-                cleaned_post_path = os.path.join('all_blog_posts', potential_filename)
-                if os.path.exists(cleaned_post_path):
-                    try:
-                        with open(cleaned_post_path, 'r', encoding='utf-8') as f:
-                            cleaned_html_source = f.read()
-                        # print(f"Found cleaned HTML for post '{post_name}' in all_blog_posts")
-                    except Exception as e:
-                        print(f"Error reading cleaned HTML for {post_name} from {cleaned_post_path}: {e}")
-                
-                # If not found in blog posts, check pages directory
-                if not cleaned_html_source:
-                    cleaned_page_path = os.path.join('all_pages', potential_filename)
-                    if os.path.exists(cleaned_page_path):
-                        try:
-                            with open(cleaned_page_path, 'r', encoding='utf-8') as f:
-                                cleaned_html_source = f.read()
-                            # print(f"Found cleaned HTML for page '{post_name}' in all_pages")
-                        except Exception as e:
-                            print(f"Error reading cleaned HTML for {post_name} from {cleaned_page_path}: {e}")
-
-            # --- Insert or Update Post Data ---
-            cursor.execute('''
-                INSERT INTO posts (
-                    post_id, title, link, pub_date, creator, guid, description,
-                    content_encoded, excerpt_encoded, post_date, post_date_gmt,
-                    comment_status, ping_status, post_name, status, post_parent,
-                    menu_order, post_type, post_mime_type, comment_count,
-                    cleaned_html_source, seo_title, seo_description, seo_keywords
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(post_id) DO UPDATE SET
-                    title = excluded.title,
-                    link = excluded.link,
-                    pub_date = excluded.pub_date,
-                    creator = excluded.creator,
-                    guid = excluded.guid,
-                    description = excluded.description,
-                    content_encoded = excluded.content_encoded,
-                    excerpt_encoded = excluded.excerpt_encoded,
-                    post_date = excluded.post_date,
-                    post_date_gmt = excluded.post_date_gmt,
-                    comment_status = excluded.comment_status,
-                    ping_status = excluded.ping_status,
-                    post_name = excluded.post_name,
-                    status = excluded.status,
-                    post_parent = excluded.post_parent,
-                    menu_order = excluded.menu_order,
-                    post_type = excluded.post_type,
-                    post_mime_type = excluded.post_mime_type,
-                    comment_count = excluded.comment_count,
-                    cleaned_html_source = excluded.cleaned_html_source,
-                    seo_title = excluded.seo_title,
-                    seo_description = excluded.seo_description,
-                    seo_keywords = excluded.seo_keywords;
-            ''', (
-                post_id, title, link, pub_date, creator, guid, description,
-                content_encoded, excerpt_encoded, post_date, post_date_gmt,
-                comment_status, ping_status, post_name, status, post_parent,
-                menu_order, post_type, post_mime_type, comment_count,
-                cleaned_html_source, seo_title, seo_description, seo_keywords
-            ))
-
-            # Post Categories and Tags
-            for category_node in item_node.findall('category'):
-                domain = category_node.get('domain')
-                nicename = category_node.get('nicename')
-                if domain == 'category':
-                    cursor.execute('SELECT term_id FROM categories WHERE nicename = ?', (nicename,))
-                    cat_id = cursor.fetchone()
-                    if cat_id:
-                        cursor.execute('INSERT OR IGNORE INTO post_categories (post_id, category_term_id) VALUES (?, ?)', (post_id, cat_id[0]))
-                elif domain == 'post_tag':
-                    cursor.execute('SELECT term_id FROM tags WHERE nicename = ?', (nicename,))
-                    tag_id = cursor.fetchone()
-                    if tag_id:
-                        cursor.execute('INSERT OR IGNORE INTO post_tags (post_id, tag_term_id) VALUES (?, ?)', (post_id, tag_id[0]))
-
-            # Post Meta (excluding AIOSEO which is now in posts table)
-            for postmeta_node in item_node.findall('wp:postmeta', NAMESPACES):
-                meta_key = get_wp_tag_text(postmeta_node, 'meta_key')
-                if meta_key not in ['_aioseo_title', '_aioseo_description', '_aioseo_keywords']:
-                    meta_value = get_wp_tag_text(postmeta_node, 'meta_value')
-                    cursor.execute('''
-                        INSERT OR IGNORE INTO post_meta (post_id, meta_key, meta_value)
-                        VALUES (?, ?, ?)
-                    ''', (post_id, meta_key, meta_value))
-
-            # Comments
-            for comment_node in item_node.findall('wp:comment', NAMESPACES):
-                comment = {
-                    'comment_id': int(get_wp_tag_text(comment_node, 'comment_id')),
-                    'post_id': post_id,
-                    'comment_author': get_wp_tag_text(comment_node, 'comment_author'),
-                    'comment_author_email': get_wp_tag_text(comment_node, 'comment_author_email'),
-                    'comment_author_url': get_wp_tag_text(comment_node, 'comment_author_url'),
-                    'comment_author_ip': get_wp_tag_text(comment_node, 'comment_author_ip'),
-                    'comment_date': get_wp_tag_text(comment_node, 'comment_date'),
-                    'comment_date_gmt': get_wp_tag_text(comment_node, 'comment_date_gmt'),
-                    'comment_content': get_wp_tag_text(comment_node, 'comment_content'),
-                    'comment_approved': get_wp_tag_text(comment_node, 'comment_approved'),
-                    'comment_type': get_wp_tag_text(comment_node, 'comment_type'),
-                    'comment_parent': int(get_wp_tag_text(comment_node, 'comment_parent') or 0),
-                    'comment_user_id': int(get_wp_tag_text(comment_node, 'comment_user_id') or 0),
-                }
-                cursor.execute('''
-                    INSERT OR IGNORE INTO comments (
-                        comment_id, post_id, comment_author, comment_author_email,
-                        comment_author_url, comment_author_ip, comment_date,
-                        comment_date_gmt, comment_content, comment_approved,
-                        comment_type, comment_parent, comment_user_id
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    comment['comment_id'], comment['post_id'], comment['comment_author'],
-                    comment['comment_author_email'], comment['comment_author_url'],
-                    comment['comment_author_ip'], comment['comment_date'],
-                    comment['comment_date_gmt'], comment['comment_content'],
-                    comment['comment_approved'], comment['comment_type'],
-                    comment['comment_parent'], comment['comment_user_id']
-                ))
-            
-            # --- External Link Scanning ---
-            if content_encoded and post_type in ['post', 'page']:
-                found_external_links = external_link_pattern.findall(content_encoded)
-                for ext_link in found_external_links:
-                    cursor.execute('''
-                        INSERT OR IGNORE INTO external_links (source_post_id, source_post_title, linked_url)
-                        VALUES (?, ?, ?)
-                    ''', (post_id, title, ext_link))
+    # { (Source_Post_ID, URL_Path) : Number of links }
+    internal_link_paths = Counter()
 
-    conn.commit()
+    # --- Incremental Import State ---
+    known_hashes = dict(cursor.execute('SELECT post_id, content_hash FROM post_hashes')) if incremental else {}
+    changed_post_paths = []
+    previous_link_targets = set()
+    unchanged_items = 0
+    changed_items = 0
+    committed_items = 0
+
+    # --- Stream Site Info, Authors, Categories, Tags and Items ---
+    # Title fallback, cleaned HTML and link extraction run in analyze_records,
+    # across worker processes when workers > 1. This process stays the only writer.
+    if workers and workers > 1:
+        print(f"Analyzing content with {workers} worker processes...")
+    seen_kinds = set()
+    report_progress('parsing')
+    parse_started = time.perf_counter()
+    with wxr:
+        if items_linked:
+            print("Items and internal links were committed before the interruption; skipping the file.")
+            records = iter(())
+        else:
+            if shard_plan is not None:
+                source = iter_sharded_records(wxr, xml_file, shard_plan, shard_workers, backend)
+            else:
+                source = iter_wxr_records(wxr.stream, backend)
+            records = hash_items(skip_committed_items(source, committed), known_hashes)
+        for kind, record, analysis in analyze_records(records, your_domain, workers):
+            if kind not in seen_kinds:
+                seen_kinds.add(kind)
+                if kind == 'author':
+                    print("Extracting Authors...")
+                elif kind == 'category':
+                    print("Extracting Categories...")
+                elif kind == 'tag':
+                    print("Extracting Tags...")
+                elif kind in ('item', 'unchanged_item', 'committed_item') and 'items' not in seen_kinds:
+                    seen_kinds.add('items')
+                    # The channel header (authors and terms) is complete once items start
+                    writer.flush()
+                    if not bulk_load:
+                        conn.commit()
+                    print("Extracting Posts, Pages, and Attachments...")
+
+            if kind == 'site_info':
+                writer.add('site_info', record)
+            elif kind == 'author':
+                writer.add('authors', (record['author_id'], record['login'], record['email'], record['display_name'], record['first_name'], record['last_name']))
+            elif kind == 'category':
+                terms.add('category', record['term_id'], record['nicename'])
+                writer.add('categories', (record['term_id'], record['nicename'], record['parent'], record['name'], record['description']))
+            elif kind == 'tag':
+                terms.add('post_tag', record['term_id'], record['nicename'])
+                writer.add('tags', (record['term_id'], record['nicename'], record['name'], record['description']))
+            elif kind == 'unchanged_item':
+                # Still needed to resolve links from changed posts to this one
+                unchanged_items += 1
+                if record.post_type in ['post', 'page'] and record.link:
+                    url_to_post_id[normalize_url_path(record.link)] = record.post_id
+            elif kind == 'committed_item':
+                # Written before the interruption; only its links are needed again
+                committed_items += 1
+                post_id = record.post_id
+                if record.post_type in ['post', 'page']:
+                    if record.link:
+                        url_path = normalize_url_path(record.link)
+                        url_to_post_id[url_path] = post_id
+                        if incremental:
+                            changed_post_paths.append(url_path)
+                    for normalized_found_path in find_internal_link_paths(record.content_encoded, your_domain):
+                        internal_link_paths[(post_id, normalized_found_path)] += 1
+                if incremental and record.post_type in ['post', 'page', 'attachment']:
+                    # May already hold rows from an earlier import when it was unchanged
+                    previous_link_targets.update(clear_post_rows(conn, post_id, POST_LINK_DELETES))
+            elif kind == 'item':
+                changed_items += 1
+                post_type = record.post_type
+                post_id = record.post_id
+                url_path = None
+
+                if post_type in ['post', 'page']:
+                    if record.link:
+                        url_path = normalize_url_path(record.link)
+                        url_to_post_id[url_path] = post_id
+                        if incremental:
+                            changed_post_paths.append(url_path)
+                    for normalized_found_path in analysis['internal_link_paths']:
+                        internal_link_paths[(post_id, normalized_found_path)] += 1
+
+                # Determine if it's a post, page, or attachment and process accordingly
+                if post_type in ['post', 'page', 'attachment']:
+                    if incremental:
+                        previous_link_targets.update(clear_post_rows(conn, post_id, child_deletes))
+                        # Read before store_item replaces the stored link
+                        if unlink_moved_post(conn, post_id, url_path):
+                            previous_link_targets.add(post_id)
+                    store_item(writer, record, analysis, terms, search_enabled)
+                writer.add('post_hashes', (post_id, record.content_hash))
+
+            if kind in ('item', 'unchanged_item', 'committed_item'):
+                items_seen += 1
+                if items_seen % PROGRESS_INTERVAL == 0:
+                    report_progress('parsing')
+                if items_seen > committed and items_seen % writer.batch_size == 0:
+                    commit_checkpoint('parsing')
+    if not items_linked:
+        report_throughput(wxr, items_seen, time.perf_counter() - parse_started)
+
+    # The XML hash and size for import_files, from the checkpoint when the file was skipped
+    if items_linked:
+        xml_sha256, xml_size = checkpoint['xml_sha256'], checkpoint['xml_offset']
+    else:
+        xml_sha256 = xml_digest.hexdigest() if incremental else None
+        if incremental and shard_plan is not None:
+            # The shards read the file, not the digest; the file was hashed up front
+            xml_sha256 = source_hash
+        xml_size = wxr.xml_bytes
+        commit_checkpoint('linking', xml_sha256)
+    if committed_items:
+        print(f"Resumed import: {committed_items} items committed before the interruption were not written again.")
+    if incremental:
+        print(f"Incremental import: {changed_items} new or changed items, {unchanged_items} unchanged items skipped.")
     print("Initial data extraction complete. Calculating internal backlinks...")
+    report_progress('linking')
+
+    # --- Build the Internal Link Graph ---
+    link_edges = Counter()
+    for (source_post_id, normalized_found_path), link_count in internal_link_paths.items():
+        # If the normalized path corresponds to an extracted post/page
+        if normalized_found_path in url_to_post_id:
+            link_edges[(source_post_id, url_to_post_id[normalized_found_path])] += link_count
+        else:
+            # Kept so the link resolves once a post with this path is imported
+            writer.add('unresolved_internal_links', (source_post_id, normalized_found_path, link_count))
+
+    if incremental:
+        # Unchanged posts may link to posts that are new in this export
+        for url_path in changed_post_paths:
+            for source_post_id, link_count in cursor.execute('SELECT source_post_id, link_count FROM unresolved_internal_links WHERE path = ?', (url_path,)).fetchall():
+                link_edges[(source_post_id, url_to_post_id[url_path])] += link_count
+            cursor.execute('DELETE FROM unresolved_internal_links WHERE path = ?', (url_path,))
+
+    for (source_post_id, target_post_id), link_count in link_edges.items():
+        writer.add('internal_links', (source_post_id, target_post_id, link_count))
+    writer.flush()
 
     # --- Calculate Internal Backlinks ---
-    # Re-iterate through all posts to count internal backlinks
-    for item_node in all_items:
-        post_type = get_wp_tag_text(item_node, 'post_type')
-        current_post_id = int(get_wp_tag_text(item_node, 'post_id'))
-        
-        if post_type in ['post', 'page']:
-            content_encoded = get_tag_text(item_node, 'encoded', 'content')
-            if content_encoded:
-                found_internal_links = internal_link_pattern.findall(content_encoded)
-                
-                for potential_link in found_internal_links:
-                    # Check if it's an internal link (contains your_domain) and normalize it
-                    if your_domain in potential_link:
-                        normalized_found_path = normalize_url_path(potential_link)
-                        
-                        # If the normalized path corresponds to an extracted post/page
-                        if normalized_found_path in url_to_post_id:
-                            target_post_id = url_to_post_id[normalized_found_path]
-                            # Increment backlink count for the target post
-                            cursor.execute('''
-                                UPDATE posts
-                                SET internal_backlink_count = internal_backlink_count + 1
-                                WHERE post_id = ?
-                            ''', (target_post_id,))
-    
+    if incremental and checkpoint is not None and not items_linked:
+        # Links cleared before the interruption are gone, and with them the posts they pointed at
+        recount_backlinks(conn)
+    elif incremental:
+        # Recount only the posts whose inbound links may have changed
+        affected_targets = previous_link_targets | {target_post_id for _, target_post_id in link_edges}
+        cursor.executemany('''
+            UPDATE posts
+            SET internal_backlink_count = (
+                SELECT COALESCE(SUM(link_count), 0) FROM internal_links WHERE target_post_id = posts.post_id
+            )
+            WHERE post_id = ?
+        ''', [(target_post_id,) for target_post_id in affected_targets])
+    elif not items_linked:
+        # Set from the edge table rather than added to, so importing into an existing
+        # database again does not count the same (upserted) links twice
+        recount_backlinks(conn)
+
+    if not items_linked:
+        commit_checkpoint('link_metrics')
+
+    # --- PageRank, Degrees, Orphans and Dead Ends ---
+    # PageRank is global, so it is recomputed whenever any item changed (or may have, when resuming)
+    if (changed_items or checkpoint is not None) and phase_index(resume_phase) < phase_index('site_stats'):
+        print("Computing internal link metrics (PageRank, in/out degree)...")
+        report_progress('link_metrics')
+        refresh_link_metrics(conn)
+        commit_checkpoint('site_stats')
+
+    if incremental:
+        cursor.execute('INSERT OR REPLACE INTO import_files (file_hash, file_name, file_size, imported_at) VALUES (?, ?, ?, ?)', (
+            xml_sha256, wxr.name, xml_size, datetime.now().isoformat(timespec='seconds')
+        ))
+
+    # --- Dashboard Statistics ---
+    print("Computing site statistics...")
+    report_progress('site_stats')
+    refresh_site_stats(conn)
+
+    # Bumped on every completed import; the Flask app drops its cached totals when it changes
+    cursor.execute('''
+        INSERT INTO site_info (key, value) VALUES ('import_generation', '1')
+        ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1
+    ''')
+
+    report_progress('finishing')
+    if bulk_load:
+        print("Building secondary indexes...")
+        create_secondary_indexes(cursor)
+    # Planner statistics, so SQLite picks the right composite index for the Flask queries
+    cursor.execute('ANALYZE')
+    clear_checkpoint(conn)
     conn.commit()
+    if bulk_load:
+        apply_pragmas(conn, SAFE_PRAGMAS)
     conn.close()
+    writer.report()
     print("XML parsing and SQLite storage complete, including SEO and link analysis.")
+    return writer.stats()
 
-if __name__ == "__main__":
-    # Example usage (replace with your actual XML file and domain)
-    XML_FILE = 'theitapprentice.WordPress.2024-08-17.xml'
-    DB_NAME = 'wordpress_extracted_data.db'
-    YOUR_DOMAIN = 'theitapprentice.com'
+def main():
+    parser = argparse.ArgumentParser(description="Import a WordPress WXR export into an SQLite database.")
+    parser.add_argument('xml_file', help="WXR export: .xml, or compressed with gzip, bz2, xz or zip")
+    parser.add_argument('--db', default='wordpress_extracted_data.db', help="SQLite database to write")
+    parser.add_argument('--domain', required=True, help="Your site's domain, used to tell internal links from external ones")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Rows per executemany batch and items per checkpoint")
+    parser.add_argument('--bulk-load', action='store_true', help="One transaction, no journal, indexes built at the end (not resumable)")
+    parser.add_argument('--workers', type=int, help="Worker processes for content analysis")
+    parser.add_argument('--incremental', action='store_true', help="Skip unchanged items and already imported files")
+    parser.add_argument('--backend', choices=PARSER_BACKENDS, default='auto', help="XML parser")
+    parser.add_argument('--shard-workers', type=int, help="Processes parsing byte ranges of an uncompressed export")
+    parser.add_argument('--resume', action='store_true', help="Continue an interrupted import of the same file")
+    parser.add_argument('--fresh', action='store_true', help="Delete the database before importing")
+    args = parser.parse_args()
 
-    # Clean up previous db for fresh run
-    if os.path.exists(DB_NAME):
-        os.remove(DB_NAME)
+    if args.fresh and args.resume:
+        parser.error("--fresh and --resume cannot be combined")
+    if args.fresh and os.path.exists(args.db):
+        os.remove(args.db)
 
-    parse_wordpress_xml(XML_FILE, DB_NAME, YOUR_DOMAIN)
+    parse_wordpress_xml(args.xml_file, args.db, args.domain, batch_size=args.batch_size, bulk_load=args.bulk_load,
+                        workers=args.workers, incremental=args.incremental, backend=args.backend, resume=args.resume,
+                        shard_workers=args.shard_workers)
+
+if __name__ == "__main__":
+    # Run from the repository root, e.g.:
+    # python -m src.wordpress_xml_parser theitapprentice.WordPress.2024-08-17.xml --domain theitapprentice.com --fresh --bulk-load
+    # python -m src.wordpress_xml_parser theitapprentice.WordPress.2024-08-17.xml --domain theitapprentice.com --resume
+    main()
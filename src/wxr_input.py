@@ -0,0 +1,309 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+import re
+import zipfile
+
+# --- Export Input ---
+# parse_wordpress_xml reads an export from a path or any binary file object, plain or
+# compressed. Compressed input is decompressed while it is parsed, never to disk.
+
+# Compression is told from the first bytes, so file names and extensions do not matter
+MAGIC_NUMBERS = [
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'PK\x03\x04', 'zip'),
+]
+MAGIC_LENGTH = max(len(magic) for magic, _ in MAGIC_NUMBERS)
+
+def detect_compression(head):
+    """'gzip', 'bz2', 'xz' or 'zip' for the first bytes of a compressed file, else None."""
+    for magic, compression in MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return compression
+    return None
+
+def is_plain_file(source):
+    """True when source is a path to an uncompressed file."""
+    if not isinstance(source, (str, os.PathLike)):
+        return False
+    with open(source, 'rb') as f:
+        return detect_compression(f.read(MAGIC_LENGTH)) is None
+
+def zip_export_member(archive):
+    """The member of a zip archive holding the export: the first .xml file, or the only file."""
+    members = [member for member in archive.infolist() if not member.is_dir()]
+    xml_members = [member for member in members if member.filename.lower().endswith('.xml')]
+    if xml_members:
+        return xml_members[0]
+    if len(members) == 1:
+        return members[0]
+    return None
+
+# --- Item Boundaries ---
+# Sharded parsing (parse_wordpress_xml shard_workers) splits a plain export into byte ranges
+# of whole <item> elements. Only the bytes around each split point are scanned.
+ITEM_START_PATTERN = re.compile(rb'<item[\s>]')
+ITEM_END = b'</item>'
+CHANNEL_END = b'</channel>'
+CDATA_START = b'<![CDATA['
+CDATA_END = b']]>'
+SCAN_CHUNK_BYTES = 1024 * 1024
+# The root element and the channel end are looked for in this much of the head and tail
+BOUNDARY_WINDOW_BYTES = 64 * 1024
+
+def inside_cdata(f, offset, end):
+    """
+    True when offset in f is inside a CDATA section. "]]>" cannot appear outside one and
+    sections do not nest, so it is inside when the next "]]>" comes before the next "<![CDATA[".
+    """
+    position = offset
+    while position < end:
+        f.seek(position)
+        chunk = f.read(min(SCAN_CHUNK_BYTES, end - position))
+        if not chunk:
+            break
+        cdata_end = chunk.find(CDATA_END)
+        cdata_start = chunk.find(CDATA_START)
+        if cdata_end != -1 or cdata_start != -1:
+            return cdata_end != -1 and (cdata_start == -1 or cdata_end < cdata_start)
+        if len(chunk) <= len(CDATA_START):
+            break
+        position += len(chunk) - len(CDATA_START)
+    return False
+
+def find_item_start(f, offset, end, after_item=True):
+    """
+    Offset of the first <item> tag in f between offset and end, or None. With after_item,
+    only a tag that follows a </item> with nothing but whitespace in between counts. A tag
+    inside CDATA content (an "<item>" in a code sample) never counts.
+    """
+    overlap = len(ITEM_END) + 1
+    position = offset
+    while position < end:
+        f.seek(position)
+        chunk = f.read(min(SCAN_CHUNK_BYTES, end - position))
+        if not chunk:
+            return None
+        for match in ITEM_START_PATTERN.finditer(chunk):
+            candidate = position + match.start()
+            if after_item:
+                f.seek(max(0, candidate - BOUNDARY_WINDOW_BYTES))
+                if not f.read(candidate - max(0, candidate - BOUNDARY_WINDOW_BYTES)).rstrip().endswith(ITEM_END):
+                    continue
+            if not inside_cdata(f, candidate, end):
+                return candidate
+        if len(chunk) <= overlap:
+            return None
+        position += len(chunk) - overlap
+    return None
+
+# Any of the three, for count_items; MAX_TOKEN_BYTES of a chunk's end are scanned again with the next
+ITEM_TOKEN_PATTERN = re.compile(re.escape(CDATA_START) + rb'|' + re.escape(CDATA_END) + rb'|' + ITEM_START_PATTERN.pattern)
+MAX_TOKEN_BYTES = len(CDATA_START)
+
+def count_items(stream, chunk_size=SCAN_CHUNK_BYTES):
+    """
+    Number of <item> elements in an XML stream, without parsing it. Tags inside CDATA
+    content are not counted, and tags with attributes are.
+    """
+    items = 0
+    in_cdata = False
+    data = b''
+    while True:
+        chunk = stream.read(chunk_size)
+        data += chunk
+        # Tokens starting in the last bytes may be cut off; they are scanned with the next chunk
+        limit = len(data) if not chunk else len(data) - (MAX_TOKEN_BYTES - 1)
+        for match in ITEM_TOKEN_PATTERN.finditer(data):
+            if match.start() >= limit:
+                break
+            token = match.group()
+            if token == CDATA_START:
+                in_cdata = True
+            elif token == CDATA_END:
+                in_cdata = False
+            elif not in_cdata:
+                items += 1
+        if not chunk:
+            return items
+        data = data[max(limit, 0):]
+
+def plan_item_shards(path, shard_bytes):
+    """
+    Splits a plain export into byte ranges of whole items, about shard_bytes each.
+    Returns (header_end, root_context, ranges): the channel header is path[:header_end],
+    root_context the bytes up to and including the <rss ...> start tag (the XML declaration
+    and namespaces a range needs to be parsed on its own), and ranges a list of (start, end)
+    offsets. Returns None when the file does not have the layout of a WXR export.
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        head = f.read(BOUNDARY_WINDOW_BYTES)
+        root_start = head.find(b'<rss')
+        root_end = head.find(b'>', root_start)
+        if root_start == -1 or root_end == -1:
+            return None
+
+        tail_start = max(0, size - BOUNDARY_WINDOW_BYTES)
+        f.seek(tail_start)
+        channel_end = f.read().rfind(CHANNEL_END)
+        if channel_end == -1:
+            return None
+        channel_end += tail_start
+
+        first_item = find_item_start(f, root_end, channel_end, after_item=False)
+        if first_item is None:
+            return channel_end, head[:root_end + 1], []
+
+        starts = [first_item]
+        target = first_item + shard_bytes
+        while target < channel_end:
+            start = find_item_start(f, target, channel_end)
+            if start is None:
+                break
+            starts.append(start)
+            target = start + shard_bytes
+    ranges = list(zip(starts, starts[1:] + [channel_end]))
+    return first_item, head[:root_end + 1], ranges
+
+def remaining_size(stream):
+    """Bytes left in a file object from its current position, or None when that cannot be known."""
+    try:
+        return os.fstat(stream.fileno()).st_size - stream.tell()
+    except (AttributeError, OSError, ValueError):
+        pass
+    if getattr(stream, 'seekable', lambda: False)():
+        position = stream.tell()
+        end = stream.seek(0, io.SEEK_END)
+        stream.seek(position)
+        return end - position
+    return None
+
+class CountingReader:
+    """
+    Read-only file wrapper that counts the bytes read through it and, given a hashlib
+    object, hashes them. prefix holds bytes already taken from a stream that cannot seek
+    back; they are returned first.
+    """
+
+    def __init__(self, stream, prefix=b'', digest=None):
+        self.stream = stream
+        self.prefix = prefix
+        self.digest = digest
+        self.count = 0
+
+    def read(self, size=-1):
+        if self.prefix:
+            if size is None or size < 0:
+                data = self.prefix + self.stream.read()
+                self.prefix = b''
+            else:
+                data, self.prefix = self.prefix[:size], self.prefix[size:]
+        else:
+            data = self.stream.read(size)
+        self.count += len(data)
+        if self.digest is not None:
+            self.digest.update(data)
+        return data
+
+    def readable(self):
+        return True
+
+    # zipfile needs random access; only used for seekable inputs, which have no prefix
+    def seekable(self):
+        return not self.prefix and getattr(self.stream, 'seekable', lambda: False)()
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self.stream.seek(offset, whence)
+
+    def tell(self):
+        return self.stream.tell()
+
+class WXRInput:
+    """
+    An export opened for parsing. `stream` reads the XML, decompressed when needed;
+    input_bytes and xml_bytes count what has been read before and after decompression,
+    and total_bytes is the input size (None for streams of unknown length).
+
+    Paths are opened and closed here; file objects are read from their current position
+    and left open. A digest (hashlib object) is fed the XML as it is read.
+    """
+
+    def __init__(self, source, digest=None):
+        self.closers = []
+        if isinstance(source, (str, os.PathLike)):
+            raw = open(source, 'rb')
+            self.closers.append(raw)
+            self.name = os.path.basename(os.fspath(source))
+            self.total_bytes = os.path.getsize(source)
+        else:
+            raw = source
+            name = getattr(source, 'name', None)
+            self.name = os.path.basename(name) if isinstance(name, str) else '<stream>'
+            self.total_bytes = remaining_size(source)
+
+        try:
+            if getattr(raw, 'seekable', lambda: False)():
+                start = raw.tell()
+                head = raw.read(MAGIC_LENGTH)
+                raw.seek(start)
+                self.input = CountingReader(raw)
+            else:
+                head = raw.read(MAGIC_LENGTH)
+                self.input = CountingReader(raw, prefix=head)
+            self.compression = detect_compression(head)
+
+            if self.compression == 'gzip':
+                xml = gzip.GzipFile(fileobj=self.input, mode='rb')
+            elif self.compression == 'bz2':
+                xml = bz2.BZ2File(self.input)
+            elif self.compression == 'xz':
+                xml = lzma.LZMAFile(self.input)
+            elif self.compression == 'zip':
+                if not self.input.seekable():
+                    raise ValueError("zip input must be seekable; pass a path or a seekable file object")
+                archive = zipfile.ZipFile(self.input)
+                self.closers.append(archive)
+                member = zip_export_member(archive)
+                if member is None:
+                    raise ValueError(f"{self.name} does not contain an XML file")
+                xml = archive.open(member)
+            else:
+                xml = self.input
+            if xml is not self.input:
+                self.closers.append(xml)
+            self.stream = CountingReader(xml, digest=digest)
+        except Exception:
+            self.close()
+            raise
+
+    def advance(self, offset):
+        """
+        Counts a plain input as read up to offset, for ranges parsed elsewhere (sharded
+        parsing). Those bytes are not fed to the digest.
+        """
+        self.input.count = self.stream.count = offset
+
+    @property
+    def input_bytes(self):
+        return self.input.count
+
+    @property
+    def xml_bytes(self):
+        return self.stream.count
+
+    def close(self):
+        # Decompressors first, then the archive and the file underneath
+        for closer in reversed(self.closers):
+            closer.close()
+        self.closers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()